@@ -0,0 +1,69 @@
+"""
+벡터화 백테스트 실행 / 시간 측정
+- 기본: 합성 5분봉 (심볼 N개 × days일), --live면 Binance 과거 캔들 (거래대금 상위 N개)
+- 지표 준비 시간과 규칙+청산 시뮬레이션 시간을 나눠 출력
+실행: python -m benchmarks.bench_backtest [--symbols 200] [--days 90] [--live]
+      [--tp 0.015 --sl 0.01 --max-hold 288] [--mode both|long|short]
+"""
+
+import argparse
+import time
+
+from benchmarks.bench_indicators import synthetic_ohlcv
+from utils.backtest import prepare_arrays, run_backtest
+
+
+def load_frames(n_symbols, days, live):
+    if not live:
+        rows = days * 288
+        return {
+            f"SYN{i:03d}/USDT": synthetic_ohlcv(rows, seed=i) for i in range(n_symbols)
+        }
+
+    from filters.volume_filter import top100_markets
+    from utils.backtest import fetch_history
+
+    symbols = [s for s, _ in top100_markets(top_n=n_symbols)]
+    return fetch_history(symbols, "5m", days=days)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--live", action="store_true")
+    parser.add_argument("--mode", default="both")
+    parser.add_argument("--tp", type=float, default=0.015)
+    parser.add_argument("--sl", type=float, default=0.01)
+    parser.add_argument("--max-hold", type=int, default=288)
+    args = parser.parse_args()
+
+    frames = load_frames(args.symbols, args.days, args.live)
+    candles = sum(len(df) for df in frames.values())
+
+    start = time.perf_counter()
+    arrays = {s: prepare_arrays(df) for s, df in frames.items()}
+    t_prepare = time.perf_counter() - start
+
+    start = time.perf_counter()
+    trades, summary, per_symbol = run_backtest(
+        arrays,
+        exits={"tp_pct": args.tp, "sl_pct": args.sl, "max_hold": args.max_hold},
+        mode=args.mode,
+    )
+    t_run = time.perf_counter() - start
+
+    print(f"심볼 {len(frames)}개, 캔들 {candles:,}개 ({args.days}일)")
+    print(f"지표 준비 {t_prepare:.2f}s, 규칙+청산 시뮬레이션 {t_run:.2f}s")
+    print(
+        f"거래 {summary['trades']}건, 승률 {summary['win_rate'] * 100:.1f}%, "
+        f"평균 {summary['avg_return'] * 100:.3f}%, PF {summary['profit_factor']:.2f}, "
+        f"MDD {summary['max_drawdown'] * 100:.1f}%"
+    )
+    if len(trades):
+        print(trades["reason"].value_counts().to_string())
+        print(per_symbol.sort_values("total_return", ascending=False).head(10))
+
+
+if __name__ == "__main__":
+    main()
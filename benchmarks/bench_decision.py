@@ -0,0 +1,109 @@
+"""
+AI 결정 경로 지연 / 대체 동작 확인 (로컬 가짜 모델 서버, Gemini 호출 없음)
+- 시나리오마다 응답 지연/깨진 응답을 주입해서 어떤 결정(primary/hedge/local)이 몇 초에 나오는지 출력
+실행: python -m benchmarks.bench_decision [--budget 3] [--hedge 1]
+"""
+
+import argparse
+import time
+
+from utils.decision_service import DecisionService
+from utils.fake_model import FakeModelServer, http_model_call
+
+CANDIDATES = [
+    {
+        "종목": "AAA/USDT",
+        "신호": "매수(LONG)",
+        "현재가": 10.0,
+        "예측가": {"중앙값": 10.2, "최저": 9.8, "최고": 10.5},
+        "_점수": 7.5,
+    },
+    {
+        "종목": "BBB/USDT",
+        "신호": "매도(SHORT)",
+        "현재가": 2.0,
+        "예측가": {"중앙값": 1.95, "최저": 1.9, "최고": 2.06},
+        "_점수": 8.0,
+    },
+    {
+        "종목": "CCC/USDT",
+        "신호": "매수(LONG)",
+        "현재가": 0.5,
+        "예측가": {"중앙값": 0.51, "최저": 0.49, "최고": 0.52},
+        "_점수": 8.0,
+    },
+]
+
+GOOD = {
+    "symbol": "AAA/USDT",
+    "action": "BUY",
+    "entry_price": 10.0,
+    "take_profit": 10.4,
+    "stop_loss": 9.8,
+    "reason": "uptrend",
+}
+
+
+def scenarios(budget):
+    hang = budget * 3
+    return [
+        ("정상 응답", [(0.2, GOOD)]),
+        ("첫 요청 지연 → 헤지", [(hang, GOOD), (0.2, GOOD)]),
+        ("전부 지연 → 로컬", [(hang, GOOD)]),
+        ("깨진 응답 → 즉시 헤지", [(0.1, "I think AAA looks good"), (0.2, GOOD)]),
+        ("서버 오류 2회 → 로컬", [(0.1, None)]),
+        (
+            "복구: 코드 블록 + 작은따옴표",
+            [(0.1, "```json\n" + str(GOOD).replace('"', "'") + "\n```")],
+        ),
+        (
+            "복구: 숏 표기(TP 아래/SL 위)",
+            [
+                (
+                    0.1,
+                    {
+                        "symbol": "BBB/USDT",
+                        "action": "SHORT",
+                        "entry_price": "2.0",
+                        "take_profit": 1.9,
+                        "stop_loss": 2.06,
+                    },
+                )
+            ],
+        ),
+        (
+            "검증 실패: 후보에 없는 종목",
+            [(0.1, dict(GOOD, symbol="ZZZ/USDT"))],
+        ),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget", type=float, default=3.0)
+    parser.add_argument("--hedge", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(f"예산 {args.budget:.1f}s, 헤지 지연 {args.hedge:.1f}s")
+    print("시나리오                        결정     소요(s)  요청  종목       TP / SL")
+    for name, script in scenarios(args.budget):
+        server = FakeModelServer(script).start()
+        service = DecisionService(
+            model_call=http_model_call(server.url),
+            budget=args.budget,
+            hedge_delay=args.hedge,
+            cache=None,  # 시나리오마다 같은 후보 → 캐시 없이 요청 경로만 측정
+        )
+        start = time.perf_counter()
+        decision = service.decide(CANDIDATES)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:30s} {decision['source']:8s} {elapsed:7.2f}  {server.calls:4d}  "
+            f"{decision['symbol']:10s} {decision['take_profit']:g} / "
+            f"{decision['stop_loss']:g}"
+        )
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+모듈 import 시간 측정 (모듈마다 새 인터프리터, 네트워크 호출 여부 포함)
+- python -X importtime 결과에서 누적 시간 상위 패키지 출력
+- 무거운 의존성(prophet, google.genai, newsdataapi)이 import 시점에 로드되는지 확인
+실행: python -m benchmarks.bench_import [--modules filters.main_filter utils.bot ...]
+      [--repeat 3]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = (
+    "filters.main_filter",
+    "utils.bot",
+    "utils.news",
+    "utils.discord_msg",
+    "utils.place_trade",
+)
+
+HEAVY = ("prophet", "cmdstanpy", "google.genai", "newsdataapi")
+
+# import 중 외부 연결 시도 감지: socket.connect를 막고 시도 횟수만 기록
+PROBE = """
+import socket, sys, time
+attempts = []
+def blocked(self, address, *a, **k):
+    attempts.append(address)
+    raise OSError("bench_import: network disabled")
+socket.socket.connect = blocked
+start = time.perf_counter()
+try:
+    import {module}
+    error = ""
+except BaseException as e:
+    error = type(e).__name__
+elapsed = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(f"RESULT {{elapsed:.4f}} {{len(attempts)}} {{','.join(heavy) or '-'}} {{error or '-'}}")
+"""
+
+
+def run_probe(module):
+    code = PROBE.format(module=module, heavy=HEAVY)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    result = re.search(r"RESULT (\S+) (\d+) (\S+) (\S+)", proc.stdout)
+    if result is None:
+        return None
+    elapsed, attempts, heavy, error = result.groups()
+    return {
+        "seconds": float(elapsed),
+        "connects": int(attempts),
+        "heavy": heavy,
+        "error": error,
+        "top": top_packages(proc.stderr),
+    }
+
+
+def top_packages(importtime, n=5):
+    """-X importtime 출력에서 최상위 패키지별 자체 시간(초) 합계 상위 n개"""
+    totals = {}
+    for line in importtime.splitlines():
+        m = re.match(r"import time:\s+(\d+) \|\s+\d+ \|\s+(\S+)", line)
+        if not m:
+            continue
+        self_us, name = m.groups()
+        root = name.split(".")[0]
+        totals[root] = totals.get(root, 0) + int(self_us) / 1e6
+    return sorted(totals.items(), key=lambda x: x[1], reverse=True)[:n]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modules", nargs="+", default=list(MODULES))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        "모듈                     import(s)  연결시도  무거운 의존성               오류"
+    )
+    for module in args.modules:
+        runs = [run_probe(module) for _ in range(args.repeat)]
+        runs = [r for r in runs if r is not None]
+        if not runs:
+            print(f"{module:24s} 측정 실패")
+            continue
+        best = min(runs, key=lambda r: r["seconds"])
+        print(
+            f"{module:24s} {best['seconds']:9.2f}  {best['connects']:8d}  "
+            f"{best['heavy']:26s} {best['error']}"
+        )
+        print(" " * 25 + ", ".join(f"{name} {sec:.2f}s" for name, sec in best["top"]))
+
+
+if __name__ == "__main__":
+    main()
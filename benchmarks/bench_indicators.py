@@ -0,0 +1,120 @@
+"""
+보조지표 계산 마이크로 벤치마크 (심볼 1개당 비용)
+- before: 기존 pandas 지표 + 파이썬 for 루프 OBV
+- after : NumPy 단일 패스 엔진 (utils.indicators.compute_indicators)
+실행: python -m benchmarks.bench_indicators [--rows 1500] [--repeat 50]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils import indicators
+
+
+def synthetic_ohlcv(rows, seed=0):
+    """랜덤워크 기반 5분봉 OHLCV"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, rows)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.001, rows)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.lognormal(8, 1, rows).round(2)
+    # 보합 캔들도 섞기
+    close[rng.random(rows) < 0.05] = np.nan
+    close = pd.Series(close).ffill().bfill().to_numpy()
+    ts = np.arange(rows, dtype=np.int64) * 300_000 + 1_700_000_000_000
+    return pd.DataFrame(
+        {
+            "timestamp": ts,
+            "open": open_,
+            "high": high,
+            "low": low,
+            "close": close,
+            "volume": volume,
+        }
+    )
+
+
+def legacy_obv(df):
+    """기존 for 루프 OBV (비교 기준)"""
+    obv = [0]
+    for i in range(1, len(df)):
+        if df["close"].iloc[i] > df["close"].iloc[i - 1]:
+            obv.append(obv[-1] + df["volume"].iloc[i])
+        elif df["close"].iloc[i] < df["close"].iloc[i - 1]:
+            obv.append(obv[-1] - df["volume"].iloc[i])
+        else:
+            obv.append(obv[-1])
+    return pd.Series(obv, index=df.index) / df["volume"].sum() * 100
+
+
+def legacy_compute(df):
+    df = df.copy()
+    df["ds"] = pd.to_datetime(df["timestamp"], unit="ms")
+    df["SMA20"] = indicators.SMA(df["close"], 20)
+    df["EMA20"] = indicators.EMA(df["close"], 20)
+    df["RSI14"] = indicators.RSI(df["close"], 14)
+    df["MACD"], df["MACD_signal"], df["MACD_hist"] = indicators.MACD(df["close"])
+    df["BB_upper"], df["BB_mid"], df["BB_lower"] = indicators.Bollinger_Bands(
+        df["close"]
+    )
+    df["ATR14"] = indicators.ATR(df, 14)
+    df["OBV"] = legacy_obv(df)
+    return df
+
+
+def timeit(func, df, repeat):
+    func(df)  # 워밍업
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(df)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def check_parity(expected, actual):
+    """컬럼/값 동일성 확인 (부동소수 오차 허용)"""
+    assert list(expected.columns) == list(actual.columns), "컬럼 순서 불일치"
+    worst = 0.0
+    for col in expected.columns:
+        e, a = expected[col], actual[col]
+        if col == "ds" or e.dtype.kind not in "fi":
+            assert e.equals(a), f"{col} 불일치"
+            continue
+        e, a = e.to_numpy(dtype=float), a.to_numpy(dtype=float)
+        assert np.array_equal(np.isnan(e), np.isnan(a)), f"{col} NaN 위치 불일치"
+        assert np.allclose(e, a, rtol=1e-9, atol=1e-9, equal_nan=True), f"{col} 불일치"
+        mask = ~np.isnan(e)
+        if mask.any():
+            worst = max(worst, float(np.max(np.abs(e[mask] - a[mask]))))
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1500)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    df = synthetic_ohlcv(args.rows)
+
+    worst = check_parity(legacy_compute(df), indicators.compute_indicators(df))
+    print(f"정합성 OK (최대 절대오차 {worst:.2e})")
+
+    cases = [
+        ("before (pandas + loop OBV)", legacy_compute),
+        ("pandas + 벡터 OBV", indicators.compute_indicators_pandas),
+        ("after (NumPy 엔진)", indicators.compute_indicators),
+    ]
+    base = None
+    for name, func in cases:
+        ms = timeit(func, df, args.repeat)
+        base = base or ms
+        print(f"{name:<28} {ms:8.3f} ms/심볼  (x{base / ms:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+run_filters 전체 / 단계별 시간 측정 (재생 거래소, 네트워크 없음)
+- 유니버스 50 / 200 / 400 심볼, 사이클 1 = 캔들 저장소 비어 있는 상태(cold), 2~ = 증분(warm)
+- 요청마다 latency ± jitter 지연을 넣어 실제 네트워크 대기와 비슷하게 재현
+실행: python -m benchmarks.bench_pipeline [--sizes 50 200 400] [--latency 0.05]
+      [--fixture data/fixtures/live-400.json.gz] [--forecaster fast|prophet]
+      [--scan threads|matrix] [--deadline 초] [--prescreen 0.5]
+      [--spread 0.8]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.record_fixture import build_synthetic
+from utils.replay import install_replay, load_fixture
+
+STAGES = (
+    "top100_markets",
+    "prefetch_ohlcv",
+    "filter_by_volatility",
+    "filter_by_basic",
+    "scan_pipeline",
+    "analyze_with_prophet",
+    "select_trading_candidates",
+)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 400])
+    parser.add_argument("--cycles", type=int, default=2)
+    parser.add_argument("--rows", type=int, default=1500)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.3)
+    parser.add_argument("--fixture", default=None)
+    parser.add_argument("--forecaster", default="fast")
+    parser.add_argument("--executor", default="process")
+    parser.add_argument("--scan", default="threads")
+    parser.add_argument("--deadline", type=float, default=None)
+    parser.add_argument("--prescreen", type=float, default=None)
+    parser.add_argument("--spread", type=float, default=None)
+    args = parser.parse_args()
+
+    if args.fixture:
+        fixture = load_fixture(args.fixture)
+    else:
+        fixture = build_synthetic(max(args.sizes), args.rows)
+
+    # 거래소 인스턴스를 import 시점에 만드는 모듈보다 먼저 설치
+    instances = install_replay(fixture, latency=args.latency, jitter=args.jitter)
+
+    def ohlcv_requests():
+        return sum(x.calls.get("fetch_ohlcv", 0) for x in instances)
+
+    import filters.main_filter as mf
+    from utils.candle_store import CandleStore
+    from utils.profiling import format_coverage, get_profiler
+
+    profiler = get_profiler()
+    workdir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    profiler.path = os.path.join(workdir, "cycles.jsonl")
+
+    print(
+        f"지연 {args.latency * 1000:.0f}ms ± {args.jitter * 100:.0f}%, "
+        f"예측기 {args.forecaster}, 스캔 {args.scan}, 마감 {args.deadline}"
+    )
+    print(
+        "심볼  사이클   전체(s) | "
+        + " | ".join(name.split("_")[-1][:10] for name in STAGES)
+        + " | 후보 | 캔들요청 | 커버리지"
+    )
+
+    for size in args.sizes:
+        # 심볼 수마다 빈 저장소에서 시작
+        mf.candle_store = CandleStore(
+            mf.fetch_candles,
+            fetch_many_func=mf.fetch_candles_many,
+            root=os.path.join(workdir, f"candles-{size}"),
+        )
+        mf.indicator_streams.clear()
+        mf.model_cache.retain([])
+
+        for cycle in range(args.cycles):
+            profiler.start_cycle()
+            requests_before = ohlcv_requests()
+            start = time.perf_counter()
+            candidates = mf.run_filters(
+                fetch_ohlcv=mf.fetch_ohlcv,
+                timeframe="5m",
+                limit=args.rows,
+                mode="both",
+                lookback_cross=3,
+                direction="long",
+                prophet_executor=args.executor,
+                prophet_validation="holdout",
+                forecaster=args.forecaster,
+                universe_size=size,
+                scan=args.scan,
+                deadline=args.deadline,
+                prescreen=args.prescreen,
+                spread=args.spread,
+                slippage_notional=1000.0 if args.spread else None,
+            )
+            total = time.perf_counter() - start
+            record = profiler.end_cycle(universe_size=size, cycle=cycle)
+
+            stages = {s["name"]: s["wall"] for s in record["stages"]}
+            label = "cold" if cycle == 0 else "warm"
+            print(
+                f"{size:4d}  {label:5s} {total:9.2f} | "
+                + " | ".join(f"{stages.get(name, 0.0):10.2f}" for name in STAGES)
+                + f" | {len(candidates)}"
+                + f" | {ohlcv_requests() - requests_before}"
+                + f" | {format_coverage(record['coverage'])}"
+            )
+
+    print(f"사이클 기록: {profiler.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+AI 프롬프트 크기 / 결정 캐시 적중률 측정 (Gemini 호출 없음)
+- 재생 픽스처로 최종 후보를 만든 뒤 기존 인코딩(indent=2, 한글 키)과 압축 인코딩 크기 비교
+- 사이클마다 가격류 값을 무작위로 조금씩 움직여 decision_fingerprint 캐시 적중률 계산
+실행: python -m benchmarks.bench_prompt [--size 200] [--cycles 48] [--drift 0.001]
+"""
+
+import argparse
+import copy
+import json
+import random
+
+from benchmarks.record_fixture import build_synthetic
+from utils.replay import install_replay
+
+PRICE_FIELDS = ("중앙값", "최저", "최고", "평균", "최댓값", "최솟값")
+
+
+def drift(candidates, rng, sigma):
+    """현재가/예측가를 같은 비율로, RSI는 ±1 안에서 움직인 복사본"""
+    moved = copy.deepcopy(candidates)
+    for c in moved:
+        r = 1 + rng.gauss(0, sigma)
+        if c.get("현재가"):
+            c["현재가"] *= r
+        for k in PRICE_FIELDS:
+            if c["예측가"].get(k):
+                c["예측가"][k] *= r
+        c["보조지표"]["RSI14"] += rng.uniform(-1, 1)
+    return moved
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=200)
+    parser.add_argument("--cycles", type=int, default=48)
+    parser.add_argument("--drift", type=float, default=0.001)
+    args = parser.parse_args()
+
+    install_replay(build_synthetic(args.size, 1500))
+
+    import filters.main_filter as mf
+    from utils.bot import DecisionCache, clean_numpy, decision_fingerprint
+    from utils.bot import encode_candidates
+
+    candidates = mf.run_filters(
+        fetch_ohlcv=mf.fetch_ohlcv,
+        timeframe="5m",
+        limit=1500,
+        mode="both",
+        lookback_cross=3,
+        direction="long",
+        forecaster="fast",
+        universe_size=args.size,
+    )
+    if not candidates:
+        print("후보 없음")
+        return
+
+    # 기존 인코딩 ("_점수"는 예전에도 프롬프트 전에 제거됨)
+    plain = [{k: v for k, v in c.items() if k != "_점수"} for c in candidates]
+    before = json.dumps(clean_numpy(plain), ensure_ascii=False, indent=2)
+    after = encode_candidates(candidates)
+    print(f"후보 {len(candidates)}개")
+    print(
+        f"기존  {len(before):6d}자 {len(before.encode()):6d}B\n"
+        f"압축  {len(after):6d}자 {len(after.encode()):6d}B "
+        f"({len(after.encode()) / len(before.encode()) * 100:.0f}%)"
+    )
+
+    # 사이클마다 가격이 조금씩 움직이는 동안 캐시 적중률 (TTL은 사이클 단위로 비교)
+    rng = random.Random(0)
+    cache = DecisionCache(ttl=float("inf"))
+    current = candidates
+    for _ in range(args.cycles):
+        current = drift(current, rng, args.drift)
+        key = decision_fingerprint(current)
+        if cache.get(key) is None:
+            cache.put(key, "{}")
+    print(
+        f"결정 캐시: 사이클 {args.cycles}, 변동 σ {args.drift * 100:.2f}%/사이클 → "
+        f"적중 {cache.hits}, 미스 {cache.misses} ({cache.hit_rate * 100:.0f}%)"
+    )
+
+
+if __name__ == "__main__":
+    main()
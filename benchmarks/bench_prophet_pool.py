@@ -0,0 +1,70 @@
+"""
+Prophet 단계 실행 방식 비교: 스레드 풀 vs 프로세스 풀
+- 합성 5분봉 N개 심볼로 analyze_with_prophet 전체 시간 측정
+실행: python -m benchmarks.bench_prophet_pool [--symbols 4 8] [--rows 1500]
+"""
+
+import argparse
+import os
+import time
+
+from benchmarks.bench_indicators import synthetic_ohlcv
+from filters.prophet_filter import analyze_with_prophet
+from utils.indicators import compute_indicators
+
+
+def make_items(n_symbols, rows):
+    items = []
+    for i in range(n_symbols):
+        df = compute_indicators(synthetic_ohlcv(rows, seed=i))
+        items.append(
+            {
+                "symbol": f"SYM{i}/USDT",
+                "volume": 1e6,
+                "signal": "long",
+                "info": {"last_close": float(df["close"].iloc[-1])},
+                "ohlcv": df,
+            }
+        )
+    return items
+
+
+def run(items, executor):
+    start = time.perf_counter()
+    results = analyze_with_prophet(
+        items,
+        fetch_func=None,
+        timeframe="5m",
+        limit=len(items[0]["ohlcv"]),
+        direction="long",
+        executor=executor,
+    )
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, nargs="+", default=[4, 8])
+    parser.add_argument("--rows", type=int, default=1500)
+    args = parser.parse_args()
+
+    print(f"CPU 코어 수: {os.cpu_count()}")
+    for n in args.symbols:
+        items = make_items(n, args.rows)
+        t_thread, r_thread = run(items, "thread")
+        t_proc, r_proc = run(items, "process")
+
+        # 두 방식의 요약값이 같은지 확인
+        by_symbol = {r["symbol"]: r for r in r_thread}
+        diff = max(
+            abs(r["forecast_yhat"] - by_symbol[r["symbol"]]["forecast_yhat"])
+            for r in r_proc
+        )
+        print(
+            f"N={n:>3}  thread {t_thread:7.2f}s  process {t_proc:7.2f}s  "
+            f"(x{t_thread / t_proc:.2f}, yhat 최대 차이 {diff:.2e})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Prophet warm start 효과 측정
+- 창을 몇 캔들씩 밀어가며 (1) 매번 새로 학습 (2) 직전 파라미터로 warm start 비교
+- 학습 시간과 예측값(yhat) 차이 출력
+실행: python -m benchmarks.bench_prophet_warm_start [--rows 1500] [--steps 5] [--shift 6]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_indicators import synthetic_ohlcv
+from utils.price_forecast import get_forecast, train_model, warm_start_params
+
+
+def fit_and_forecast(df, init=None):
+    start = time.perf_counter()
+    model = train_model(df, init=init)
+    elapsed = time.perf_counter() - start
+    forecast = get_forecast(model, 24, "15min")
+    return elapsed, model, forecast["yhat"].tail(24).to_numpy()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1500)
+    parser.add_argument("--steps", type=int, default=5)
+    parser.add_argument("--shift", type=int, default=6)
+    args = parser.parse_args()
+
+    raw = synthetic_ohlcv(args.rows + args.steps * args.shift, seed=3)
+    series = pd.DataFrame(
+        {"ds": pd.to_datetime(raw["timestamp"], unit="ms"), "y": raw["close"]}
+    )
+
+    window = series.iloc[: args.rows]
+    _, model, _ = fit_and_forecast(window)
+    params = warm_start_params(model)
+
+    cold_total = warm_total = 0.0
+    for step in range(1, args.steps + 1):
+        start = step * args.shift
+        window = series.iloc[start : start + args.rows].reset_index(drop=True)
+
+        t_cold, _, yhat_cold = fit_and_forecast(window)
+        t_warm, model, yhat_warm = fit_and_forecast(window, init=params)
+        params = warm_start_params(model)
+
+        cold_total += t_cold
+        warm_total += t_warm
+        rel = np.max(np.abs(yhat_warm - yhat_cold) / np.abs(yhat_cold))
+        print(
+            f"step {step}: cold {t_cold * 1000:7.1f}ms  warm {t_warm * 1000:7.1f}ms  "
+            f"yhat 최대 상대차 {rel:.2e}"
+        )
+
+    print(
+        f"평균 학습 시간: cold {cold_total / args.steps * 1000:.1f}ms → "
+        f"warm {warm_total / args.steps * 1000:.1f}ms "
+        f"(x{cold_total / warm_total:.2f})"
+    )
+
+
+if __name__ == "__main__":
+    main()
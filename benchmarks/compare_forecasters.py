@@ -0,0 +1,110 @@
+"""
+예측기 비교: Prophet vs NumPy 벡터화 예측기("fast")
+- 저장된 캔들(data/candles/*.pkl)이 있으면 사용, 없으면 합성 5분봉
+- 마지막 6시간을 떼고 그 앞까지로 예측 → 떼어낸 실제 가격과 비교
+- 지연시간 / 예측 종료 시점 MAPE / 방향 적중률 / 95% 구간 포함률 출력
+실행: python -m benchmarks.compare_forecasters [--symbols 8] [--rows 1500]
+"""
+
+import argparse
+import glob
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_indicators import synthetic_ohlcv
+from filters.prophet_filter import get_forecaster
+from utils.candle_store import DEFAULT_ROOT
+
+HOLDOUT_CANDLES = 72  # 5분봉 6시간
+STEP = 3  # 15분 = 5분봉 3개
+
+
+def load_series(n_symbols, rows):
+    """{symbol: 5분봉 DataFrame(ds, close)}: 저장된 캔들 우선"""
+    series = {}
+    for path in sorted(glob.glob(os.path.join(DEFAULT_ROOT, "*_5m.pkl"))):
+        df = pd.read_pickle(path)
+        if len(df) < rows + HOLDOUT_CANDLES:
+            continue
+        df = df.tail(rows + HOLDOUT_CANDLES).reset_index(drop=True)
+        df["ds"] = pd.to_datetime(df["timestamp"], unit="ms")
+        series[os.path.basename(path)[:-4]] = df
+        if len(series) == n_symbols:
+            return series
+
+    for i in range(n_symbols - len(series)):
+        df = synthetic_ohlcv(rows + HOLDOUT_CANDLES, seed=100 + i)
+        df["ds"] = pd.to_datetime(df["timestamp"], unit="ms")
+        series[f"SYN{i}/USDT"] = df
+    return series
+
+
+def evaluate(forecaster, series, hours):
+    """학습 구간만 넘겨 예측 → 홀드아웃 구간의 마지막 시점 기준으로 채점"""
+    train = {
+        s: (
+            df["ds"].to_numpy()[:-HOLDOUT_CANDLES],
+            df["close"].to_numpy()[:-HOLDOUT_CANDLES],
+        )
+        for s, df in series.items()
+    }
+
+    start = time.perf_counter()
+    forecasts = forecaster.forecast_batch(train, forecast_hours=hours, freq="15min")
+    elapsed = time.perf_counter() - start
+
+    errors, hits, covered = [], [], []
+    for s, (summary, _) in forecasts.items():
+        close = series[s]["close"].to_numpy()
+        actual = close[-HOLDOUT_CANDLES:][STEP - 1 :: STEP][:hours]
+        last_train = close[-HOLDOUT_CANDLES - 1]
+
+        errors.append(abs(actual[-1] - summary["forecast_yhat"]) / abs(actual[-1]))
+        hits.append(
+            (summary["forecast_yhat"] > last_train) == (actual[-1] > last_train)
+        )
+        covered.append(
+            summary["forecast_lower"] <= actual[-1] <= summary["forecast_upper"]
+        )
+
+    return {
+        "elapsed": elapsed,
+        "symbols": len(forecasts),
+        "mape": float(np.mean(errors)) if errors else float("nan"),
+        "direction": float(np.mean(hits)) if hits else float("nan"),
+        "coverage": float(np.mean(covered)) if covered else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=1500)
+    parser.add_argument("--executor", default="process")
+    args = parser.parse_args()
+
+    series = load_series(args.symbols, args.rows)
+    hours = HOLDOUT_CANDLES // STEP  # 홀드아웃 구간 전체를 15분 단위로 예측
+
+    candidates = {
+        "prophet": get_forecaster(
+            "prophet", executor=args.executor, validation="holdout"
+        ),
+        "fast": get_forecaster("fast"),
+    }
+
+    print(f"심볼 {len(series)}개, 학습 {args.rows}캔들, 홀드아웃 {HOLDOUT_CANDLES}캔들")
+    for name, forecaster in candidates.items():
+        r = evaluate(forecaster, series, hours)
+        print(
+            f"{name:8s} {r['elapsed'] * 1000:9.1f}ms ({r['symbols']}개)  "
+            f"MAPE {r['mape'] * 100:6.3f}%  방향 적중 {r['direction'] * 100:5.1f}%  "
+            f"95% 구간 포함 {r['coverage'] * 100:5.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+재생용 거래소 픽스처 만들기
+- live: 실제 Binance 응답 기록 (시장정보/티커/잔고/호가 + 거래대금 상위 N개 5분봉)
+- synthetic: 네트워크 없이 합성 USDT 마켓 N개 생성 (벤치마크 기본값)
+실행:
+  python -m benchmarks.record_fixture live --symbols 400 [--out data/fixtures/live.json.gz]
+  python -m benchmarks.record_fixture synthetic --symbols 400
+"""
+
+import argparse
+import os
+
+from benchmarks.bench_indicators import synthetic_ohlcv
+from utils.replay import empty_fixture, install_recorder, save_fixture
+
+FIXTURE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "fixtures"
+)
+
+
+def synthetic_market(symbol, price):
+    base, quote = symbol.split("/")
+    return {
+        "id": base + quote,
+        "symbol": symbol,
+        "base": base,
+        "quote": quote,
+        "baseId": base,
+        "quoteId": quote,
+        "type": "spot",
+        "spot": True,
+        "active": True,
+        "precision": {"amount": 0.001, "price": 10 ** -(6 if price < 1 else 4)},
+        "limits": {
+            "amount": {"min": 0.001, "max": None},
+            "price": {"min": None, "max": None},
+            "cost": {"min": 5.0, "max": None},
+        },
+    }
+
+
+def build_synthetic(n_symbols, rows=1500, timeframe="5m"):
+    """합성 픽스처: 심볼 i는 seed=i 랜덤워크, 거래대금은 i가 작을수록 큼"""
+    fixture = empty_fixture()
+    fixture["balance"] = {
+        "USDT": {"free": 1000.0, "used": 0.0, "total": 1000.0},
+        "free": {"USDT": 1000.0},
+        "used": {"USDT": 0.0},
+        "total": {"USDT": 1000.0},
+    }
+    for i in range(n_symbols):
+        symbol = f"SYN{i:03d}/USDT"
+        df = synthetic_ohlcv(rows, seed=i)
+        last = float(df["close"].iloc[-1])
+        tick = last * 0.0002
+        day = df.tail(288)  # 5분봉 24시간
+        open_24h = float(day["open"].iloc[0])
+
+        fixture["markets"][symbol] = synthetic_market(symbol, last)
+        fixture["tickers"][symbol] = {
+            "symbol": symbol,
+            "last": last,
+            "bid": last - tick,
+            "ask": last + tick,
+            "high": float(day["high"].max()),
+            "low": float(day["low"].min()),
+            "quoteVolume": 1e9 / (i + 1),
+            "percentage": (last - open_24h) / open_24h * 100,
+        }
+        fixture["order_books"][symbol] = {
+            "symbol": symbol,
+            "bids": [[last - tick * (k + 1), 10.0 * (k + 1)] for k in range(20)],
+            "asks": [[last + tick * (k + 1), 10.0 * (k + 1)] for k in range(20)],
+        }
+        fixture["ohlcv"][f"{symbol}|{timeframe}"] = df.to_numpy().tolist()
+        for row in fixture["ohlcv"][f"{symbol}|{timeframe}"]:
+            row[0] = int(row[0])
+    return fixture
+
+
+def record_live(n_symbols, path, timeframe="5m", limit=1500):
+    """실제 호출을 기록 (조회만, 주문 없음). BINANCE_API_KEY가 없으면 잔고는 생략"""
+    recorder = install_recorder(path)
+
+    from utils.exchange import create_binance
+    from utils.indicators import fetch_candles_many
+
+    binance = create_binance(auth=bool(os.getenv("BINANCE_API_KEY")))
+    binance.load_markets()
+    tickers = binance.fetch_tickers()
+    if binance.apiKey:
+        binance.fetch_balance()
+
+    usdt = [(s, t.get("quoteVolume") or 0) for s, t in tickers.items()]
+    usdt = [x for x in usdt if x[0].endswith("/USDT")]
+    usdt.sort(key=lambda x: x[1], reverse=True)
+    symbols = [s for s, _ in usdt[:n_symbols]]
+
+    for s in symbols:
+        try:
+            binance.fetch_order_book(s, limit=20)
+        except Exception as e:
+            print(f"{s} 호가 기록 실패: {e}")
+    fetch_candles_many([(s, timeframe, None, limit) for s in symbols])
+    recorder.save()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("mode", choices=["live", "synthetic"])
+    parser.add_argument("--symbols", type=int, default=400)
+    parser.add_argument("--rows", type=int, default=1500)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    path = args.out or os.path.join(FIXTURE_DIR, f"{args.mode}-{args.symbols}.json.gz")
+
+    if args.mode == "live":
+        record_live(args.symbols, path, limit=args.rows)
+    else:
+        save_fixture(build_synthetic(args.symbols, args.rows), path)
+    print(f"픽스처 저장: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+필터 임계값 파라미터 탐색 (벡터화 백테스트 점수)
+- 기본: 합성 5분봉, --live면 Binance 과거 캔들
+- 격자 전체(--random 0) 또는 무작위 N개 조합을 프로세스 풀로 평가, 순위표 출력/저장
+실행: python -m benchmarks.sweep_params [--symbols 50] [--days 60] [--random 100]
+      [--metric avg_return|profit_factor|total_return|win_rate] [--out sweep.csv]
+"""
+
+import argparse
+import time
+
+from benchmarks.bench_backtest import load_frames
+from utils.param_sweep import grid_params, random_params, run_sweep
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--live", action="store_true")
+    parser.add_argument("--random", type=int, default=0)
+    parser.add_argument("--mode", default="both")
+    parser.add_argument("--metric", default="avg_return")
+    parser.add_argument("--min-trades", type=int, default=30)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    frames = load_frames(args.symbols, args.days, args.live)
+    params = random_params(args.random) if args.random else grid_params()
+
+    start = time.perf_counter()
+    table = run_sweep(
+        frames,
+        params,
+        mode=args.mode,
+        max_workers=args.workers,
+        metric=args.metric,
+        min_trades=args.min_trades,
+    )
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"심볼 {len(frames)}개 × {args.days}일, 조합 {len(params)}개: {elapsed:.1f}s "
+        f"(조합당 {elapsed / max(1, len(params)) * 1000:.0f}ms)"
+    )
+    print(table.head(args.top).to_string())
+    if args.out:
+        table.to_csv(args.out, index=False)
+        print(f"저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 import pandas as pd
+import numpy as np
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from utils.profiling import get_profiler
+
 # 기본 필터링 (SMA/EMA, MACD, RSI)
 #  - 의도:
 #    1) SMA/EMA로 추세 방향 확인
@@ -18,7 +21,13 @@ def _crossed_down(a: pd.Series, b: pd.Series) -> pd.Series:
     return (a.shift(1) >= b.shift(1)) & (a < b)
 
 
-def basic_filter_df(df: pd.DataFrame, lookback_cross: int = 5, obv_lookback: int = 5):
+def basic_filter_df(
+    df: pd.DataFrame,
+    lookback_cross: int = 5,
+    obv_lookback: int = 5,
+    rsi_long: tuple = (45, 75),
+    rsi_short: tuple = (25, 55),
+):
     need_cols = [
         "close",
         "SMA20",
@@ -62,8 +71,8 @@ def basic_filter_df(df: pd.DataFrame, lookback_cross: int = 5, obv_lookback: int
     hist_down = (last["MACD_hist"] < 0) or (hist_recent.diff().iloc[-1] < 0)
 
     # 3) RSI 판단
-    rsi_bull = (last["RSI14"] >= 45) and (last["RSI14"] < 75)
-    rsi_bear = (last["RSI14"] <= 55) and (last["RSI14"] > 25)
+    rsi_bull = (last["RSI14"] >= rsi_long[0]) and (last["RSI14"] < rsi_long[1])
+    rsi_bear = (last["RSI14"] <= rsi_short[1]) and (last["RSI14"] > rsi_short[0])
 
     # 4) OBV 판단
     obv_trend = df_valid["OBV"].diff().tail(obv_lookback).sum()
@@ -124,17 +133,23 @@ def evaluate_basic(fetch_func, symbol, timeframe, limit, lookback_cross):
 
 def filter_by_basic(markets, fetch_func, timeframe, limit, mode, lookback_cross):
     results = []
+    profiler = get_profiler()
     with ThreadPoolExecutor(max_workers=20) as executor:
         futures = {}
         for item in markets:
             s, v = item[0], item[1]
             fut = executor.submit(
-                evaluate_basic, fetch_func, s, timeframe, limit, lookback_cross
+                profiler.wrap("basic", s, evaluate_basic),
+                fetch_func,
+                s,
+                timeframe,
+                limit,
+                lookback_cross,
             )
             futures[fut] = (s, v)
 
         for fut in as_completed(futures):
-            (s, v) = futures[fut]
+            s, v = futures[fut]
             try:
                 sym, decision, explain = fut.result()
                 if mode == "both" and decision in ("long", "short"):
@@ -147,3 +162,118 @@ def filter_by_basic(markets, fetch_func, timeframe, limit, mode, lookback_cross)
 
     results.sort(key=lambda x: x[1], reverse=True)
     return results
+
+
+# === 벡터화 버전 (백테스트 / 여러 심볼 동시 스캔용) ===
+# basic_filter_df를 모든 시점에 대해 한 번에 계산: 각 시점 t의 결과는
+# basic_filter_df(df.iloc[: t + 1])와 같음 (지표 NaN이 워밍업 구간에만 있는 경우)
+BASIC_COLUMNS = (
+    "close",
+    "SMA20",
+    "EMA20",
+    "RSI14",
+    "MACD",
+    "MACD_signal",
+    "MACD_hist",
+    "OBV",
+)
+
+
+def _lag(x, k):
+    """시간축(axis 0)으로 k칸 밀기, 앞쪽은 NaN"""
+    out = np.full_like(x, np.nan, dtype=float)
+    if k < len(x):
+        out[k:] = x[: len(x) - k]
+    return out
+
+
+def _rolling_count(mask, window):
+    """최근 window개(자기 포함) 중 True 개수 (axis 0)"""
+    counts = np.cumsum(mask, axis=0)
+    lagged = np.zeros_like(counts)
+    if window < len(mask):
+        lagged[window:] = counts[: len(mask) - window]
+    return counts - lagged
+
+
+def _run_length(mask):
+    """각 시점에서 끝나는 연속 True 길이 (axis 0)"""
+    counts = np.cumsum(mask, axis=0)
+    reset = np.maximum.accumulate(np.where(mask, 0, counts), axis=0)
+    return counts - reset
+
+
+def basic_signal_arrays(
+    ind,
+    lookback_cross=5,
+    obv_lookback=5,
+    rsi_long=(45, 75),
+    rsi_short=(25, 55),
+):
+    """
+    basic_filter_df의 롱/숏 판단을 전체 시점에 대해 불리언 배열로 계산
+    - ind: BASIC_COLUMNS 키를 가진 dict, 값은 (T,) 또는 (T, 심볼수) 배열
+    - 반환: long/short 및 각 구성요소(trend_up, macd_bull, ...) 불리언 배열
+    """
+    x = {c: np.asarray(ind[c], dtype=float) for c in BASIC_COLUMNS}
+    valid = np.ones(x["close"].shape, dtype=bool)
+    for c in BASIC_COLUMNS:
+        valid &= ~np.isnan(x[c])
+
+    # 최근 50봉 중 유효 캔들 3개 이상 (basic_filter_df의 insufficient data 조건)
+    enough = valid & (_rolling_count(valid, 50) >= 3)
+    prev_valid = np.zeros_like(valid)
+    prev_valid[1:] = valid[:-1]
+
+    macd, sig, hist = x["MACD"], x["MACD_signal"], x["MACD_hist"]
+    prev_macd, prev_sig = _lag(macd, 1), _lag(sig, 1)
+    prev_ema20 = _lag(x["EMA20"], 1)
+
+    with np.errstate(invalid="ignore"):
+        # 1) 추세
+        trend_up = (x["close"] > x["SMA20"]) | (x["EMA20"] > prev_ema20)
+        trend_down = (x["close"] < x["SMA20"]) | (x["EMA20"] < prev_ema20)
+
+        # 2) MACD (최근 lookback_cross봉 안의 골든/데드크로스)
+        cross_up = prev_valid & (prev_macd <= prev_sig) & (macd > sig)
+        cross_down = prev_valid & (prev_macd >= prev_sig) & (macd < sig)
+        macd_bull = (macd > sig) | (_rolling_count(cross_up, lookback_cross) > 0)
+        macd_bear = (macd < sig) | (_rolling_count(cross_down, lookback_cross) > 0)
+
+        # 2-보정) MACD_hist
+        hist_diff = hist - _lag(hist, 1)
+        hist_up = (hist > 0) | (hist_diff > 0)
+        hist_down = (hist < 0) | (hist_diff < 0)
+
+        # 3) RSI
+        rsi = x["RSI14"]
+        rsi_bull = (rsi >= rsi_long[0]) & (rsi < rsi_long[1])
+        rsi_bear = (rsi <= rsi_short[1]) & (rsi > rsi_short[0])
+
+        # 4) OBV: 최근 obv_lookback봉 변화량 합 = OBV[t] - OBV[t-k]
+        #    (k는 유효 구간 시작을 넘지 않도록 제한)
+        run = np.minimum(_run_length(valid), 50)
+        k = np.minimum(run - 1, obv_lookback).clip(min=0)
+        rows = np.arange(len(valid)).reshape((-1,) + (1,) * (valid.ndim - 1))
+        obv = x["OBV"]
+        obv_trend = obv - np.take_along_axis(obv, rows - k, axis=0)
+        obv_up = obv_trend >= 0
+        obv_down = obv_trend <= 0
+
+    long = enough & trend_up & macd_bull & rsi_bull & hist_up & obv_up
+    short = enough & trend_down & macd_bear & rsi_bear & hist_down & obv_down
+
+    return {
+        "long": long,
+        "short": short,
+        "trend_up": trend_up,
+        "trend_down": trend_down,
+        "macd_bull": macd_bull,
+        "macd_bear": macd_bear,
+        "hist_up": hist_up,
+        "hist_down": hist_down,
+        "rsi_bull": rsi_bull,
+        "rsi_bear": rsi_bear,
+        "obv_up": obv_up,
+        "obv_down": obv_down,
+    }
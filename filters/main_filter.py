@@ -1,45 +1,174 @@
-from filters.volume_filter import top100_markets
-from utils.indicators import get_indicators
+import threading
+import time
+
+from filters.volume_filter import fetch_tickers, top100_markets
+from filters.ticker_filter import prescreen_by_ticker
+from filters.spread_filter import estimate_slippage, filter_by_spread
+from utils.indicators import fetch_candles, fetch_candles_many
+from utils.candle_store import CandleStore
+from utils.streaming_indicators import IncrementalIndicators
 from filters.basic_filter import filter_by_basic
 from filters.volatility_filter import filter_by_volatility
-from filters.prophet_filter import analyze_with_prophet, select_trading_candidates
+from filters.matrix_scan import filter_by_basic_matrix, filter_by_volatility_matrix
+from filters.pipeline import make_forecaster, run_pipeline
+from utils.profiling import get_profiler
+from filters.prophet_filter import (
+    analyze_with_prophet,
+    select_trading_candidates,
+    model_cache,
+    validation_cache,
+)
 
-# 전역 캐시: (심볼, 타임프레임, 캔들개수) 단위로 저장
+# 전역 캐시: (심볼, 타임프레임, 캔들개수) 단위로 저장 (한 사이클 동안만 유지)
 ohlcv_cache = {}
 
+# ohlcv_cache 세대: reset_ohlcv_cache()마다 증가
+# → 이전 사이클이 기다리지 않고 버린 수집 스레드가 늦게 끝나도 지난 봉 데이터를 캐시에 남기지 않음
+_cache_generation = 0
+_cache_lock = threading.Lock()
+
+# 영구 캔들 저장소: 사이클/재시작 간 유지, 새 캔들만 증분 다운로드
+candle_store = CandleStore(fetch_candles, fetch_many_func=fetch_candles_many)
+
+# 심볼별 증분 지표 상태: 새로 들어온 캔들만 O(1)로 반영
+indicator_streams = {}
+
+# deadline 모드: 캔들 수집에 쓸 수 있는 시간 비율 / 한 번에 수집하는 심볼 수
+FETCH_SHARE = 0.5
+SCAN_CHUNK = 50
+
+# 마지막 run_filters 커버리지 (대상 심볼 중 실제로 스캔한 비율 등)
+last_coverage = {}
+
+
+def _stream_indicators(symbol, timeframe, limit, candles):
+    key = (symbol, timeframe, limit)
+    stream = indicator_streams.get(key)
+    incremental = stream is not None and stream.can_apply(candles)
+    if not incremental:
+        # 처음이거나 공백이 생겨 전체 재다운로드된 경우 → 한 번에 다시 구성
+        stream = IncrementalIndicators.from_candles(candles, limit)
+        indicator_streams[key] = stream
+    else:
+        stream.apply(candles)
+    get_profiler().cache_event("indicator_stream", incremental)
+    return stream.frame()
+
+
+def reset_ohlcv_cache():
+    """ohlcv_cache 비우고 세대 증가 (이전 세대에서 시작한 fetch_ohlcv는 캐시/지표에 쓰지 않음)"""
+    global _cache_generation
+    with _cache_lock:
+        _cache_generation += 1
+        ohlcv_cache.clear()
+
 
 def fetch_ohlcv(symbol, timeframe, limit):
     key = (symbol, timeframe, limit)
-    if key not in ohlcv_cache:
+    generation = _cache_generation
+    df = ohlcv_cache.get(key)
+    get_profiler().cache_event("ohlcv_cache", df is not None)
+    if df is None:
         try:
-            df = get_indicators(symbol, timeframe, limit)
-            ohlcv_cache[key] = df
+            candles = candle_store.get(symbol, timeframe, limit)
+            if generation != _cache_generation:
+                return None  # 이전 사이클의 낙오 작업: 지표 상태도 건드리지 않음
+            df = _stream_indicators(symbol, timeframe, limit, candles)
         except Exception as e:
             print(f"{symbol} OHLCV 가져오기 실패: {e}")
             return None
-    return ohlcv_cache[key]
+        with _cache_lock:
+            if generation != _cache_generation:
+                return None
+            ohlcv_cache[key] = df
+    return df
+
+
+def prefetch_ohlcv(symbols, timeframe, limit):
+    """
+    유니버스 전체 캔들을 이벤트 루프 한 번에 동시 수집해서 ohlcv_cache를 채움
+    - 이후 필터들의 fetch_ohlcv 호출은 캐시에서 바로 반환
+    """
+    symbols = [s for s in symbols if (s, timeframe, limit) not in ohlcv_cache]
+    frames = candle_store.get_many(symbols, timeframe, limit)
+    for symbol, candles in frames.items():
+        try:
+            df = _stream_indicators(symbol, timeframe, limit, candles)
+            ohlcv_cache[(symbol, timeframe, limit)] = df
+        except Exception as e:
+            print(f"{symbol} 지표 계산 실패: {e}")
 
 
-def run_filters(fetch_ohlcv, timeframe, limit, mode, lookback_cross, direction):
-    global ohlcv_cache
+def prefetch_until(markets, timeframe, limit, cutoff, chunk=SCAN_CHUNK):
+    """
+    거래대금 순으로 chunk개씩 캔들 수집, cutoff(time.perf_counter 기준) 전에 끝날
+    것 같지 않으면 다음 묶음은 시작하지 않음 (첫 묶음은 항상 수집)
+    - 반환: 수집한 마켓 목록 (markets 앞부분)
+    """
+    done, last = 0, 0.0
+    while done < len(markets):
+        now = time.perf_counter()
+        if done and now + last > cutoff:
+            break
+        batch = [s for s, _ in markets[done : done + chunk]]
+        prefetch_ohlcv(batch, timeframe, limit)
+        last = time.perf_counter() - now
+        done += len(batch)
+    return markets[:done]
 
-    # 1) 거래량 상위 100
-    markets = top100_markets()
+
+def _scan_stages(
+    markets,
+    fetch_ohlcv,
+    timeframe,
+    limit,
+    mode,
+    lookback_cross,
+    direction,
+    scan,
+    prophet_executor,
+    prophet_validation,
+    forecaster,
+    fetch_cutoff,
+    deadline_at,
+):
+    """
+    단계별 실행 (scan="threads" / "matrix"): 각 단계가 전 심볼을 끝낸 뒤 다음 단계로
+    - 반환: (스캔한 마켓, 예측 대상 수, 예측 결과)
+    """
+    profiler = get_profiler()
+
+    # 유니버스 캔들 일괄 수집 (공유 async 클라이언트, 동시 요청 수 제한)
+    with profiler.stage("prefetch_ohlcv", n_in=len(markets)) as st:
+        if fetch_cutoff is None:
+            prefetch_ohlcv([s for s, _ in markets], timeframe, limit)
+            scanned = markets
+        else:
+            scanned = prefetch_until(markets, timeframe, limit, fetch_cutoff)
+        st["out"] = sum(1 for k in ohlcv_cache if k[1:] == (timeframe, limit))
 
     # 2) 변동성 좋은 절반 필터링
-    vol_top_half = filter_by_volatility(
-        markets, fetch_func=fetch_ohlcv, timeframe=timeframe, limit=limit
-    )
+    with profiler.stage("filter_by_volatility", n_in=len(scanned)) as st:
+        vol_filter = (
+            filter_by_volatility_matrix if scan == "matrix" else filter_by_volatility
+        )
+        vol_top_half = vol_filter(
+            scanned, fetch_func=fetch_ohlcv, timeframe=timeframe, limit=limit
+        )
+        st["out"] = len(vol_top_half)
 
     # 3) 기본 필터 적용 (롱/숏 동시 스캔).
-    filtered_by_basic = filter_by_basic(
-        vol_top_half,
-        fetch_func=fetch_ohlcv,
-        timeframe=timeframe,
-        limit=limit,
-        mode=mode,
-        lookback_cross=lookback_cross,
-    )
+    with profiler.stage("filter_by_basic", n_in=len(vol_top_half)) as st:
+        basic_filter = filter_by_basic_matrix if scan == "matrix" else filter_by_basic
+        filtered_by_basic = basic_filter(
+            vol_top_half,
+            fetch_func=fetch_ohlcv,
+            timeframe=timeframe,
+            limit=limit,
+            mode=mode,
+            lookback_cross=lookback_cross,
+        )
+        st["out"] = len(filtered_by_basic)
 
     # 기본 필터 통과 종목에 OHLCV 데이터와 보조지표 정보를 합쳐서 dict 형태로 정리
     enriched = []
@@ -50,15 +179,162 @@ def run_filters(fetch_ohlcv, timeframe, limit, mode, lookback_cross, direction):
         )
 
     # 4) Prophet 분석 적용하여 종목 5개 이상 시 추가 필터링 (이하는 전부 통과)
-    prophet_pass = analyze_with_prophet(
-        enriched,
-        fetch_func=fetch_ohlcv,
-        timeframe=timeframe,
-        limit=limit,
-        direction=direction,
+    forecast_stats = {"forecast_in": 0}
+    with profiler.stage("analyze_with_prophet", n_in=len(enriched)) as st:
+        prophet_pass = analyze_with_prophet(
+            enriched,
+            fetch_func=fetch_ohlcv,
+            timeframe=timeframe,
+            limit=limit,
+            direction=direction,
+            executor=prophet_executor,
+            validation=prophet_validation,
+            forecaster=forecaster,
+            deadline=deadline_at,
+            stats=forecast_stats,
+        )
+        st["out"] = len(prophet_pass)
+
+    return scanned, forecast_stats["forecast_in"], prophet_pass
+
+
+def run_filters(
+    fetch_ohlcv,
+    timeframe,
+    limit,
+    mode,
+    lookback_cross,
+    direction,
+    prophet_executor="thread",
+    prophet_validation="cv",
+    forecaster="prophet",
+    universe_size=50,
+    scan="threads",
+    deadline=None,
+    prescreen=None,
+    spread=None,
+    slippage_notional=None,
+):
+    """
+    scan: 변동성/기본 필터 실행 방식
+      "threads" 심볼별 작업을 스레드 풀로 (기존)
+      "matrix"  전 심볼을 (캔들 × 심볼) 행렬로 쌓아 배열 연산 몇 번으로 처리
+      "pipeline" 심볼마다 준비되는 대로 다음 단계로 (filters.pipeline, 단계 사이 대기 없음)
+    universe_size: 거래대금 상위 몇 개를 대상으로 할지 (None이면 조건을 만족하는 전체)
+    deadline: 사이클 시간 예산(초)
+      - 캔들은 거래대금 순으로 묶음 수집, FETCH_SHARE 비율을 넘기면 나머지는 이번 사이클 제외
+      - 예측은 마감 시각까지 끝난 종목만 사용
+      - 스캔한 범위는 last_coverage / 사이클 기록 "coverage"에 남김
+    prescreen: 티커 스냅샷 사전 선별로 남길 비율 (예: 0.5, None이면 사용 안 함)
+      - 24시간 변동폭/스프레드/거래대금 점수 상위만 캔들을 받음 (prescreen_by_ticker)
+    spread: 스프레드 필터로 남길 비율 (None이면 사용 안 함)
+      - 같은 티커 스냅샷의 bid/ask로 계산 → 추가 요청 없음
+    slippage_notional: 주문 금액(USDT), 주면 최종 후보만 호가 깊이로 예상 슬리피지 계산
+    """
+    profiler = get_profiler()
+    start = time.perf_counter()
+    deadline_at = None if deadline is None else start + deadline
+    # 이전 사이클 낙오 스레드가 끝에서 비운 뒤에 써 넣은 값이 있어도 버림
+    reset_ohlcv_cache()
+
+    # 1) 거래량 상위 100
+    with profiler.stage("top100_markets") as st:
+        tickers = fetch_tickers()
+        markets = top100_markets(top_n=universe_size, tickers=tickers)
+        st["out"] = len(markets)
+    eligible = len(markets)
+
+    # 1-1) 티커 스냅샷만으로 사전 선별 → 통과한 심볼만 캔들 다운로드
+    if prescreen:
+        with profiler.stage("prescreen_by_ticker", n_in=len(markets)) as st:
+            markets = prescreen_by_ticker(markets, tickers, keep=prescreen)
+            st["out"] = len(markets)
+
+    # 1-2) 스프레드 필터 (티커 스냅샷 bid/ask, 거래대금 순 유지)
+    if spread:
+        with profiler.stage("filter_by_spread", n_in=len(markets)) as st:
+            tight = {s for s, _, _ in filter_by_spread(markets, tickers, keep=spread)}
+            markets = [(s, v) for s, v in markets if s in tight]
+            st["out"] = len(markets)
+
+    universe = {s for s, _ in markets}
+    candle_store.retain(universe)
+    for key in [k for k in indicator_streams if k[0] not in universe]:
+        indicator_streams.pop(key, None)
+    model_cache.retain(universe)
+    model_cache.evict_expired()
+    validation_cache.retain(universe)
+
+    hits, misses = model_cache.hits, model_cache.misses
+    stragglers = 0
+    fetch_cutoff = None if deadline is None else start + deadline * FETCH_SHARE
+    if scan == "pipeline":
+        # 수집 → 변동성 → 기본 → 예측이 심볼 단위로 이어짐 (단계 사이 대기 없음)
+        with profiler.stage("scan_pipeline", n_in=len(markets)) as st:
+            prophet_pass, stats = run_pipeline(
+                markets,
+                fetch_func=fetch_ohlcv,
+                timeframe=timeframe,
+                limit=limit,
+                mode=mode,
+                lookback_cross=lookback_cross,
+                direction=direction,
+                forecaster=make_forecaster(
+                    forecaster, prophet_executor, prophet_validation
+                ),
+                fetch_cutoff=fetch_cutoff,
+                deadline=deadline_at,
+            )
+            st["out"] = len(prophet_pass)
+        scanned, forecast_in = stats["scanned"], stats["forecast_in"]
+        stragglers = stats["stragglers"]
+    else:
+        scanned, forecast_in, prophet_pass = _scan_stages(
+            markets,
+            fetch_ohlcv,
+            timeframe,
+            limit,
+            mode,
+            lookback_cross,
+            direction,
+            scan,
+            prophet_executor,
+            prophet_validation,
+            forecaster,
+            fetch_cutoff,
+            deadline_at,
+        )
+    profiler.record_cache(
+        "prophet_warm_start",
+        hits=model_cache.hits - hits,
+        misses=model_cache.misses - misses,
+    )
+
+    with profiler.stage("select_trading_candidates", n_in=len(prophet_pass)) as st:
+        final_candidates = select_trading_candidates(prophet_pass)
+        st["out"] = len(final_candidates)
+
+    if slippage_notional and final_candidates:
+        with profiler.stage("estimate_slippage", n_in=len(final_candidates)):
+            estimate_slippage(final_candidates, slippage_notional)
+
+    elapsed = time.perf_counter() - start
+    last_coverage.clear()
+    last_coverage.update(
+        eligible=eligible,
+        prescreened=len(markets),
+        scanned=len(scanned),
+        stragglers=stragglers,
+        ratio=len(scanned) / max(1, eligible),
+        forecast_in=forecast_in,
+        forecast_done=len(prophet_pass),
+        deadline=deadline,
+        elapsed=elapsed,
+        complete=deadline is None
+        or (len(scanned) == len(markets) and elapsed <= deadline),
     )
-    final_candidates = select_trading_candidates(prophet_pass)
+    profiler.annotate("coverage", dict(last_coverage))
 
-    ohlcv_cache.clear()  # 캐시 초기화
+    reset_ohlcv_cache()  # 지표 캐시 초기화 (캔들 원본은 candle_store에 유지)
 
     return final_candidates
@@ -0,0 +1,137 @@
+import warnings
+
+import numpy as np
+
+from filters.basic_filter import BASIC_COLUMNS, basic_signal_arrays
+
+# 횡단면(시간 × 심볼) 스캔
+# - filter_by_volatility / filter_by_basic과 입력/출력이 같은 행렬 버전
+# - 심볼마다 DataFrame을 자르는 대신 필요한 꼬리 구간만 (행 × 심볼) 배열로 쌓아서
+#   점수/판단/정렬을 배열 연산 몇 번으로 처리
+# - 두 함수 모두 심볼별 df.tail(...)을 쌓으므로 결과는 스레드 풀 버전과 같음
+#   (기본 필터는 basic_filter_df처럼 지표가 빈 행을 뺀 뒤 쌓음 → 마지막 유효 행 기준 판단)
+
+# basic_filter_df가 보는 최근 캔들 수 (df.iloc[-50:])
+BASIC_ROWS = 50
+
+
+def stack_tail(fetch_func, symbols, timeframe, limit, columns, rows, dropna=False):
+    """
+    심볼별 마지막 rows개 캔들을 (rows, 심볼수) 행렬로 쌓음
+    - 캔들이 모자란 심볼은 앞쪽을 NaN으로 채움
+    - dropna=True: 마지막 rows개 중 columns에 NaN이 있는 행을 빼고 뒤쪽으로 붙여 쌓음
+      (basic_filter_df의 df.iloc[-50:].dropna(subset=...)와 같은 행)
+    - 반환: (데이터가 있는 심볼 목록, {컬럼: 행렬})
+    """
+    kept, blocks = [], {c: [] for c in columns}
+    for s in symbols:
+        df = fetch_func(s, timeframe, limit)
+        if df is None or df.empty:
+            continue
+        tail = df.iloc[-rows:]
+        if dropna:
+            tail = tail.dropna(subset=list(columns))
+        kept.append(s)
+        for c in columns:
+            col = np.full(rows, np.nan)
+            values = tail[c].to_numpy(dtype=float)
+            col[rows - len(values) :] = values
+            blocks[c].append(col)
+
+    if not kept:
+        return [], {c: np.empty((rows, 0)) for c in columns}
+    return kept, {c: np.column_stack(blocks[c]) for c in columns}
+
+
+def filter_by_volatility_matrix(markets, fetch_func, timeframe, limit, window=20):
+    """filter_by_volatility 행렬 버전: (ATR + 밴드폭) × log(1 + 거래대금) 상위 절반"""
+    volumes = dict(markets)
+    symbols, m = stack_tail(
+        fetch_func,
+        [s for s, _ in markets],
+        timeframe,
+        limit,
+        ("ATR14", "BB_upper", "BB_lower"),
+        window,
+    )
+    if not symbols:
+        return []
+
+    # 전부 NaN인 심볼은 nanmean 경고 없이 NaN → 제외
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        atr = np.nanmean(m["ATR14"], axis=0)
+        band_width = np.nanmean(m["BB_upper"] - m["BB_lower"], axis=0)
+    vol = np.array([volumes[s] for s in symbols], dtype=float)
+    score = (atr + np.abs(band_width)) * np.log1p(vol)
+
+    valid = np.flatnonzero(~np.isnan(atr) & ~np.isnan(band_width))
+    order = valid[np.argsort(-score[valid], kind="stable")]
+    half = max(1, len(order) // 2)
+    return [
+        (
+            symbols[j],
+            volumes[symbols[j]],
+            float(atr[j]),
+            float(band_width[j]),
+            float(score[j]),
+        )
+        for j in order[:half]
+    ]
+
+
+def filter_by_basic_matrix(markets, fetch_func, timeframe, limit, mode, lookback_cross):
+    """filter_by_basic 행렬 버전: 전 심볼 롱/숏 판단을 한 번에, 거래대금 순 정렬"""
+    volumes = {item[0]: item[1] for item in markets}
+    symbols, m = stack_tail(
+        fetch_func,
+        list(volumes),
+        timeframe,
+        limit,
+        BASIC_COLUMNS,
+        BASIC_ROWS,
+        dropna=True,
+    )
+    if not symbols:
+        return []
+
+    signals = basic_signal_arrays(m, lookback_cross=lookback_cross)
+    last = {k: v[-1] for k, v in signals.items()}
+    decision = np.where(last["long"], "long", np.where(last["short"], "short", "none"))
+
+    if mode == "both":
+        picked = np.flatnonzero(decision != "none")
+    else:
+        picked = np.flatnonzero(decision == mode)
+    vol = np.array([volumes[symbols[j]] for j in picked], dtype=float)
+    picked = picked[np.argsort(-vol, kind="stable")]
+
+    return [
+        (symbols[j], volumes[symbols[j]], str(decision[j]), _explain(m, last, j))
+        for j in picked
+    ]
+
+
+def _explain(m, last, j):
+    """basic_filter_df의 explain dict와 같은 키/값"""
+    return {
+        "trend_up": bool(last["trend_up"][j]),
+        "trend_down": bool(last["trend_down"][j]),
+        "macd_bull": bool(last["macd_bull"][j]),
+        "macd_bear": bool(last["macd_bear"][j]),
+        "hist_up": bool(last["hist_up"][j]),
+        "hist_down": bool(last["hist_down"][j]),
+        "obv_up": bool(last["obv_up"][j]),
+        "obv_down": bool(last["obv_down"][j]),
+        "rsi_bull(50-70)": bool(last["rsi_bull"][j]),
+        "rsi_bear(30-50)": bool(last["rsi_bear"][j]),
+        "last_close": float(m["close"][-1, j]),
+        "last_SMA20": float(m["SMA20"][-1, j]),
+        "last_EMA20": float(m["EMA20"][-1, j]),
+        "prev_EMA20": float(m["EMA20"][-2, j]),
+        "last_RSI14": float(m["RSI14"][-1, j]),
+        "last_MACD": float(m["MACD"][-1, j]),
+        "last_MACD_signal": float(m["MACD_signal"][-1, j]),
+        "last_MACD_hist": float(m["MACD_hist"][-1, j]),
+        "last_OBV": float(m["OBV"][-1, j]),
+    }
@@ -0,0 +1,236 @@
+import bisect
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+from filters.basic_filter import evaluate_basic
+from filters.prophet_filter import (
+    ProphetForecaster,
+    _completed_until,
+    _make_record,
+    _prepare,
+    get_forecaster,
+)
+from filters.volatility_filter import get_vol_metrics
+from utils.profiling import get_profiler
+
+# 스트리밍 스캔 (run_filters(scan="pipeline"))
+# - 심볼마다 캔들 수집 → 변동성 점수 → (컷 통과 시) 기본 필터 → 예측 제출이 준비되는 대로 진행
+# - 전역 단계는 두 곳뿐: 변동성 상위 절반 컷(TopHalfReducer), 최종 상위 5개(select_trading_candidates)
+# - 결과는 barrier 버전(prefetch → 변동성 → 기본 → 예측)과 같음, 낙오자 컷이 걸린 경우만 예외
+
+# 캔들 수집/변동성 점수 동시 작업 수 (MarketDataService 동시 요청 상한과 같게)
+SCAN_WORKERS = 20
+
+# 전체의 QUORUM 비율이 도착한 뒤로는 STRAGGLER_WAIT초까지만 나머지를 기다림
+QUORUM = 0.9
+STRAGGLER_WAIT = 5.0
+
+
+class TopHalfReducer:
+    """
+    filter_by_volatility의 "점수 상위 절반" 컷을 결과가 오는 대로 부분 순위로 판정
+    - 아직 안 온 심볼 u개가 전부 유효하고 더 높은 점수라고 가정해도
+      순위 r + u ≤ max(1, (n + u) // 2)이면 최종 컷 안에 드는 것이 확실 → 즉시 내보냄
+    - finish(): 남은 심볼은 없는 것으로 보고 확정 (컷 = max(1, 유효 심볼 수 // 2))
+    """
+
+    def __init__(self, total):
+        self.unseen = total
+        self._ranked = []  # (-점수, 도착 순서, 행)
+        self._released = set()
+        self._seq = 0
+
+    def add(self, row):
+        """row: get_vol_metrics 기반 (s, v, atr, band_width, score) 또는 None(데이터 없음)"""
+        self.unseen -= 1
+        if row is not None:
+            self._seq += 1
+            bisect.insort(self._ranked, (-row[4], self._seq, row))
+        return self._release()
+
+    def finish(self):
+        self.unseen = 0
+        return self._release()
+
+    def _release(self):
+        # 확정 구간(순위 앞부분)에서 아직 안 내보낸 심볼만
+        # (나중에 온 높은 점수가 앞에 끼어들 수 있어 위치가 아니라 심볼로 추적)
+        k_max = max(1, (len(self._ranked) + self.unseen) // 2)
+        confirmed = max(0, min(len(self._ranked), k_max - self.unseen))
+        out = []
+        for _, _, row in self._ranked[:confirmed]:
+            if row[0] not in self._released:
+                self._released.add(row[0])
+                out.append(row)
+        return out
+
+
+def _vol_row(fetch_func, symbol, volume, timeframe, limit, window):
+    metrics = get_vol_metrics(fetch_func, symbol, timeframe, limit, window)
+    if metrics is None:
+        return None
+    atr, band_width, vol_score = metrics
+    return (symbol, volume, atr, band_width, vol_score * np.log1p(volume))
+
+
+def run_pipeline(
+    markets,
+    fetch_func,
+    timeframe,
+    limit,
+    mode,
+    lookback_cross,
+    direction,
+    forecaster,
+    fetch_cutoff=None,
+    deadline=None,
+    window=20,
+):
+    """
+    markets: [(symbol, quoteVolume)] 거래대금 순
+    forecaster: get_forecaster 결과 (ProphetForecaster면 후보가 생기는 즉시 제출)
+    fetch_cutoff / deadline: time.perf_counter 기준 수집 마감 / 전체 마감
+    반환: (예측 결과 레코드 목록, 통계 dict)
+    """
+    reducer = TopHalfReducer(len(markets))
+    streaming = isinstance(forecaster, ProphetForecaster)
+    stats = {"scanned": [], "basic_in": 0, "forecast_in": 0, "stragglers": 0}
+    items, series, jobs = {}, {}, {}
+
+    forecast_pool = None
+    if streaming:
+        forecaster.begin()
+        forecast_pool = forecaster.make_pool()
+
+    def admit(rows):
+        # 변동성 컷 통과 → 기본 필터 → 예측 입력 준비 → 제출
+        for s, v, *_ in rows:
+            stats["basic_in"] += 1
+            try:
+                _, decision, explain = evaluate_basic(
+                    fetch_func, s, timeframe, limit, lookback_cross
+                )
+            except Exception as e:
+                print(f"[기본필터 오류] {s}: {e}")
+                continue
+            if decision == "none" or (mode != "both" and decision != mode):
+                continue
+            item = {
+                "symbol": s,
+                "volume": v,
+                "signal": decision,
+                "info": explain,
+                "ohlcv": fetch_func(s, timeframe, limit),
+            }
+            try:
+                prepared = _prepare(item, fetch_func, timeframe, limit, direction)
+            except Exception as e:
+                print(f"{s} 예측 입력 준비 실패: {e}")
+                continue
+            if prepared is None:
+                continue
+            # 예측 대상 수는 방향 필터(_prepare) 통과 기준 (barrier 버전과 같은 기준)
+            stats["forecast_in"] += 1
+            items[s] = item
+            if streaming:
+                fut, job = forecaster.submit(forecast_pool, s, *prepared)
+                jobs[fut] = job
+            else:
+                series[s] = prepared
+
+    try:
+        _scan(
+            markets,
+            fetch_func,
+            timeframe,
+            limit,
+            window,
+            reducer,
+            admit,
+            stats,
+            fetch_cutoff,
+        )
+        forecasts = _collect(forecaster, forecast_pool, jobs, series, deadline)
+    finally:
+        if forecast_pool is not None:
+            forecaster.release_pool(forecast_pool, jobs, wait=deadline is None)
+
+    # 거래대금 순으로 정리 (barrier 버전과 같은 순서 → 같은 점수일 때 같은 후보)
+    records = []
+    for s, (summary, raw) in forecasts.items():
+        if summary.get("mape") is None:
+            summary.pop("mape", None)
+        records.append(_make_record(items[s], summary, raw=raw))
+    records.sort(key=lambda r: r["volume"], reverse=True)
+    return records, stats
+
+
+def _scan(markets, fetch_func, timeframe, limit, window, reducer, admit, stats, cutoff):
+    """캔들 수집 + 변동성 점수 (심볼별로 끝나는 대로 reducer → admit)"""
+    profiler = get_profiler()
+    fetch_pool = ThreadPoolExecutor(max_workers=SCAN_WORKERS)
+    try:
+        pending = {
+            fetch_pool.submit(
+                profiler.wrap("volatility", s, _vol_row),
+                fetch_func,
+                s,
+                v,
+                timeframe,
+                limit,
+                window,
+            ): (s, v)
+            for s, v in markets
+        }
+        quorum_at = None
+        while pending:
+            now = time.perf_counter()
+            limits = [t for t in (cutoff, quorum_at) if t is not None]
+            timeout = max(0.0, min(limits) - now) if limits else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                break  # 수집 마감 또는 낙오자 대기 시간 초과
+            for fut in done:
+                s, v = pending.pop(fut)
+                try:
+                    row = fut.result()
+                except Exception as e:
+                    print(f"[변동성 오류] {s}: {e}")
+                    row = None
+                stats["scanned"].append((s, v))
+                admit(reducer.add(row))
+            if quorum_at is None and len(pending) <= len(markets) * (1 - QUORUM):
+                quorum_at = time.perf_counter() + STRAGGLER_WAIT
+
+        stats["stragglers"] = len(pending)
+        admit(reducer.finish())
+    finally:
+        fetch_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _collect(forecaster, pool, jobs, series, deadline):
+    """예측 결과 수집: 스트리밍 제출분은 끝나는 대로, 일괄 예측기는 여기서 한 번에"""
+    if pool is None:
+        if not series:
+            return {}
+        return forecaster.forecast_batch(
+            series, forecast_hours=24, freq="15min", deadline=deadline
+        )
+
+    forecasts = {}
+    for fut in _completed_until(jobs, deadline):
+        s = jobs[fut][0]
+        try:
+            forecasts[s] = forecaster.collect(fut, jobs[fut])
+        except Exception as e:
+            print(f"{s} Prophet 분석 실패: {e}")
+    return forecasts
+
+
+def make_forecaster(forecaster, executor, validation):
+    """run_filters 설정값 → 예측기 객체 (analyze_with_prophet과 같은 규칙)"""
+    if forecaster == "prophet":
+        return get_forecaster("prophet", executor=executor, validation=validation)
+    return get_forecaster(forecaster)
@@ -1,92 +1,417 @@
+import os
 import random
-from utils.price_forecast import run_prophet_analysis
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import time
+import multiprocessing
+import pandas as pd
+from utils.price_forecast import (
+    load_prophet,
+    run_prophet_analysis,
+    ProphetModelCache,
+    ValidationCache,
+)
+from utils.forecasters import VectorizedForecaster
+from utils.profiling import get_profiler
+from concurrent.futures import (
+    ThreadPoolExecutor,
+    ProcessPoolExecutor,
+    TimeoutError as FuturesTimeoutError,
+    as_completed,
+)
+from concurrent.futures.process import BrokenProcessPool
 
+# 심볼별 Prophet 파라미터 캐시 (다음 사이클 warm start)
+model_cache = ProphetModelCache()
 
-def analyze_with_prophet(filtered, fetch_func, timeframe, limit, direction):
-    prophet_results = []
+# validation="cached_cv"일 때 심볼별 교차 검증 MAPE 캐시
+validation_cache = ValidationCache()
+
+
+def summarize_forecast(results):
+    """run_prophet_analysis 결과에서 후보 선정(select_trading_candidates)이 읽는 값만 추출"""
+    forecast_summary = results["forecast_summary"]
+    future_part = forecast_summary.tail(24)
+
+    last_yhat = future_part["예측가격(중앙값, USDT)"].iloc[-1]
+    start_yhat = future_part["예측가격(중앙값, USDT)"].iloc[0]
+
+    # 검증을 생략한 경우(캐시된 MAPE 사용) MAPE는 None
+    performance = results["performance_summary"]
+    mape = None
+    if performance is not None:
+        mape = float(performance.iloc[0]["평균절대백분율오차(MAPE)"])
+
+    return {
+        "forecast_yhat": float(last_yhat),
+        "forecast_lower": float(future_part["예상최저가(USDT)"].iloc[-1]),
+        "forecast_upper": float(future_part["예상최고가(USDT)"].iloc[-1]),
+        "forecast_avg": float(future_part["예측가격(중앙값, USDT)"].mean()),
+        "forecast_max": float(future_part["예측가격(중앙값, USDT)"].max()),
+        "forecast_min": float(future_part["예측가격(중앙값, USDT)"].min()),
+        "forecast_trend_dir": "상승" if last_yhat > start_yhat else "하락",
+        "trend": float(results["trend_summary"].iloc[-1]["추세선(USDT)"]),
+        "mape": mape,
+    }
+
+
+def forecast_worker(symbol, ds, y, forecast_hours, freq, init=None, validation="cv"):
+    """
+    프로세스 풀 작업 단위 (모듈 최상위 함수여야 pickle 가능)
+    - 입력: ds/y 배열 + warm start 파라미터만 전달 (DataFrame 전체 X)
+    - 출력: 스칼라 요약값 dict + 학습 파라미터 + (wall, CPU) 시간 (예측 DataFrame X)
+    """
+    wall, cpu = time.perf_counter(), time.process_time()
+    df = pd.DataFrame({"ds": ds, "y": y})
+    results = run_prophet_analysis(
+        df, forecast_hours=forecast_hours, freq=freq, init=init, validation=validation
+    )
+    timing = (time.perf_counter() - wall, time.process_time() - cpu)
+    return symbol, summarize_forecast(results), results["model_params"], timing
+
+
+def _prepare(item, fetch_func, timeframe, limit, direction):
+    """방향 사전 필터 + Prophet 입력(ds, y) 준비. 대상이 아니면 None"""
+    s = item["symbol"]
+    decision = item["signal"].upper()
+
+    # LONG/SHORT 사전 필터링
+    if direction == "long" and decision != "LONG":
+        return None
+    if direction == "short" and decision != "SHORT":
+        return None
+
+    # ohlcv 캐시 우선
+    df = item.get("ohlcv")
+    if df is None:
+        df = fetch_func(s, timeframe, limit)
+
+    if df is None or "close" not in df.columns:
+        return None
 
-    def worker(item):
-        s = item["symbol"]
-        v = item["volume"]
-        decision = item["signal"].upper()
-        info = item["info"]
+    return df["ds"].to_numpy(), df["close"].to_numpy(dtype=float)
 
-        # LONG/SHORT 사전 필터링
-        if direction == "long" and decision != "LONG":
-            return None
-        if direction == "short" and decision != "SHORT":
-            return None
 
+def _plan_validation(symbol, validation):
+    """
+    심볼별 실제 검증 방식 결정
+    - "cached_cv": 캐시된 MAPE가 유효하면 검증 생략("none"), 아니면 교차 검증
+    - 반환: (워커에 넘길 검증 방식, 캐시된 MAPE 또는 None)
+    """
+    if validation != "cached_cv":
+        return validation, None
+    cached = validation_cache.get(symbol)
+    if cached is not None:
+        return "none", cached
+    return "cv", None
+
+
+def _finish_summary(symbol, summary, validation, cached_mape):
+    """캐시 MAPE 채우기 / 새로 계산한 MAPE 캐시에 저장"""
+    if cached_mape is not None:
+        summary["mape"] = cached_mape
+    elif validation == "cached_cv":
+        validation_cache.put(symbol, summary["mape"])
+    return summary
+
+
+def _completed_until(futures, deadline):
+    """
+    as_completed + 마감 시각(time.perf_counter 기준)
+    - 마감이 지나면 남은 작업은 기다리지 않고 끝냄 (끝난 것만 반환)
+    """
+    timeout = None if deadline is None else max(0.0, deadline - time.perf_counter())
+    try:
+        yield from as_completed(futures, timeout=timeout)
+    except FuturesTimeoutError:
+        pending = sum(not f.done() for f in futures)
+        print(f"예측 마감: {pending}개 심볼 미완료, 완료된 결과만 사용")
+
+
+def _make_record(item, summary, raw=None):
+    record = {
+        "symbol": item["symbol"],
+        "volume": item["volume"],
+        "signal": item["signal"].upper(),
+        "last_price": item["info"].get("last_close"),
+    }
+    record.update(summary)
+    if raw is not None:
+        record["raw"] = raw
+    record.update(item["info"])
+    return record
+
+
+def _process_context():
+    """
+    Prophet 프로세스 풀 시작 방식
+    - forkserver: 단일 스레드 서버 프로세스에서 워커를 fork (메인 프로세스 스레드/락 상속 없음)
+      서버가 prophet을 미리 import → 워커마다 import 비용 없음
+    - forkserver가 없는 플랫폼은 spawn
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    ctx = multiprocessing.get_context("forkserver")
+    ctx.set_forkserver_preload(
+        ["filters.prophet_filter", "prophet", "prophet.diagnostics"]
+    )
+    return ctx
+
+
+# 사이클 간 유지하는 프로세스 풀 {워커 수: 풀}
+# - forkserver 워커도 실행 스크립트(main.py)를 __mp_main__으로 다시 import함
+#   (Python 3.11 forkserver는 "__main__" preload를 무시) → 사이클마다 새 풀을 만들면
+#   워커마다 main.py 의존성 import가 매 사이클 반복되므로 봇 실행 동안 한 번만
+_process_pools = {}
+_process_pools_lock = threading.Lock()
+
+
+def _shared_process_pool(workers):
+    """워커 수별 공유 프로세스 풀 (처음 쓸 때 생성, 워커는 제출할 때 필요한 만큼 생성)"""
+    with _process_pools_lock:
+        pool = _process_pools.get(workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=_process_context()
+            )
+            _process_pools[workers] = pool
+        return pool
+
+
+# 마감으로 기다리지 않고 두고 온 예측 작업 (다음 사이클 시작 때 아직 실행 중인지 확인)
+_abandoned = []
+
+
+def _busy_stragglers():
+    """이전 사이클에서 두고 온 작업 중 아직 실행 중인 수 (끝난 것은 목록에서 제거)"""
+    _abandoned[:] = [f for f in _abandoned if not f.done()]
+    return len(_abandoned)
+
+
+def _discard_process_pool(workers):
+    """워커가 죽어 깨진 풀은 버림 → 다음 make_pool에서 새로 생성"""
+    with _process_pools_lock:
+        pool = _process_pools.pop(workers, None)
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+class ProphetForecaster:
+    """
+    Prophet 예측기
+    - executor="thread": 스레드 풀 (전체 결과 raw 포함)
+    - executor="process": CPU 코어 수 크기의 프로세스 풀 (GIL 회피, 요약값만 주고받음)
+    - validation: MAPE 계산 방식
+        "cv"          전체 교차 검증 (기존, 가장 비쌈)
+        "parallel_cv" 교차 검증 cutoff 병렬 실행
+        "holdout"     마지막 6시간 홀드아웃 1회 (교차 검증 없이 MAPE 산출)
+        "cached_cv"   교차 검증 MAPE를 심볼별로 캐시, validation_cache.every 사이클마다 재계산
+    """
+
+    name = "prophet"
+
+    def __init__(self, executor="thread", max_workers=None, validation="cv"):
+        self.executor = executor
+        self.max_workers = max_workers
+        self.validation = validation
+
+    def forecast_batch(self, series, forecast_hours=24, freq="15min", deadline=None):
+        """
+        series: {symbol: (ds 배열, y 배열)} → {symbol: (요약 dict, raw 또는 None)}
+        - deadline: time.perf_counter 기준 마감 시각, 넘으면 끝난 심볼만 반환
+          (series 순서대로 제출하므로 앞쪽 심볼이 먼저 처리됨)
+        """
+        self.begin()
+        out = {}
+        pool = self.make_pool()
+        futures = {}
         try:
-            # ohlcv 캐시 우선
-            df = item.get("ohlcv")
-            if df is None:
-                df = fetch_func(s, timeframe, limit)
+            for s, (ds, y) in series.items():
+                fut, job = self.submit(pool, s, ds, y, forecast_hours, freq)
+                futures[fut] = job
+            for fut in _completed_until(futures, deadline):
+                s = futures[fut][0]
+                try:
+                    out[s] = self.collect(fut, futures[fut])
+                except Exception as e:
+                    print(f"{s} Prophet 분석 실패: {e}")
+        finally:
+            self.release_pool(pool, futures, wait=deadline is None)
+        return out
 
-            if df is None or "close" not in df.columns:
-                return None
+    # --- 심볼 단위 제출 (forecast_batch / filters.pipeline 공통) ---
+    def begin(self):
+        """사이클 시작 시 1회: 검증 캐시 사이클 진행 + prophet import"""
+        if self.validation == "cached_cv":
+            validation_cache.next_cycle()
+        if self.executor != "process":
+            load_prophet()  # 프로세스 풀 워커는 forkserver가 미리 import (_process_context)
 
-            df_for_prophet = df.rename(columns={"close": "y"})[["ds", "y"]]
-            results = run_prophet_analysis(
-                df_for_prophet, forecast_hours=24, freq="15min"
+    def make_pool(self):
+        """
+        executor 설정에 맞는 풀 생성
+        - process: 코어 수 크기의 공유 풀 (사이클 간 유지, _shared_process_pool)
+          forkserver(없으면 spawn) 워커 (메인 프로세스에는 시세/갱신/주문 스레드가 돌고 있어
+          fork하면 잠긴 락을 물려받을 수 있음), 워커는 제출할 때 필요한 만큼 생성됨
+          이전 사이클 마감 후에도 도는 작업이 있으면 새 작업은 그 뒤에 줄 섬 (코어 초과 없음)
+        - thread: 전체 결과 raw 포함, 사이클마다 새 풀
+          이전 사이클에서 아직 도는 작업 수만큼 스레드 수를 줄임 (합계가 설정값을 넘지 않도록)
+        - 다 쓴 풀은 release_pool로 반납
+        """
+        busy = _busy_stragglers()
+        if self.executor == "process":
+            if busy:
+                print(f"이전 사이클 예측 {busy}개 아직 실행 중: 새 작업은 그 뒤에 처리")
+            return _shared_process_pool(self._process_workers())
+        workers = self.max_workers or 20
+        if busy:
+            print(
+                f"이전 사이클 예측 {busy}개 아직 실행 중: 스레드 {workers} → {max(1, workers - busy)}"
             )
+        return ThreadPoolExecutor(max_workers=max(1, workers - busy))
 
-            forecast_summary = results["forecast_summary"]
-            last_price = info.get("last_close")
-
-            future_part = forecast_summary.tail(24)
-
-            last_yhat = future_part["예측가격(중앙값, USDT)"].iloc[-1]
-            lower = future_part["예상최저가(USDT)"].iloc[-1]
-            upper = future_part["예상최고가(USDT)"].iloc[-1]
-            avg_yhat = future_part["예측가격(중앙값, USDT)"].mean()
-            max_yhat = future_part["예측가격(중앙값, USDT)"].max()
-            min_yhat = future_part["예측가격(중앙값, USDT)"].min()
-
-            start_yhat = future_part["예측가격(중앙값, USDT)"].iloc[0]
-            trend_dir = "상승" if last_yhat > start_yhat else "하락"
-
-            trend = results["trend_summary"].iloc[-1]["추세선(USDT)"]
-            mape = results["performance_summary"].iloc[0]["평균절대백분율오차(MAPE)"]
-
-            record = {
-                "symbol": s,
-                "volume": v,
-                "signal": decision,
-                "last_price": last_price,
-                "forecast_yhat": last_yhat,
-                "forecast_lower": lower,
-                "forecast_upper": upper,
-                "forecast_avg": avg_yhat,
-                "forecast_max": max_yhat,
-                "forecast_min": min_yhat,
-                "forecast_trend_dir": trend_dir,
-                "trend": trend,
-                "mape": mape,
-                "raw": results,
-            }
-            record.update(info)
-            return record
+    def _process_workers(self):
+        return self.max_workers or os.cpu_count() or 1
+
+    def release_pool(self, pool, futures, wait):
+        """
+        make_pool로 받은 풀 반납
+        - wait=False (마감): 아직 시작 안 한 작업은 취소, 실행 중인 작업은 백그라운드에서 끝남
+          (끝날 때까지 _abandoned에 남겨 다음 make_pool이 반영)
+        - process: 공유 풀은 닫지 않음 (남은 작업만 취소)
+        """
+        for fut in futures:
+            if not fut.cancel() and not fut.done():
+                _abandoned.append(fut)
+        if self.executor != "process":
+            pool.shutdown(wait=wait, cancel_futures=True)
 
+    def submit(self, pool, symbol, ds, y, forecast_hours=24, freq="15min"):
+        """심볼 1개 예측 제출 → (future, job), 결과는 collect(future, job)로"""
+        job_validation, cached_mape = _plan_validation(symbol, self.validation)
+        if self.executor == "process":
+            fut = pool.submit(
+                forecast_worker,
+                symbol,
+                ds,
+                y,
+                forecast_hours,
+                freq,
+                model_cache.get(symbol),
+                job_validation,
+            )
+        else:
+            worker = get_profiler().wrap("prophet", symbol, self._thread_worker)
+            fut = pool.submit(
+                worker, symbol, ds, y, forecast_hours, freq, job_validation
+            )
+        return fut, (symbol, cached_mape)
+
+    def collect(self, fut, job):
+        """완료된 future → (요약 dict, raw 또는 None), 파라미터/MAPE 캐시 반영"""
+        symbol, cached_mape = job
+        if self.executor == "process":
+            try:
+                _, summary, params, (wall, cpu) = fut.result()
+            except BrokenProcessPool:
+                _discard_process_pool(self._process_workers())
+                raise
+            get_profiler().add_symbol("prophet", symbol, wall, cpu)
+            raw = None
+        else:
+            summary, params, raw = fut.result()
+        model_cache.put(symbol, params)
+        summary = _finish_summary(symbol, summary, self.validation, cached_mape)
+        return summary, raw
+
+    @staticmethod
+    def _thread_worker(symbol, ds, y, forecast_hours, freq, validation):
+        df = pd.DataFrame({"ds": ds, "y": y})
+        results = run_prophet_analysis(
+            df,
+            forecast_hours=forecast_hours,
+            freq=freq,
+            init=model_cache.get(symbol),
+            validation=validation,
+        )
+        return summarize_forecast(results), results["model_params"], results
+
+
+def get_forecaster(name="prophet", **options):
+    """
+    설정 이름으로 예측기 생성
+    - "prophet": ProphetForecaster(executor, max_workers, validation)
+    - "fast": NumPy 벡터화 선형추세+지수평활 (후보 전체를 한 번에 계산)
+    """
+    if name == "prophet":
+        return ProphetForecaster(**options)
+    if name == "fast":
+        return VectorizedForecaster()
+    raise ValueError(f"알 수 없는 예측기: {name}")
+
+
+def analyze_with_prophet(
+    filtered,
+    fetch_func,
+    timeframe,
+    limit,
+    direction,
+    executor="thread",
+    max_workers=None,
+    validation="cv",
+    forecaster="prophet",
+    deadline=None,
+    stats=None,
+):
+    """
+    기본 필터 통과 종목에 가격 예측 적용
+    - forecaster: "prophet"(기본) 또는 "fast" (get_forecaster 참고)
+    - executor / max_workers / validation: ProphetForecaster 옵션
+    - deadline: time.perf_counter 기준 마감 시각 (넘으면 예측이 끝난 종목만 반환)
+    - stats: dict를 주면 "forecast_in"에 실제 예측에 넘긴 종목 수 기록 (방향 필터 이후)
+    """
+    jobs = {}
+    for item in filtered:
+        try:
+            prepared = _prepare(item, fetch_func, timeframe, limit, direction)
         except Exception as e:
-            print(f"{s} Prophet 분석 실패: {e}")
-            return None
+            print(f"{item['symbol']} 예측 입력 준비 실패: {e}")
+            continue
+        if prepared is not None:
+            jobs[item["symbol"]] = (item, prepared)
 
-    # 병렬 실행
-    with ThreadPoolExecutor(max_workers=20) as executor:
-        futures = [executor.submit(worker, item) for item in filtered]
-        for fut in as_completed(futures):
-            res = fut.result()
-            if res:
-                prophet_results.append(res)
+    if stats is not None:
+        stats["forecast_in"] = len(jobs)
+    if not jobs:
+        return []
 
+    if forecaster == "prophet":
+        model = get_forecaster(
+            "prophet", executor=executor, max_workers=max_workers, validation=validation
+        )
+    else:
+        model = get_forecaster(forecaster)
+
+    series = {s: prepared for s, (_, prepared) in jobs.items()}
+    forecasts = model.forecast_batch(
+        series, forecast_hours=24, freq="15min", deadline=deadline
+    )
+
+    prophet_results = []
+    for s, (summary, raw) in forecasts.items():
+        if summary.get("mape") is None:
+            summary.pop("mape", None)  # 점수 계산 시 기본값(1.0) 사용
+        prophet_results.append(_make_record(jobs[s][0], summary, raw=raw))
     return prophet_results
 
 
 # 후보 선정 함수
-def select_trading_candidates(results):
+def select_trading_candidates(results, range_band=(0.1, 0.5)):
+    """
+    range_band: 예측구간 안 진입 위치 가산점 구간 (LONG 기준, SHORT는 대칭 구간)
+    """
     final_candidates = []
+    long_lo, long_hi = range_band
+    short_lo, short_hi = 1 - long_hi, 1 - long_lo
 
     for r in results:
         try:
@@ -116,11 +441,13 @@ def select_trading_candidates(results):
                 range_position = (
                     (price - lower) / (upper - lower) if upper != lower else 0.5
                 )
-                if signal == "LONG" and 0.1 <= range_position <= 0.5:  # 하단 진입 유리
+                if (
+                    signal == "LONG" and long_lo <= range_position <= long_hi
+                ):  # 하단 진입 유리
                     base_score += 1
                     bonus_score += 0.5
                 elif (
-                    signal == "SHORT" and 0.5 <= range_position <= 0.9
+                    signal == "SHORT" and short_lo <= range_position <= short_hi
                 ):  # 상단 진입 유리
                     base_score += 1
                     bonus_score += 0.5
@@ -206,9 +533,8 @@ def select_trading_candidates(results):
     final_candidates = sorted(final_candidates, key=lambda x: x["_점수"], reverse=True)
     top_candidates = final_candidates[:5]
 
-    # 점수 제거 (AI에게 점수 기반 판단 내리지 않게)
-    for c in top_candidates:
-        c.pop("_점수", None)
+    # "_점수"는 남겨 둠: AI 프롬프트에서는 빠지고(utils.bot.compact_candidates),
+    # AI 응답이 없을 때 로컬 대체 결정(utils.decision_service.local_decision)에 사용
 
     random.shuffle(top_candidates)
 
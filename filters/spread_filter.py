@@ -1,53 +1,107 @@
-import os
-import ccxt
-from dotenv import load_dotenv
+import math
+from concurrent.futures import ThreadPoolExecutor
 
-load_dotenv()
+from filters.ticker_filter import spread_pct
+from utils.account_state import get_account_state
+from utils.exchange import create_binance
 
-api_key = os.getenv("BINANCE_API_KEY")
-secret_key = os.getenv("BINANCE_SECRET_KEY")
-
-binance = ccxt.binance(
-    config={
-        "apiKey": api_key,
-        "secret": secret_key,
-        "enableRateLimit": True,
-        "options": {"defaultType": "spot"},
-    }
-)
+binance = create_binance()
 
 
 # 스프레드 계산
 # 스프레드 = 매도 1호가(ask)와 매수 1호가(bid)의 가격 차이를 퍼센트로 나타낸 값 (거래 효율성 지표)
 # 스프레드가 작을수록 유동성이 높고, 진입/청산 시 불필요한 손실(슬리피지)이 적다
-# 지금 상황에서는 굳이 필요가 없고 연산 속도를 느리게 하므로 사용하지 않음.
+# 예전에는 심볼마다 fetch_order_book을 순서대로 불러 스캔이 느려져서 꺼 두었음
+# → 전 심볼 최우선 호가를 요청 1번(티커 스냅샷 또는 bookTicker)으로 받아 계산
+def get_spreads(symbols, tickers=None):
+    """
+    심볼별 스프레드(%) 일괄 계산
+    - tickers: 이미 받은 fetch_tickers() 결과가 있으면 추가 요청 없이 그 bid/ask 사용
+    - 없으면 fetch_bids_asks (Binance bookTicker, 전 심볼 1회 요청)
+    """
+    if tickers is None:
+        try:
+            get_account_state().share_markets(binance)
+            tickers = binance.fetch_bids_asks(list(symbols))
+        except Exception as e:
+            print(f"Error fetching bids/asks: {e}")
+            return {}
+
+    spreads = {}
+    for symbol in symbols:
+        t = tickers.get(symbol)
+        spread = spread_pct(t.get("bid"), t.get("ask")) if t else None
+        if spread is not None:
+            spreads[symbol] = spread
+    return spreads
+
+
 def get_spread(symbol):
-    try:
-        orderbook = binance.fetch_order_book(symbol, limit=5)
-        bid = orderbook["bids"][0][0] if orderbook["bids"] else None
-        ask = orderbook["asks"][0][0] if orderbook["asks"] else None
-        if bid and ask:
-            spread = (ask - bid) / ((ask + bid) / 2) * 100
-            return spread
-    except Exception as e:
-        print(f"Error fetching orderbook for {symbol}: {e}")
-    return None
+    return get_spreads([symbol]).get(symbol)
 
 
 # 스프레드 좋은 상위 종목 추리기
-def filter_by_spread(markets):
+def filter_by_spread(markets, tickers=None, keep=0.5, max_spread=None):
     """
     인자로 받은 마켓 리스트에서 스프레드 기준으로 상위 절반 추리기
+    - keep: 남길 비율 (기본 절반), max_spread: 스프레드(%) 상한 (None이면 제한 없음)
+    - 반환: [(symbol, volume, spread)] 스프레드 오름차순
     """
-    spreads = []
-    for symbol, volume in markets:
-        spread = get_spread(symbol)
-        if spread is not None:
-            spreads.append((symbol, volume, spread))
+    spreads = get_spreads([s for s, _ in markets], tickers)
+    rows = [(s, v, spreads[s]) for s, v in markets if s in spreads]
+    if max_spread is not None:
+        rows = [r for r in rows if r[2] <= max_spread]
 
     # 스프레드 기준 오름차순 정렬
-    sorted_spreads = sorted(spreads, key=lambda x: x[2])
+    sorted_spreads = sorted(rows, key=lambda x: x[2])
+
+    # 리스트 절반만 반환 (1개 이상이면 최소 1개는 남김)
+    n_keep = max(1, math.ceil(len(sorted_spreads) * keep))
+    return sorted_spreads[:n_keep]
+
+
+def depth_slippage(orderbook, notional, side="buy"):
+    """
+    호가 깊이 기준 시장가 체결 비용 (중간가 대비 %)
+    - notional(USDT)만큼 매수(asks) / 매도(bids) 호가를 차례로 소진했을 때 평균 체결가로 계산
+    - 호가가 모자라 다 체결되지 않으면 None
+    """
+    bids, asks = orderbook["bids"], orderbook["asks"]
+    if not bids or not asks:
+        return None
+    mid = (bids[0][0] + asks[0][0]) / 2
+    levels = asks if side == "buy" else bids
+
+    remaining, cost, qty = notional, 0.0, 0.0
+    for price, amount in levels:
+        take = min(remaining, price * amount)
+        cost += take
+        qty += take / price
+        remaining -= take
+        if remaining <= 0:
+            break
+    if remaining > 0 or qty == 0:
+        return None
+    return abs(cost / qty - mid) / mid * 100
+
+
+def estimate_slippage(candidates, notional, limit=20):
+    """
+    최종 후보(select_trading_candidates 결과)만 호가 깊이를 조회해서
+    candidate["예상슬리피지(%)"]에 기록 (후보 수만큼만 요청)
+    """
+
+    def worker(c):
+        side = "buy" if "LONG" in c["신호"] else "sell"
+        try:
+            book = binance.fetch_order_book(c["종목"], limit=limit)
+            slippage = depth_slippage(book, notional, side)
+        except Exception as e:
+            print(f"Error fetching orderbook for {c['종목']}: {e}")
+            slippage = None
+        c["예상슬리피지(%)"] = round(slippage, 4) if slippage is not None else None
 
-    # 리스트 절반만 반환
-    half = len(sorted_spreads) // 2
-    return sorted_spreads[:half]
+    get_account_state().share_markets(binance)
+    with ThreadPoolExecutor(max_workers=max(1, len(candidates))) as executor:
+        list(executor.map(worker, candidates))
+    return candidates
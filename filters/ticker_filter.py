@@ -0,0 +1,61 @@
+import math
+
+# 티커 스냅샷 사전 선별
+# - top100_markets가 이미 받은 fetch_tickers() 결과(24시간 고가/저가/종가/호가)만으로
+#   변동성/유동성/스프레드를 평가해서 캔들(OHLCV) 다운로드 대상을 줄임
+# - 점수는 filter_by_volatility와 같은 형태: 변동성(%) × log(1 + 거래대금)
+
+
+def spread_pct(bid, ask):
+    """최우선 호가 스프레드 (중간가 대비 %), 호가가 없거나 역전이면 None"""
+    if not bid or not ask or ask < bid:
+        return None
+    return (ask - bid) / ((ask + bid) / 2) * 100
+
+
+def ticker_metrics(ticker):
+    """
+    티커 1개에서 (24시간 변동폭 %, 스프레드 %) 계산
+    - 변동폭: (고가 - 저가) / 종가, 고가/저가가 없으면 |24시간 등락률|
+    - 스프레드: (ask - bid) / 중간가, 호가가 없으면 None
+    """
+    last = ticker.get("last") or ticker.get("close")
+    if not last:
+        return None
+
+    high, low = ticker.get("high"), ticker.get("low")
+    if high and low:
+        range_pct = (high - low) / last * 100
+    elif ticker.get("percentage") is not None:
+        range_pct = abs(ticker["percentage"])
+    else:
+        return None
+
+    return range_pct, spread_pct(ticker.get("bid"), ticker.get("ask"))
+
+
+def prescreen_by_ticker(markets, tickers, keep=0.5, max_spread=0.5):
+    """
+    캔들 다운로드 전 사전 선별
+    - markets: [(symbol, quoteVolume)] (top100_markets 결과)
+    - tickers: fetch_tickers() 결과
+    - keep: 남길 비율 (점수 상위), max_spread: 허용 스프레드(%) 상한
+    - 점수 = max(변동폭 - 스프레드, 0) × log(1 + 거래대금)
+      (진입/청산 한 번에 스프레드만큼 손해이므로 변동폭에서 차감)
+    - 반환: 통과한 마켓 (입력 순서 = 거래대금 순 유지)
+    """
+    scored = []
+    for symbol, volume in markets:
+        metrics = ticker_metrics(tickers.get(symbol) or {})
+        if metrics is None:
+            continue
+        range_pct, spread = metrics
+        if spread is not None and spread > max_spread:
+            continue
+        score = max(range_pct - (spread or 0.0), 0.0) * math.log1p(volume)
+        scored.append((score, symbol))
+
+    scored.sort(reverse=True)
+    n_keep = max(1, math.ceil(len(markets) * keep))
+    survivors = {s for _, s in scored[:n_keep]}
+    return [(s, v) for s, v in markets if s in survivors]
@@ -2,8 +2,10 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 import pandas as pd
 import numpy as np
 
+from utils.profiling import get_profiler
 
-def get_vol_metrics(fetch_func, symbol, timeframe, limit):
+
+def get_vol_metrics(fetch_func, symbol, timeframe, limit, window=20):
     """
     변동성 필터 전용: ATR + 밴드폭 + 점수 (정규화된 버전)
     - ATR14: 이미 현재가 대비 백분율(%)로 계산됨
@@ -14,8 +16,8 @@ def get_vol_metrics(fetch_func, symbol, timeframe, limit):
     if df is None:
         return None
 
-    # 최근 20개 캔들의 평균으로 안정적인 측정
-    recent = df.tail(20)
+    # 최근 window(기본 20)개 캔들의 평균으로 안정적인 측정
+    recent = df.tail(window)
 
     # ATR과 볼린저밴드 폭 평균 계산
     atr_mean = recent["ATR14"].mean()
@@ -35,11 +37,19 @@ def get_vol_metrics(fetch_func, symbol, timeframe, limit):
 
 
 # 변동성 점수와 거래대금 점수를 합하여 좋은 절반 필터링
-def filter_by_volatility(markets, fetch_func, timeframe, limit):
+def filter_by_volatility(markets, fetch_func, timeframe, limit, window=20):
     scored = []
+    profiler = get_profiler()
     with ThreadPoolExecutor(max_workers=50) as executor:
         futures = {
-            executor.submit(get_vol_metrics, fetch_func, s, timeframe, limit): (s, v)
+            executor.submit(
+                profiler.wrap("volatility", s, get_vol_metrics),
+                fetch_func,
+                s,
+                timeframe,
+                limit,
+                window,
+            ): (s, v)
             for (s, v) in markets
         }
         for fut in as_completed(futures):
@@ -1,30 +1,26 @@
-import os
-import ccxt
-from dotenv import load_dotenv
-from utils.place_trade import fetch_balance
+from utils.account_state import get_account_state
+from utils.exchange import create_binance
 
-load_dotenv()
+binance = create_binance()
 
-api_key = os.getenv("BINANCE_API_KEY")
-secret_key = os.getenv("BINANCE_SECRET_KEY")
 
-binance = ccxt.binance(
-    config={
-        "apiKey": api_key,
-        "secret": secret_key,
-        "enableRateLimit": True,
-        "options": {"defaultType": "spot"},
-    }
-)
+def fetch_tickers():
+    """전체 티커 스냅샷 (top100_markets / 사전 선별이 같은 결과를 공유)"""
+    get_account_state().share_markets(binance)
+    return binance.fetch_tickers()
 
 
-def top100_markets(fee_rate=0.001):
+def top100_markets(fee_rate=0.001, top_n=50, tickers=None):
     """
     상위 100 USDT 마켓 중 내 잔고로 최소 주문 가능(수수료 고려)한 심볼만 반환
+    - top_n: 반환할 심볼 수 (거래대금 순), None이면 조건을 만족하는 전체
+    - tickers: 이미 받은 fetch_tickers() 결과 (없으면 새로 조회)
     """
-    tickers = binance.fetch_tickers()
+    if tickers is None:
+        tickers = fetch_tickers()
     markets = []
-    usdt_balance = fetch_balance()
+    account = get_account_state()
+    usdt_balance = account.free("USDT")
 
     for symbol, data in tickers.items():
         if not symbol.endswith("/USDT"):
@@ -35,7 +31,7 @@ def top100_markets(fee_rate=0.001):
             continue
 
         try:
-            market_info = binance.market(symbol)
+            market_info = account.market(symbol)
             min_notional = market_info["limits"]["cost"]["min"]
 
             if min_notional is None:
@@ -54,4 +50,7 @@ def top100_markets(fee_rate=0.001):
     sorted_markets = sorted(markets, key=lambda x: x[1], reverse=True)
 
     # 상위 100개만 추출 --> 50개로 변경 (배포환경에서 너무 오래걸림)
-    return sorted_markets[:50]
+    # run_filters(deadline=...)는 top_n=None으로 전체를 받아 마감 시간 안에서 처리
+    if top_n is None:
+        return sorted_markets
+    return sorted_markets[:top_n]
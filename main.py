@@ -1,74 +1,134 @@
-import time
-import json
-import ccxt
 import os
-from dotenv import load_dotenv
+import time
 
 from filters.main_filter import run_filters, fetch_ohlcv
-from utils.bot import ask_ai_investment
-from utils.place_trade import place_trade
-from utils.discord_msg import notify_trade, notify_error, send_portfolio_message
-
-# Binance 객체 (잔고 확인용)
-load_dotenv()
-api_key = os.getenv("BINANCE_API_KEY")
-secret_key = os.getenv("BINANCE_SECRET_KEY")
-binance = ccxt.binance(
-    {
-        "apiKey": api_key,
-        "secret": secret_key,
-        "enableRateLimit": True,
-        "options": {"defaultType": "spot"},
-    }
-)
-binance.load_markets()
+from utils.discord_msg import notify_error
+from utils.account_state import get_account_state
+from utils.rate_limit import ACCOUNT, get_scheduler, request_priority
+from utils.profiling import format_cycle, get_profiler
+from utils.candle_clock import create_close_feed
+from utils.trade_worker import candidate_key, get_trade_worker
+
+# SCAN_PROFILE=1 이면 첫 사이클을 cProfile로 캡처 (data/profile/*.prof)
+SCAN_PROFILE = os.getenv("SCAN_PROFILE") == "1"
+
+# 분석 봉 단위: 이 봉이 마감될 때마다 사이클 실행
+TIMEFRAME = "5m"
+
+# 봉 마감 이벤트: "clock"(벽시계), "stream"(Binance kline 웹소켓)
+CANDLE_FEED = os.getenv("CANDLE_FEED", "clock")
+
+# 스캔 시간 예산(초): 거래대금 순으로 처리하다 마감되면 그때까지의 후보로 진행
+# (다음 봉 마감 전에 AI/주문까지 끝나도록 봉 길이보다 짧게)
+SCAN_DEADLINE = float(os.getenv("SCAN_DEADLINE", "180"))
 
 
 def get_usdt_free():
+    # 잔고는 공유 캐시(utils.account_state)에서: 같은 사이클의 top100_markets도 재사용
     try:
-        bal = binance.fetch_balance()
-        return float(bal["free"].get("USDT", 0.0))
+        with request_priority(ACCOUNT):
+            return get_account_state().free("USDT")
     except:
         return 0.0
 
 
-# 루프 실행
-while True:
-    try:
-        # 1) 잔고 확인 (5 USDT 미만이면 스킵)
-        usdt_free = get_usdt_free()
-        if usdt_free < 5.0:
-            print(f"스킵: USDT 가용 {usdt_free:.4f} < 5.0")
-            time.sleep(1800)
-            continue
-
-        # 2) 후보 스캔
-        final_candidates = run_filters(
-            fetch_ohlcv=fetch_ohlcv,
-            timeframe="5m",
-            limit=1500,
-            mode="both",
-            lookback_cross=3,
-            direction="long",
-        )
-
-        # 후보 없으면 패스
-        if not final_candidates:
-            time.sleep(1800)
-            continue
-
-        # 3) AI 조언 요청
-        advice_text = ask_ai_investment(final_candidates)
-
-        # 4) JSON 파싱
-        advice_json = json.loads(advice_text)
-
-        # 5) 매매 실행
-        place_trade(advice_json)
-        send_portfolio_message()
-
-    except Exception as e:
-        notify_error(str(e))
-
-    # 30분마다 반복
-    time.sleep(1800)
+def print_weight_report():
+    """이번 사이클 요청 가중치 사용량/여유분 출력"""
+    r = get_scheduler().cycle_report()
+    w = r["weight"]
+    print(
+        f"[요청 가중치] 합계 {r['weight_total']:.0f} "
+        f"(주문 {w['order']:.0f} / 잔고 {w['account']:.0f} / 스캔 {w['scan']:.0f}), "
+        f"최소 여유 {r['min_headroom']:.0f}, 대기 {r['wait_seconds']:.1f}s, "
+        f"429/418 {r['throttled']}회"
+    )
+
+
+def log_latency(close, **marks):
+    """
+    봉 마감 → 각 시점까지 걸린 시간(초)을 사이클 기록 "latency"에 남김 (format_cycle로 출력)
+    - marks: 이름=time.time() 값 (예: scan=...)
+    - AI 결정/주문 접수 시각은 TradeWorker가 끝난 뒤 "trade" 이벤트로 따로 기록 (log_trade_latency)
+    """
+    latency = {name: round(t - close, 3) for name, t in marks.items()}
+    get_profiler().annotate("latency", {"close": close, **latency})
+
+
+def finish_cycle():
+    """사이클 계측 기록 저장 (data/profile/cycles.jsonl) + 요약 출력"""
+    record = get_profiler().end_cycle(weight=get_scheduler().cycle_report())
+    print(format_cycle(record))
+
+
+def main():
+    # 시장 정보는 디스크 스냅샷에서 바로 복원, 갱신은 백그라운드에서 주기적으로
+    get_account_state().start_refresh()
+    profile_next_cycle = SCAN_PROFILE
+
+    # 루프 실행: 봉 마감마다 스캔 (캔들/지표/모델은 이전 사이클 상태에서 새 봉만 반영)
+    # AI 조언/주문은 최종 후보 집합이 바뀌었을 때만, 별도 스레드(TradeWorker)에서
+    # → AI/주문 응답을 기다리는 동안에도 다음 봉 스캔은 그대로 진행
+    feed = create_close_feed(CANDLE_FEED, TIMEFRAME)
+    trader = get_trade_worker()
+
+    while True:
+        close = feed.wait()
+        get_scheduler().start_cycle()
+        get_profiler().start_cycle(profile=profile_next_cycle)
+        profile_next_cycle = False
+        try:
+            # 1) 잔고 확인 (5 USDT 미만이면 스킵)
+            # 버전은 잔고보다 먼저 읽음: 그 뒤 주문이 나가면 이 스캔의 후보는 주문하지 않음
+            balance_version = get_account_state().balance_version
+            usdt_free = get_usdt_free()
+            if usdt_free < 5.0:
+                print(f"스킵: USDT 가용 {usdt_free:.4f} < 5.0")
+                finish_cycle()
+                continue
+
+            # 2) 후보 스캔
+            final_candidates = run_filters(
+                fetch_ohlcv=fetch_ohlcv,
+                timeframe=TIMEFRAME,
+                limit=1500,
+                mode="both",
+                lookback_cross=3,
+                direction="long",
+                prophet_executor="process",  # Prophet 학습은 CPU 작업 → 코어 수만큼 프로세스
+                prophet_validation="holdout",  # 교차 검증 대신 홀드아웃 1회로 MAPE 산출
+                forecaster="prophet",  # "fast": NumPy 벡터화 예측기 (Prophet 대신)
+                scan="pipeline",  # 심볼마다 수집 → 필터 → 예측 제출을 단계 대기 없이 진행
+                universe_size=None,  # 50개로 자르지 않고 조건을 만족하는 USDT 마켓 전체
+                deadline=SCAN_DEADLINE,  # 시간 안에 못 본 심볼은 거래대금 순으로 제외
+                prescreen=0.5,  # 티커 스냅샷 점수 상위 절반만 캔들 다운로드
+                spread=0.8,  # 같은 스냅샷 bid/ask로 스프레드 넓은 20% 제외
+                slippage_notional=usdt_free,  # 최종 후보만 호가 깊이로 슬리피지 추정
+            )
+            scanned_at = time.time()
+
+            print_weight_report()
+
+            # 후보가 없거나 직전에 맡긴 후보와 같으면 패스
+            log_latency(close, scan=scanned_at)
+            if not final_candidates:
+                finish_cycle()
+                continue
+            if candidate_key(final_candidates) == trader.key:
+                print("후보 변화 없음: AI 조언/주문 생략")
+                finish_cycle()
+                continue
+
+            # 3) AI 조언 → 주문 → 포트폴리오 알림 (TradeWorker, 결과를 기다리지 않음)
+            if trader.busy():
+                print("이전 후보 AI 조언/주문 진행 중: 새 후보는 대기열에")
+            trader.submit(final_candidates, close, scanned_at, balance_version)
+
+        except Exception as e:
+            notify_error(str(e))
+
+        finish_cycle()
+
+
+# 스캔 프로세스 풀(forkserver)이 이 모듈을 다시 import해도 루프가 돌지 않도록
+if __name__ == "__main__":
+    main()
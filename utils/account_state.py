@@ -0,0 +1,247 @@
+import os
+import pickle
+import threading
+import time
+import weakref
+
+import ccxt
+
+from utils.exchange import create_binance
+from utils.profiling import get_profiler
+
+# 잔고 캐시 유지 시간(초): 한 사이클 안의 중복 조회(main/top100_markets/포트폴리오)를 1회로
+BALANCE_TTL = 60.0
+
+# 시장 정보(정밀도/최소 주문 조건) 캐시 유지 시간(초)
+MARKETS_TTL = 6 * 3600.0
+
+# 백그라운드 시장 정보 갱신 주기(초)
+MARKETS_REFRESH_INTERVAL = 3600.0
+
+# 시장 정보 스냅샷 (프로젝트 루트 기준 data/markets): 재시작 직후 load_markets 없이 복원
+MARKETS_SNAPSHOT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "data",
+    "markets",
+    "binance-spot.pkl",
+)
+
+
+class AccountState:
+    """
+    잔고 / 시장 정보 공유 캐시 (모든 모듈 공통)
+    - balance(): BALANCE_TTL 동안 재사용, 주문 후 invalidate_balance()로 즉시 무효화
+    - markets() / market(symbol): load_markets 결과를 MARKETS_TTL 동안 재사용
+      - 시작 시 디스크 스냅샷(MARKETS_SNAPSHOT)에서 바로 복원, 없을 때만 load_markets 대기
+      - 오래된 스냅샷은 일단 그대로 쓰고 백그라운드에서 갱신 (start_refresh로 주기 갱신)
+    - share_markets(exchange): 다른 ccxt 인스턴스에 같은 시장 정보를 넣어 줌
+      (fetch_* 내부의 load_markets 재다운로드 방지, *_to_precision 사용 가능)
+    - 동시에 여러 스레드가 조회해도 실제 요청은 1번 (나머지는 결과 대기)
+    - balance_version: 주문으로 잔고가 바뀔 때마다 1 증가 (스캔 시점 잔고가 아직 유효한지 비교용)
+    """
+
+    def __init__(
+        self,
+        balance_ttl=BALANCE_TTL,
+        markets_ttl=MARKETS_TTL,
+        snapshot_path=MARKETS_SNAPSHOT,
+    ):
+        self.balance_ttl = balance_ttl
+        self.markets_ttl = markets_ttl
+        self.snapshot_path = snapshot_path
+        self._exchange = None
+        self._public = None
+        self._refreshing = False
+        self._refresh_thread = None
+        self._balance = None
+        self._balance_at = 0.0
+        self.balance_version = 0
+        self._markets = None
+        self._currencies = None
+        self._markets_at = 0.0
+        # 인스턴스별로 마지막에 넣어 준 시장 정보 (set_markets가 dict를 새로 만들어서
+        # exchange.markets로는 같은 값인지 비교할 수 없음)
+        self._shared = weakref.WeakKeyDictionary()
+        self._balance_lock = threading.Lock()
+        self._markets_lock = threading.Lock()
+        self._download_lock = threading.Lock()
+
+    @property
+    def exchange(self):
+        """잔고/시장 정보 조회용 인증 인스턴스 (처음 쓸 때 생성)"""
+        if self._exchange is None:
+            self._exchange = create_binance()
+        return self._exchange
+
+    # --- 시장 정보 ---
+    def markets(self):
+        with self._markets_lock:
+            if self._markets is None:
+                self._load_snapshot()
+            fresh = (
+                self._markets is not None
+                and time.time() - self._markets_at < self.markets_ttl
+            )
+            get_profiler().cache_event("markets", fresh)
+            if self._markets is None:
+                # 스냅샷도 없는 첫 실행만 다운로드를 기다림
+                self._install(*self._download())
+                self._save_snapshot()
+            elif not fresh:
+                self._refresh_in_background()
+            return self._markets
+
+    def refresh_markets(self):
+        """load_markets 새로 받아 교체 + 스냅샷 저장 (기존 값은 교체 전까지 계속 사용)"""
+        markets, currencies = self._download()
+        with self._markets_lock:
+            self._install(markets, currencies)
+            self._save_snapshot()
+
+    def start_refresh(self, interval=MARKETS_REFRESH_INTERVAL):
+        """interval초마다 백그라운드 갱신 (데몬 스레드, 여러 번 호출해도 1개)"""
+        if self._refresh_thread is not None:
+            return
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                with self._markets_lock:
+                    started = self._begin_refresh()
+                if started:
+                    self._run_refresh()
+
+        self._refresh_thread = threading.Thread(
+            target=loop, name="markets-refresh", daemon=True
+        )
+        self._refresh_thread.start()
+
+    def _refresh_in_background(self):
+        """TTL 만료 시 1회 갱신 (_markets_lock 안에서 호출)"""
+        if self._begin_refresh():
+            threading.Thread(
+                target=self._run_refresh, name="markets-refresh-once", daemon=True
+            ).start()
+
+    # 주기 갱신 / TTL 갱신 공통: 동시에 하나만 (_public 인스턴스의 load_markets는 스레드 안전하지 않음)
+    def _begin_refresh(self):
+        """갱신 시작 표시, 이미 진행 중이면 False (_markets_lock 안에서 호출)"""
+        if self._refreshing:
+            return False
+        self._refreshing = True
+        return True
+
+    def _run_refresh(self):
+        """_begin_refresh가 True일 때만 호출, 끝나면 표시 해제"""
+        try:
+            self.refresh_markets()
+        except Exception as e:
+            print(f"시장 정보 갱신 실패: {e}")
+        finally:
+            self._refreshing = False
+
+    def _download(self):
+        # 공개 엔드포인트라 인증 인스턴스와 별도 (잔고 조회와 동시에 진행 가능)
+        # 첫 실행 다운로드와 백그라운드 갱신이 겹쳐도 _public은 한 번에 하나만 사용
+        with self._download_lock:
+            if self._public is None:
+                self._public = create_binance(auth=False)
+            markets = self._public.load_markets(reload=True)
+            return markets, self._public.currencies
+
+    def _install(self, markets, currencies, saved_at=None):
+        self._markets = markets
+        self._currencies = currencies
+        self._markets_at = saved_at or time.time()
+
+    def use_snapshot(self, path):
+        """스냅샷 경로 변경 (None이면 읽기/저장 안 함), 메모리의 시장 정보도 비움"""
+        with self._markets_lock:
+            self.snapshot_path = path
+            self._markets = None
+            self._currencies = None
+            self._markets_at = 0.0
+
+    def _load_snapshot(self):
+        if self.snapshot_path is None or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                snapshot = pickle.load(f)
+            self._install(
+                snapshot["markets"], snapshot["currencies"], snapshot["saved_at"]
+            )
+        except Exception as e:
+            print(f"시장 정보 스냅샷 읽기 실패: {e}")
+
+    def _save_snapshot(self):
+        snapshot = {
+            "saved_at": self._markets_at,
+            "markets": self._markets,
+            "currencies": self._currencies,
+        }
+        if self.snapshot_path is None:
+            return
+        tmp = self.snapshot_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+            with open(tmp, "wb") as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.snapshot_path)  # 중간에 죽어도 파일이 깨지지 않도록
+        except Exception as e:
+            print(f"시장 정보 스냅샷 저장 실패: {e}")
+
+    def market(self, symbol):
+        markets = self.markets()
+        if symbol not in markets:
+            raise ccxt.BadSymbol(f"시장 정보 없음: {symbol}")
+        return markets[symbol]
+
+    def share_markets(self, exchange):
+        """시장 정보가 마지막으로 넣어 준 뒤 바뀌었을 때만 set_markets (수천 개면 100ms대)"""
+        markets = self.markets()
+        if self._shared.get(exchange) is not markets:
+            exchange.set_markets(markets, self._currencies)
+            self._shared[exchange] = markets
+        return exchange
+
+    # --- 잔고 ---
+    def balance(self, max_age=None):
+        """
+        fetch_balance 결과 (캐시)
+        - max_age: 이번 호출에만 적용할 허용 나이(초), 주문 직전처럼 더 최신 값이 필요할 때
+        - 요청 우선순위는 호출하는 쪽의 request_priority를 따름 (주문 경로면 ORDER)
+        """
+        max_age = self.balance_ttl if max_age is None else max_age
+        self.share_markets(self.exchange)  # fetch_balance 내부 load_markets 방지
+        with self._balance_lock:
+            fresh = (
+                self._balance is not None and time.time() - self._balance_at < max_age
+            )
+            get_profiler().cache_event("balance", fresh)
+            if not fresh:
+                self._balance = self.exchange.fetch_balance()
+                self._balance_at = time.time()
+            return self._balance
+
+    def free(self, coin="USDT", max_age=None):
+        return float(self.balance(max_age)["free"].get(coin) or 0.0)
+
+    def invalidate_balance(self):
+        """주문/체결 후 호출: 다음 balance()는 새로 조회"""
+        with self._balance_lock:
+            self._balance = None
+            self.balance_version += 1
+
+    def invalidate(self):
+        self.invalidate_balance()
+        with self._markets_lock:
+            self._markets_at = 0.0
+
+
+_account_state = AccountState()
+
+
+def get_account_state():
+    """프로세스 공유 AccountState"""
+    return _account_state
@@ -0,0 +1,318 @@
+import numpy as np
+import pandas as pd
+
+from filters.basic_filter import BASIC_COLUMNS, basic_signal_arrays
+from utils.indicators import compute_indicator_arrays, fetch_candles_many
+from utils.candle_store import OHLCV_COLUMNS, timeframe_to_ms
+
+# 기본 필터 규칙 (run_filters 실전 설정과 동일: lookback_cross=3)
+DEFAULT_RULES = {
+    "lookback_cross": 3,
+    "obv_lookback": 5,
+    "rsi_long": (45, 75),
+    "rsi_short": (25, 55),
+}
+
+# 청산 규칙 (place_trade의 OCO: 익절 지정가 + 손절 스톱)
+# - tp_pct / sl_pct: 진입가 대비 익절/손절 거리
+# - stop_slippage: 스톱 체결가 = 손절가 × (1 ∓ 0.5%) (place_trade의 stopLimitPrice)
+# - max_hold: 최대 보유 캔들 수 (넘으면 종가 청산)
+# - fee_rate: 편도 수수료 (top100_markets와 동일 0.1%)
+DEFAULT_EXITS = {
+    "tp_pct": 0.015,
+    "sl_pct": 0.01,
+    "stop_slippage": 0.005,
+    "max_hold": 288,
+    "fee_rate": 0.001,
+}
+
+# 청산 사유 코드
+EXIT_TP, EXIT_SL, EXIT_TIMEOUT = 1, 2, 3
+EXIT_NAMES = {EXIT_TP: "tp", EXIT_SL: "sl", EXIT_TIMEOUT: "timeout"}
+
+# 진입 후보가 많을 때 (후보 × max_hold) 창을 나눠 처리하는 단위
+_CHUNK = 20000
+
+
+def fetch_history(symbols, timeframe="5m", days=90, page=1000):
+    """
+    백테스트용 과거 캔들 (since 페이지 단위로 이어받기)
+    - 반환: {symbol: OHLCV DataFrame}
+    """
+    tf_ms = timeframe_to_ms(timeframe)
+    end = pd.Timestamp.now(tz="UTC").value // 10**6
+    start = end - days * 86_400_000
+    rows = {s: [] for s in symbols}
+    since = {s: start for s in symbols}
+
+    while since:
+        requests = [(s, timeframe, t, page) for s, t in since.items()]
+        responses = fetch_candles_many(requests)
+        for (s, _, _, _), res in zip(requests, responses):
+            if isinstance(res, Exception) or not res:
+                if isinstance(res, Exception):
+                    print(f"{s} 과거 캔들 조회 실패: {res}")
+                since.pop(s)
+                continue
+            rows[s].extend(res)
+            next_since = res[-1][0] + tf_ms
+            if len(res) < page or next_since >= end:
+                since.pop(s)
+            else:
+                since[s] = next_since
+
+    frames = {}
+    for s, r in rows.items():
+        if r:
+            df = pd.DataFrame(r, columns=OHLCV_COLUMNS)
+            frames[s] = df.drop_duplicates("timestamp").reset_index(drop=True)
+    return frames
+
+
+def prepare_arrays(df):
+    """OHLCV DataFrame → 백테스트에 필요한 가격/지표 배열 dict (심볼당 1회 계산)"""
+    high = df["high"].to_numpy(dtype=float)
+    low = df["low"].to_numpy(dtype=float)
+    close = df["close"].to_numpy(dtype=float)
+    volume = df["volume"].to_numpy(dtype=float)
+
+    arrays = compute_indicator_arrays(high, low, close, volume)
+    arrays["open"] = df["open"].to_numpy(dtype=float)
+    arrays["high"] = high
+    arrays["low"] = low
+    arrays["close"] = close
+    arrays["volume"] = volume
+    arrays["timestamp"] = df["timestamp"].to_numpy(dtype=np.int64)
+    return arrays
+
+
+def _first_hits(arrays, entries, side, exits):
+    """
+    진입 후보 전체의 청산 시점을 한 번에 계산
+    - 진입: 신호 캔들 다음 캔들 시가
+    - 익절(지정가)/손절(스톱) 가격에 처음 닿는 캔들에서 청산, 같은 캔들이면 손절 우선
+    - max_hold 동안 안 닿으면 마지막 캔들 종가
+    - 반환: (진입가, 청산 인덱스, 청산가, 사유 코드)
+    """
+    hold = exits["max_hold"]
+    high, low, close = arrays["high"], arrays["low"], arrays["close"]
+    entry_price = arrays["open"][entries + 1]
+
+    if side > 0:
+        tp = entry_price * (1 + exits["tp_pct"])
+        sl = entry_price * (1 - exits["sl_pct"])
+        stop_fill = sl * (1 - exits["stop_slippage"])
+    else:
+        tp = entry_price * (1 - exits["tp_pct"])
+        sl = entry_price * (1 + exits["sl_pct"])
+        stop_fill = sl * (1 + exits["stop_slippage"])
+
+    highs = np.lib.stride_tricks.sliding_window_view(high, hold)
+    lows = np.lib.stride_tricks.sliding_window_view(low, hold)
+
+    exit_idx = np.empty(len(entries), dtype=np.int64)
+    exit_price = np.empty(len(entries))
+    reason = np.empty(len(entries), dtype=np.int8)
+
+    for a in range(0, len(entries), _CHUNK):
+        b = min(a + _CHUNK, len(entries))
+        win_h = highs[entries[a:b] + 1]
+        win_l = lows[entries[a:b] + 1]
+        if side > 0:
+            hit_tp = win_h >= tp[a:b, None]
+            hit_sl = win_l <= sl[a:b, None]
+        else:
+            hit_tp = win_l <= tp[a:b, None]
+            hit_sl = win_h >= sl[a:b, None]
+
+        any_tp, any_sl = hit_tp.any(axis=1), hit_sl.any(axis=1)
+        first_tp = np.where(any_tp, hit_tp.argmax(axis=1), hold)
+        first_sl = np.where(any_sl, hit_sl.argmax(axis=1), hold)
+
+        by_sl = any_sl & (first_sl <= first_tp)
+        by_tp = any_tp & ~by_sl
+        offset = np.where(by_sl, first_sl, np.where(by_tp, first_tp, hold - 1))
+
+        exit_idx[a:b] = entries[a:b] + 1 + offset
+        exit_price[a:b] = np.where(
+            by_sl,
+            stop_fill[a:b],
+            np.where(by_tp, tp[a:b], close[entries[a:b] + 1 + offset]),
+        )
+        reason[a:b] = np.where(by_sl, EXIT_SL, np.where(by_tp, EXIT_TP, EXIT_TIMEOUT))
+
+    return entry_price, exit_idx, exit_price, reason
+
+
+def signal_sides(signals, mode="both", last_entry=None):
+    """
+    롱/숏 신호 → 진입 방향 배열 (+1 롱 / -1 숏 / 0 없음), (T,) 또는 (T, 심볼수)
+    - evaluate_basic처럼 롱 우선
+    - last_entry 이후 캔들은 청산 평가 구간이 모자라 진입 제외
+    """
+    side = np.zeros(signals["long"].shape, dtype=np.int8)
+    if mode in ("both", "long"):
+        side[signals["long"]] = 1
+    if mode in ("both", "short"):
+        side[(side == 0) & signals["short"]] = -1
+    if last_entry is not None:
+        side[max(last_entry, 0) :] = 0
+    return side
+
+
+def _exit_arrays(arrays, side, exits):
+    """side 배열의 진입 캔들마다 청산 결과 (진입가, 청산 인덱스, 청산가, 사유), 길이 n"""
+    n = len(arrays["close"])
+    entry_price = np.full(n, np.nan)
+    exit_idx = np.full(n, n, dtype=np.int64)
+    exit_price = np.full(n, np.nan)
+    reason = np.zeros(n, dtype=np.int8)
+    for s in (1, -1):
+        entries = np.flatnonzero(side == s)
+        if len(entries):
+            e, x, p, r = _first_hits(arrays, entries, s, exits)
+            entry_price[entries], exit_idx[entries] = e, x
+            exit_price[entries], reason[entries] = p, r
+    return entry_price, exit_idx, exit_price, reason
+
+
+def exit_table(arrays, exits=None):
+    """
+    모든 캔들에서 롱/숏으로 진입했다고 보고 미리 구한 청산 결과표
+    - 청산 결과는 진입 시점과 청산 규칙에만 의존 → 신호 규칙을 바꿔 가며
+      여러 번 백테스트할 때(파라미터 탐색) 한 번만 계산해서 공유
+    - 반환: {+1: 롱 결과, -1: 숏 결과} (각각 _exit_arrays 형식)
+    """
+    exits = {**DEFAULT_EXITS, **(exits or {})}
+    n = len(arrays["close"])
+    last_entry = max(n - exits["max_hold"] - 1, 0)
+    before = np.arange(n) < last_entry
+    return {
+        s: _exit_arrays(arrays, np.where(before, s, 0).astype(np.int8), exits)
+        for s in (1, -1)
+    }
+
+
+def take_trades(side, exit_idx):
+    """
+    포지션은 한 번에 하나만: 청산 전 신호는 무시하고 실제 진입한 신호 인덱스 반환
+    - 신호 캔들 전체가 아니라 진입한 거래 수만큼만 순회
+    """
+    n = len(side)
+    idx = np.where(side != 0, np.arange(n), n)
+    next_signal = np.minimum.accumulate(idx[::-1])[::-1]  # t 이후(포함) 첫 신호
+    next_signal = np.append(next_signal, n)
+
+    taken = []
+    t = next_signal[0]
+    while t < n:
+        taken.append(t)
+        t = next_signal[min(exit_idx[t] + 1, n)]  # 청산 다음 캔들부터 다시 신호 대기
+    return np.asarray(taken, dtype=np.int64)
+
+
+def trade_results(side, exit_arrays, fee_rate):
+    """진입 방향 배열 + 청산 결과 → 실제 거래별 배열 dict"""
+    entry_price, exit_idx, exit_price, reason = exit_arrays
+    taken = take_trades(side, exit_idx)
+    sides = side[taken].astype(float)
+    gross = sides * (exit_price[taken] / entry_price[taken] - 1)
+    return {
+        "signal_idx": taken,
+        "exit_idx": exit_idx[taken],
+        "side": side[taken],
+        "entry_price": entry_price[taken],
+        "exit_price": exit_price[taken],
+        "reason": reason[taken],
+        "return": gross - 2 * fee_rate,
+    }
+
+
+def backtest_arrays(arrays, rules=None, exits=None, mode="both", entry_mask=None):
+    """
+    심볼 1개 백테스트 (규칙/청산 모두 배열 연산)
+    - 모든 시점 신호를 basic_signal_arrays로 한 번에 계산
+    - entry_mask: 추가 진입 조건 불리언 배열 (변동성 순위 등), None이면 제한 없음
+    - 반환: 거래별 배열 dict (신호/청산 인덱스, 가격, 방향, 사유, 수익률)
+    """
+    rules = {**DEFAULT_RULES, **(rules or {})}
+    exits = {**DEFAULT_EXITS, **(exits or {})}
+
+    signals = basic_signal_arrays({c: arrays[c] for c in BASIC_COLUMNS}, **rules)
+    # 진입 캔들(t+1)부터 max_hold개 캔들이 모두 있어야 평가 가능
+    last_entry = len(arrays["close"]) - exits["max_hold"] - 1
+    side = signal_sides(signals, mode, last_entry)
+    if entry_mask is not None:
+        side[~entry_mask] = 0
+
+    return trade_results(side, _exit_arrays(arrays, side, exits), exits["fee_rate"])
+
+
+def trades_frame(symbol, arrays, trades):
+    """백테스트 배열 결과 → 거래 내역 DataFrame"""
+    ts = arrays["timestamp"]
+    return pd.DataFrame(
+        {
+            "symbol": symbol,
+            "side": np.where(trades["side"] > 0, "LONG", "SHORT"),
+            "entry_time": pd.to_datetime(ts[trades["signal_idx"] + 1], unit="ms"),
+            "exit_time": pd.to_datetime(ts[trades["exit_idx"]], unit="ms"),
+            "entry_price": trades["entry_price"],
+            "exit_price": trades["exit_price"],
+            "reason": [EXIT_NAMES[r] for r in trades["reason"]],
+            "bars": trades["exit_idx"] - trades["signal_idx"],
+            "return": trades["return"],
+        }
+    )
+
+
+def summarize_returns(returns):
+    """거래 수익률 배열 → 성과 요약 dict"""
+    returns = np.asarray(returns, dtype=float)
+    if len(returns) == 0:
+        return {
+            "trades": 0,
+            "win_rate": 0.0,
+            "avg_return": 0.0,
+            "total_return": 0.0,
+            "profit_factor": 0.0,
+            "max_drawdown": 0.0,
+        }
+    equity = np.cumprod(1 + returns)
+    peak = np.maximum.accumulate(equity)
+    gains = returns[returns > 0].sum()
+    losses = -returns[returns < 0].sum()
+    return {
+        "trades": int(len(returns)),
+        "win_rate": float((returns > 0).mean()),
+        "avg_return": float(returns.mean()),
+        "total_return": float(equity[-1] - 1),
+        "profit_factor": float(gains / losses) if losses > 0 else float("inf"),
+        "max_drawdown": float((1 - equity / peak).max()),
+    }
+
+
+def run_backtest(frames, rules=None, exits=None, mode="both"):
+    """
+    여러 심볼 백테스트
+    - frames: {symbol: OHLCV DataFrame} 또는 prepare_arrays 결과 {symbol: arrays}
+    - 반환: (거래 내역 DataFrame, 전체 요약 dict, 심볼별 요약 DataFrame)
+    """
+    exits = {**DEFAULT_EXITS, **(exits or {})}
+    parts = []
+    per_symbol = {}
+    for symbol, data in frames.items():
+        arrays = data if isinstance(data, dict) else prepare_arrays(data)
+        if len(arrays["close"]) <= exits["max_hold"] + 2:
+            continue
+        trades = backtest_arrays(arrays, rules=rules, exits=exits, mode=mode)
+        parts.append(trades_frame(symbol, arrays, trades))
+        per_symbol[symbol] = summarize_returns(trades["return"])
+
+    trades = (
+        pd.concat(parts, ignore_index=True).sort_values("entry_time")
+        if parts
+        else pd.DataFrame()
+    )
+    summary = summarize_returns(trades["return"] if len(trades) else [])
+    return trades, summary, pd.DataFrame.from_dict(per_symbol, orient="index")
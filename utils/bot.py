@@ -1,15 +1,52 @@
 import os
 import json
 import re
+import math
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
 import numpy as np
 from dotenv import load_dotenv
-import google.genai as genai
-from google.genai import types
+
+from utils.profiling import get_profiler
 
 load_dotenv()
 api_key = os.getenv("GEMINI_API_KEY")
 
-client = genai.Client(api_key=api_key)
+# API 주소 교체 (로컬 가짜 모델 서버 등, utils.fake_model), 비우면 기본 주소
+base_url = os.getenv("GEMINI_BASE_URL")
+
+MODEL = "gemini-2.5-flash"
+
+# 응답 JSON 스키마 (response_schema로 강제 + utils.decision_service에서 검증)
+DECISION_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "symbol": {"type": "STRING"},
+        "action": {"type": "STRING", "enum": ["BUY", "SELL"]},
+        "entry_price": {"type": "NUMBER"},
+        "take_profit": {"type": "NUMBER"},
+        "stop_loss": {"type": "NUMBER"},
+        "reason": {"type": "STRING"},
+    },
+    "required": ["symbol", "action", "entry_price", "take_profit", "stop_loss"],
+}
+
+# google.genai는 후보가 있어 실제로 호출할 때 import / 클라이언트 생성
+_client = None
+
+
+def get_client():
+    global _client
+    if _client is None:
+        import google.genai as genai
+        from google.genai import types
+
+        http_options = types.HttpOptions(base_url=base_url) if base_url else None
+        _client = genai.Client(api_key=api_key, http_options=http_options)
+    return _client
 
 
 # 1. NumPy 타입 변환 함수
@@ -29,24 +66,247 @@ def clean_numpy(obj):
         return obj
 
 
-# 2. Gemini 호출 함수
-def ask_ai_investment(final_candidates):
+# 2. 프롬프트 압축 (입력 토큰 절감)
+# 후보 dict의 한글 키/값 → 짧은 영문 키/값, 실수는 유효숫자 PROMPT_DIGITS자리, 들여쓰기 없음
+PROMPT_DIGITS = 6
+
+SHORT_KEYS = {
+    "종목": "s",
+    "신호": "sig",
+    "현재가": "p",
+    "예측가": "fc",
+    "중앙값": "mid",
+    "최저": "lo",
+    "최고": "hi",
+    "평균": "avg",
+    "최댓값": "max",
+    "최솟값": "min",
+    "예측범위폭": "w",
+    "진입위치": "pos",
+    "추천전략": "plan",
+    "매수권장가": "buy",
+    "매도권장가": "sell",
+    "예측수익률": "ret",
+    "추세": "tr",
+    "기본필터_추세상승": "up",
+    "기본필터_추세하락": "dn",
+    "Prophet_추세선": "trend",
+    "예측구간_방향성": "dir",
+    "보조지표": "ind",
+    "RSI14": "rsi",
+    "RSI상태": "rsi_st",
+    "MACD": "macd",
+    "MACD_시그널": "macd_sig",
+    "OBV": "obv",
+    "예측성능": "perf",
+    "MAPE": "mape",
+    "예상슬리피지(%)": "slip",
+}
+
+SHORT_VALUES = {
+    "매수(LONG)": "LONG",
+    "매도(SHORT)": "SHORT",
+    "상승": "up",
+    "하락": "down",
+    "과매도": "oversold",
+    "과매수": "overbought",
+    "중립": "neutral",
+}
+
+# 시스템 지시문에 붙이는 약어 설명 (모델이 짧은 키를 해석할 수 있도록)
+PROMPT_LEGEND = (
+    "Candidate keys: s=symbol, sig=signal, p=last price, "
+    "fc=forecast{mid,lo,hi,avg,max,min,w=band width,pos=entry position in band}, "
+    "plan{buy=buy zone,sell=sell zone,ret=expected return}, "
+    "tr=trend{up,dn=basic filter trend,trend=forecast trend line,dir=forecast direction}, "
+    "ind{rsi,rsi_st,macd,macd_sig,obv}, perf{mape}, slip=expected slippage %. "
+    "Null fields are omitted."
+)
+
+
+def compact_candidates(obj):
+    """
+    후보 목록을 짧은 키/반올림 값으로 변환
+    - None 값과 "_"로 시작하는 내부 키(예: "_점수")는 생략 (AI가 점수로 판단하지 않게)
+    """
+    if isinstance(obj, dict):
+        return {
+            SHORT_KEYS.get(k, k): compact_candidates(v)
+            for k, v in obj.items()
+            if v is not None and not k.startswith("_")
+        }
+    if isinstance(obj, (list, tuple)):
+        return [compact_candidates(v) for v in obj]
+    if isinstance(obj, float):
+        return float(f"{obj:.{PROMPT_DIGITS}g}") if math.isfinite(obj) else None
+    if isinstance(obj, str):
+        return SHORT_VALUES.get(obj, obj)
+    return obj
+
+
+def encode_candidates(final_candidates):
+    """프롬프트에 넣을 후보 JSON (구분자 공백 없음)"""
+    return json.dumps(
+        compact_candidates(clean_numpy(final_candidates)),
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+# 3. 결정 캐시
+# 후보 집합의 주요 수치를 구간으로 양자화한 지문이 같으면 직전 AI 결정을 재사용
+DECISION_TTL = 600.0  # 초 (5분봉 2개)
+DECISION_MAX_ENTRIES = 128
+PRICE_STEP = 0.005  # 현재가: 0.5% 로그 구간
+BAND_STEP = 0.005  # 예측가: 현재가 대비 0.5%p 구간 (현재가와 같이 움직이면 그대로)
+RSI_STEP = 10.0
+MAPE_STEP = 0.02
+
+
+def _log_bucket(x, step=PRICE_STEP):
+    if x is None:
+        return None
+    x = float(x)
+    if x <= 0 or not math.isfinite(x):
+        return x
+    return round(math.log(x) / math.log1p(step))
+
+
+def _bucket(x, step):
+    return None if x is None else round(float(x) / step)
+
+
+def _band_bucket(x, price):
+    if x is None or not price:
+        return None
+    return _bucket(float(x) / float(price) - 1, BAND_STEP)
+
+
+def decision_fingerprint(final_candidates):
+    """
+    AI 결정 캐시 키: 후보별 (종목, 신호, 가격 구간, 현재가 대비 예측 구간, 추세, RSI/MAPE 구간)
+    - 순서 무관 (select_trading_candidates가 섞음)
+    - 가격이 PRICE_STEP 구간 안에서만 움직였으면 같은 키 → 진입가/TP/SL 오차도 그 이내
+    """
+    rows = []
+    for c in final_candidates:
+        price = c.get("현재가")
+        fc = c.get("예측가") or {}
+        tr = c.get("추세") or {}
+        ind = c.get("보조지표") or {}
+        perf = c.get("예측성능") or {}
+        rows.append(
+            [
+                c.get("종목"),
+                c.get("신호"),
+                _log_bucket(price),
+                _band_bucket(fc.get("중앙값"), price),
+                _band_bucket(fc.get("최저"), price),
+                _band_bucket(fc.get("최고"), price),
+                tr.get("기본필터_추세상승"),
+                tr.get("기본필터_추세하락"),
+                tr.get("예측구간_방향성"),
+                _bucket(ind.get("RSI14"), RSI_STEP),
+                _bucket(perf.get("MAPE"), MAPE_STEP),
+            ]
+        )
+    rows.sort(key=lambda r: (str(r[0]), str(r[1])))
+    raw = json.dumps(clean_numpy(rows), ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class DecisionCache:
+    """
+    AI 결정 캐시 (지문 → 응답 텍스트)
+    - ttl(초)이 지난 결정은 버림, max_entries를 넘으면 가장 오래 안 쓴 것부터 제거
+    - hits / misses 누적 → hit_rate, 사이클 기록에는 캐시 이름 "ai_decision"으로 집계
+    """
+
+    def __init__(self, ttl=DECISION_TTL, max_entries=DECISION_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[1] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        get_profiler().cache_event("ai_decision", entry is not None)
+        return None if entry is None else entry[0]
+
+    def put(self, key, advice_text):
+        with self._lock:
+            self._entries[key] = (advice_text, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def evict_expired(self):
+        now = time.time()
+        with self._lock:
+            for key, (_, saved_at) in list(self._entries.items()):
+                if now - saved_at > self.ttl:
+                    del self._entries[key]
+
+    def lookup(self, key):
+        """결정 1건당 한 번: 만료 정리 → 조회 → 누적 적중률 출력"""
+        self.evict_expired()
+        cached = self.get(key)
+        print(
+            f"[AI 결정 캐시] {'적중' if cached is not None else '미스'} "
+            f"(누적 적중률 {self.hit_rate * 100:.0f}%, "
+            f"{self.hits}/{self.hits + self.misses})"
+        )
+        return cached
+
+
+decision_cache = DecisionCache()
+
+
+# 4. Gemini 호출 함수
+def ask_ai_investment(final_candidates, timeout=None):
+    """
+    timeout: 요청 1건 HTTP 제한 시간(초), None이면 클라이언트 기본값
+    - 결정 캐시 조회/저장은 결정 1건당 한 번 (utils.decision_service.DecisionService.decide)
+    """
     # NumPy 타입 → Python 타입 변환
     final_candidates = clean_numpy(final_candidates)
 
-    # JSON 문자열로 변환
-    candidates_str = json.dumps(final_candidates, ensure_ascii=False, indent=2)
+    # 짧은 키/반올림 값의 한 줄 JSON
+    candidates_str = encode_candidates(final_candidates)
 
     # Gemini 호출
-    response = client.models.generate_content(
-        model="gemini-2.5-flash",
+    from google.genai import types
+
+    response = get_client().models.generate_content(
+        model=MODEL,
         config=types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=DECISION_SCHEMA,
+            http_options=(
+                types.HttpOptions(timeout=int(timeout * 1000)) if timeout else None
+            ),
             system_instruction=(
                 "You are an advanced AI investment assistant for a short-term trading (scalping/day trading) program. "
                 "Pick ONLY ONE most promising candidate from the list. "
                 "Give entry price, take-profit, stop-loss, and reasoning. "
                 "Focus on short-term opportunities and risk/reward. "
-                "Return pure JSON only, no extra text."
+                "Return pure JSON only, no extra text. " + PROMPT_LEGEND
             ),
         ),
         contents=[
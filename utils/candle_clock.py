@@ -0,0 +1,125 @@
+import asyncio
+import queue
+import threading
+import time
+
+import ccxt
+
+# 봉 마감 직후 거래소에 마지막 봉이 반영될 때까지 기다리는 여유(초)
+CLOSE_GRACE = 2.0
+
+# kline 스트림 기준 심볼 (모든 심볼의 봉 마감 시각은 같음)
+STREAM_SYMBOL = "BTC/USDT"
+
+
+def timeframe_seconds(timeframe):
+    """봉 길이(초), 예: "5m" → 300"""
+    return ccxt.Exchange.parse_timeframe(timeframe)
+
+
+def last_close(now, period):
+    """now 이전 마지막 봉 마감 시각 (epoch 초)"""
+    return now - now % period
+
+
+def next_close(now, period):
+    return last_close(now, period) + period
+
+
+class CandleClock:
+    """
+    벽시계 기준 봉 마감 피드
+    - wait(): 다음 봉 마감 + CLOSE_GRACE까지 대기 후 마감 시각(epoch 초) 반환
+    - 스캔이 봉 하나보다 오래 걸려 지나간 마감은 건너뜀 (밀린 사이클을 몰아서 돌지 않음)
+    """
+
+    def __init__(self, timeframe="5m", grace=CLOSE_GRACE):
+        self.period = timeframe_seconds(timeframe)
+        self.grace = grace
+        self._last = None
+
+    def wait(self, timeout=None):
+        """timeout(초) 안에 마감이 없으면 None"""
+        now = time.time()
+        close = next_close(now - self.grace, self.period)
+        if self._last is not None and close <= self._last:
+            close = self._last + self.period
+        wake = close + self.grace
+        if timeout is not None and wake - now > timeout:
+            time.sleep(timeout)
+            return None
+        time.sleep(max(0.0, wake - now))
+        self._last = close
+        return close
+
+
+class LocalCloseFeed:
+    """
+    kline 스트림 대용 피드 (재생/테스트): push()로 봉 마감 이벤트를 직접 넣음
+    - wait(): 밀린 이벤트가 여러 개면 가장 최근 마감만 반환
+    """
+
+    def __init__(self, timeframe="5m"):
+        self.period = timeframe_seconds(timeframe)
+        self._queue = queue.Queue()
+
+    def push(self, close=None):
+        """close: 봉 마감 시각(epoch 초), None이면 현재 시각"""
+        self._queue.put(time.time() if close is None else close)
+
+    def wait(self, timeout=None):
+        try:
+            close = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        while True:
+            try:
+                close = self._queue.get_nowait()
+            except queue.Empty:
+                return close
+
+
+class KlineStreamFeed(LocalCloseFeed):
+    """
+    Binance kline 웹소켓(ccxt.pro watch_ohlcv) 기반 피드
+    - STREAM_SYMBOL의 새 봉이 시작되면 직전 봉 마감으로 보고 push
+    - 전용 이벤트 루프 스레드 1개, 연결이 끊기면 잠시 후 재연결
+    """
+
+    def __init__(self, timeframe="5m", symbol=STREAM_SYMBOL):
+        super().__init__(timeframe)
+        self.timeframe = timeframe
+        self.symbol = symbol
+        self._thread = threading.Thread(
+            target=lambda: asyncio.run(self._watch()), name="kline-feed", daemon=True
+        )
+        self._thread.start()
+
+    async def _watch(self):
+        import ccxt.pro as ccxtpro  # 스트림을 쓸 때만 로드
+
+        exchange = ccxtpro.binance({"enableRateLimit": True})
+        opened = None
+        try:
+            while True:
+                try:
+                    candles = await exchange.watch_ohlcv(self.symbol, self.timeframe)
+                except Exception as e:
+                    print(f"kline 스트림 오류: {e}")
+                    await asyncio.sleep(5)
+                    continue
+                start = candles[-1][0] / 1000  # 진행 중인 봉 시작 = 직전 봉 마감
+                if opened is not None and start > opened:
+                    self.push(start)
+                opened = start
+        finally:
+            await exchange.close()
+
+
+def create_close_feed(kind="clock", timeframe="5m"):
+    """kind: "clock"(벽시계) / "stream"(kline 웹소켓) / "local"(직접 push)"""
+    if kind == "stream":
+        return KlineStreamFeed(timeframe)
+    if kind == "local":
+        return LocalCloseFeed(timeframe)
+    return CandleClock(timeframe)
@@ -0,0 +1,178 @@
+import os
+import threading
+import time
+
+import ccxt
+import pandas as pd
+
+from utils.profiling import get_profiler
+
+OHLCV_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+# 캔들 저장 경로 (프로젝트 루트 기준 data/candles)
+DEFAULT_ROOT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "candles"
+)
+
+
+# 저장 pickle에 "전체로 받아도 limit보다 짧았음" 표시를 남기는 df.attrs 키
+# (Binance 현물 klines는 요청당 최대 1000개 → limit=1500이면 모든 심볼이 여기에 해당)
+SHORT_HISTORY_ATTR = "short_history_limit"
+
+
+def timeframe_to_ms(timeframe):
+    """'5m', '1h' 같은 타임프레임 문자열을 밀리초로 변환"""
+    return ccxt.Exchange.parse_timeframe(timeframe) * 1000
+
+
+class CandleStore:
+    """
+    (심볼, 타임프레임)별 OHLCV 캔들을 사이클 간 유지하는 저장소
+    - 메모리 + 디스크(pickle)에 보관 → systemd 재시작 후에도 바로 복원
+    - 매 사이클 마지막 저장 캔들 이후 구간만 since= 로 받아 이어 붙임
+    - fetch_func(symbol, timeframe, since, limit) -> ccxt fetch_ohlcv 형식 리스트
+    - fetch_many_func([(symbol, timeframe, since, limit), ...]) -> 같은 순서의 리스트
+      (선택, 지정하면 get_many가 한 번에 일괄 요청)
+    """
+
+    def __init__(self, fetch_func, fetch_many_func=None, root=DEFAULT_ROOT):
+        self.fetch_func = fetch_func
+        self.fetch_many_func = fetch_many_func
+        self.root = root
+        self._frames = {}
+        # (symbol, timeframe) → 전체 다운로드해도 limit보다 짧았던 limit
+        # (pickle의 df.attrs[SHORT_HISTORY_ATTR]에도 저장 → 재시작/유니버스 재진입 후에도 유지)
+        self._short_history = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def _lock(self, key):
+        with self._guard:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    def _path(self, symbol, timeframe):
+        name = f"{symbol.replace('/', '_').replace(':', '_')}_{timeframe}.pkl"
+        return os.path.join(self.root, name)
+
+    def _load(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        if key in self._frames:
+            return self._frames[key]
+
+        path = self._path(symbol, timeframe)
+        if not os.path.exists(path):
+            return None
+        try:
+            df = pd.read_pickle(path)
+        except Exception as e:
+            print(f"{symbol} 캔들 파일 읽기 실패 (재다운로드): {e}")
+            return None
+        self._frames[key] = df
+        if SHORT_HISTORY_ATTR in df.attrs:
+            self._short_history[key] = int(df.attrs[SHORT_HISTORY_ATTR])
+        return df
+
+    def _save(self, symbol, timeframe, df):
+        path = self._path(symbol, timeframe)
+        tmp = path + ".tmp"
+        try:
+            os.makedirs(
+                self.root, exist_ok=True
+            )  # import 시점이 아니라 첫 저장 때 생성
+            df.to_pickle(tmp)
+            os.replace(tmp, path)  # 중간에 죽어도 파일이 깨지지 않도록 교체 방식
+        except Exception as e:
+            print(f"{symbol} 캔들 파일 저장 실패: {e}")
+
+    def _plan(self, key, df, timeframe, limit):
+        """
+        다음 요청의 since/limit 결정
+        - 저장분 없음 / 공백이 limit 이상 → 전체 재다운로드 (since=None)
+        - 저장분이 limit개보다 적음 (더 작은 limit으로 저장된 파일 등) → 전체 재다운로드
+          (단, 전체로 받아도 limit보다 짧았던 신규 상장 심볼은 증분 유지)
+        - 그 외 → 마지막 캔들(미완성일 수 있음)부터 다시 받아 덮어쓰기
+        """
+        since, fetch_limit = None, limit
+        backfilled = df is not None and (
+            len(df) >= limit or self._short_history.get(key, 0) >= limit
+        )
+        if backfilled and not df.empty:
+            tf_ms = timeframe_to_ms(timeframe)
+            last_ts = int(df["timestamp"].iloc[-1])
+            now_ms = int(time.time() * 1000)
+            missing = (now_ms - last_ts) // tf_ms + 1
+            if missing < limit:
+                since, fetch_limit = last_ts, int(missing) + 1
+
+        # 증분 다운로드면 적중, 전체 재다운로드면 미스
+        get_profiler().cache_event("candle_store", since is not None)
+        return since, fetch_limit
+
+    def _merge(self, symbol, timeframe, limit, since, rows):
+        """받아온 캔들을 저장분에 이어 붙이고 디스크에 반영 (키 잠금 안에서 호출)"""
+        key = (symbol, timeframe)
+        df = self._frames.get(key)
+        new = pd.DataFrame(rows, columns=OHLCV_COLUMNS)
+
+        if since is None or df is None:
+            merged = new
+            # 전체로 받았는데 limit보다 짧으면 거래소 이력이 그만큼뿐 (다음부터 증분)
+            if since is None and len(new) < limit:
+                self._short_history[key] = limit
+            else:
+                self._short_history.pop(key, None)
+        else:
+            merged = pd.concat([df, new], ignore_index=True)
+            merged = merged.drop_duplicates(subset="timestamp", keep="last")
+
+        merged = merged.sort_values("timestamp").tail(limit).reset_index(drop=True)
+        if key in self._short_history:
+            merged.attrs[SHORT_HISTORY_ATTR] = self._short_history[key]
+        self._frames[key] = merged
+        self._save(symbol, timeframe, merged)
+        return merged.copy()
+
+    def get(self, symbol, timeframe, limit):
+        """최신 상태로 갱신한 뒤 마지막 limit개 캔들 DataFrame 반환"""
+        with self._lock((symbol, timeframe)):
+            df = self._load(symbol, timeframe)
+            since, fetch_limit = self._plan((symbol, timeframe), df, timeframe, limit)
+            rows = self.fetch_func(symbol, timeframe, since, fetch_limit)
+            return self._merge(symbol, timeframe, limit, since, rows)
+
+    def get_many(self, symbols, timeframe, limit):
+        """
+        여러 심볼을 한 번에 갱신 (fetch_many_func로 일괄 요청)
+        - 반환: {symbol: DataFrame} (실패한 심볼은 제외)
+        """
+        if self.fetch_many_func is None:
+            return {s: self.get(s, timeframe, limit) for s in symbols}
+
+        plans = []
+        for symbol in symbols:
+            df = self._load(symbol, timeframe)
+            since, fetch_limit = self._plan((symbol, timeframe), df, timeframe, limit)
+            plans.append((symbol, timeframe, since, fetch_limit))
+
+        responses = self.fetch_many_func(plans)
+
+        frames = {}
+        for (symbol, _, since, _), rows in zip(plans, responses):
+            if isinstance(rows, Exception):
+                print(f"{symbol} OHLCV 가져오기 실패: {rows}")
+                continue
+            with self._lock((symbol, timeframe)):
+                frames[symbol] = self._merge(symbol, timeframe, limit, since, rows)
+        return frames
+
+    def retain(self, symbols):
+        """
+        유니버스에서 빠진 심볼은 메모리에서 제거 (디스크 파일은 유지)
+        - 짧은 이력 표시(_short_history)는 남김 → 다시 들어와도 전체 재다운로드 없이 증분
+        """
+        keep = set(symbols)
+        for key in list(self._frames):
+            if key[0] not in keep:
+                self._frames.pop(key, None)
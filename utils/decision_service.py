@@ -0,0 +1,264 @@
+import ast
+import json
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from utils.bot import (
+    DECISION_SCHEMA,
+    ask_ai_investment,
+    clean_numpy,
+    decision_cache,
+    decision_fingerprint,
+)
+
+# AI 결정 전체 시간 예산(초): 넘기면 로컬 대체 결정으로 진행
+DECISION_BUDGET = float(os.getenv("AI_DECISION_BUDGET", "20"))
+
+# 첫 요청이 이 시간(초) 안에 유효한 답을 못 주면 같은 요청을 하나 더 보냄 (먼저 온 유효 응답 사용)
+HEDGE_DELAY = float(os.getenv("AI_HEDGE_DELAY", "8"))
+
+# 진입가가 현재가에서 이 비율 넘게 떨어져 있으면 무효
+MAX_ENTRY_DEVIATION = 0.05
+
+# 로컬 대체 결정: 예측 구간이 현재가를 감싸지 않을 때 쓰는 TP/SL 폭
+FALLBACK_TP = 0.01
+FALLBACK_SL = 0.01
+
+ACTIONS = {"BUY": "BUY", "LONG": "BUY", "SELL": "SELL", "SHORT": "SELL"}
+
+
+def _extract_json(text):
+    """응답 텍스트 → dict (코드 블록, 앞뒤 설명, 작은따옴표 표기 복구)"""
+    text = re.sub(r"^```[a-zA-Z]*\s*|\s*```$", "", text.strip())
+    m = re.search(r"\{.*\}", text, re.S)
+    if m is None:
+        raise ValueError("응답에 JSON 객체 없음")
+    body = m.group(0)
+    try:
+        obj = json.loads(body)
+    except ValueError:
+        # 프롬프트 예시처럼 작은따옴표로 온 경우 (파이썬 dict 표기)
+        try:
+            obj = ast.literal_eval(body)
+        except (ValueError, SyntaxError):
+            raise ValueError("JSON 복구 실패") from None
+    if not isinstance(obj, dict):
+        raise ValueError("JSON 객체가 아님")
+    return obj
+
+
+def parse_decision(text, candidates):
+    """
+    AI 응답 → 검증된 결정 dict (place_trade 입력 형식)
+    - 복구: 코드 블록/설명 제거, 작은따옴표, 키 대소문자, LONG/SHORT → BUY/SELL, 숫자 문자열
+    - 검증: DECISION_SCHEMA 필수 키, 후보 목록에 있는 종목, 양수 가격,
+      진입가가 현재가 ±MAX_ENTRY_DEVIATION 이내, stop_loss < entry_price < take_profit
+      (place_trade의 OCO 배치: SELL도 재매수가(stop_loss)가 아래, 손절 트리거(take_profit)가 위
+       → 일반적인 숏 표기(TP 아래/SL 위)로 오면 서로 바꿈)
+    - 실패하면 ValueError
+    """
+    raw = {str(k).strip().lower(): v for k, v in _extract_json(text).items()}
+    missing = [k for k in DECISION_SCHEMA["required"] if raw.get(k) in (None, "")]
+    if missing:
+        raise ValueError(f"필수 키 없음: {missing}")
+
+    decision = {
+        "symbol": str(raw["symbol"]).strip().upper(),
+        "action": ACTIONS.get(str(raw["action"]).strip().upper()),
+        "reason": str(raw.get("reason") or ""),
+    }
+    if decision["action"] is None:
+        raise ValueError(f"알 수 없는 action: {raw['action']}")
+    try:
+        for k in ("entry_price", "take_profit", "stop_loss"):
+            decision[k] = float(str(raw[k]).replace(",", ""))
+    except ValueError:
+        raise ValueError(f"가격 형식 오류: {raw}") from None
+
+    by_symbol = {c["종목"]: c for c in candidates}
+    candidate = by_symbol.get(decision["symbol"])
+    if candidate is None:
+        raise ValueError(f"후보에 없는 종목: {decision['symbol']}")
+
+    entry, tp, sl = (
+        decision["entry_price"],
+        decision["take_profit"],
+        decision["stop_loss"],
+    )
+    if min(entry, tp, sl) <= 0:
+        raise ValueError("가격은 양수여야 함")
+    price = candidate.get("현재가")
+    if price and abs(entry / float(price) - 1) > MAX_ENTRY_DEVIATION:
+        raise ValueError(f"진입가 {entry}가 현재가 {price}에서 너무 멂")
+    if decision["action"] == "SELL" and tp < entry < sl:
+        decision["take_profit"], decision["stop_loss"] = sl, tp
+        tp, sl = sl, tp
+    if not sl < entry < tp:
+        raise ValueError(f"가격 배치 오류: SL {sl} < 진입 {entry} < TP {tp} 아님")
+    return decision
+
+
+def local_decision(candidates):
+    """
+    AI 없이 정하는 대체 결정 (같은 후보면 항상 같은 결과)
+    - select_trading_candidates 점수("_점수") 최고 후보, 동점이면 종목명 순
+    - 진입가 = 현재가, TP/SL = 예측 구간 상단/하단 (현재가를 감싸지 않으면 ±FALLBACK_TP/SL)
+    """
+    priced = [c for c in candidates if c.get("현재가")]
+    if not priced:
+        return None
+    best = min(priced, key=lambda c: (-(c.get("_점수") or 0), c["종목"]))
+    price = float(best["현재가"])
+    fc = best.get("예측가") or {}
+    upper, lower = fc.get("최고"), fc.get("최저")
+    return {
+        "symbol": best["종목"],
+        "action": "BUY" if "LONG" in best["신호"] else "SELL",
+        "entry_price": price,
+        "take_profit": (
+            float(upper) if upper and upper > price else price * (1 + FALLBACK_TP)
+        ),
+        "stop_loss": (
+            float(lower) if lower and lower < price else price * (1 - FALLBACK_SL)
+        ),
+        "reason": (
+            f"AI 응답 없음 → 로컬 대체 결정 "
+            f"(점수 {best.get('_점수')} 최고 후보, {best['신호']}, 예측 구간 기준 TP/SL)"
+        ),
+    }
+
+
+class DecisionService:
+    """
+    AI 매매 결정 (결정 캐시 + 시간 예산 + 헤지 요청 + 로컬 대체)
+    - decide(): 결정 캐시(utils.bot.DecisionCache)를 한 번 조회 → 적중하면 요청 없이 사용
+      → 미스면 첫 요청, HEDGE_DELAY 안에 유효한 답이 없거나 첫 요청이 실패하면 두 번째 요청
+      → 먼저 도착한 유효 응답 사용 (검증 통과 응답만 캐시), DECISION_BUDGET을 넘기면 local_decision
+    - model_call(candidates, timeout) -> 응답 텍스트 (기본 utils.bot.ask_ai_investment,
+      재생/테스트에서는 utils.fake_model.http_model_call)
+    - cache: None이면 결정 캐시 사용 안 함
+    - 예산을 넘긴 요청은 버려지고, 요청 자체는 HTTP 제한 시간(=예산)에서 끊김
+    """
+
+    def __init__(
+        self,
+        model_call=None,
+        budget=DECISION_BUDGET,
+        hedge_delay=HEDGE_DELAY,
+        max_attempts=2,
+        cache=decision_cache,
+    ):
+        self.model_call = model_call or ask_ai_investment
+        self.cache = cache
+        self.budget = budget
+        self.hedge_delay = hedge_delay
+        self.max_attempts = max_attempts
+        self.counts = {"cache": 0, "primary": 0, "hedge": 0, "local": 0, "failed": 0}
+        self._pool = ThreadPoolExecutor(
+            max_workers=2 * max_attempts, thread_name_prefix="ai-decision"
+        )
+
+    def _attempt(self, name, candidates, key):
+        text = self.model_call(candidates, timeout=self.budget)
+        decision = parse_decision(text, candidates)
+        # 검증을 통과한 응답만 캐시 (깨진 응답이 TTL 동안 반복되지 않도록)
+        if key is not None:
+            self.cache.put(key, text)
+        decision["source"] = name
+        return decision
+
+    def _cached(self, candidates):
+        """반환: (캐시 키, 캐시된 결정 또는 None), 캐시를 안 쓰면 (None, None)"""
+        if self.cache is None:
+            return None, None
+        key = decision_fingerprint(clean_numpy(candidates))
+        text = self.cache.lookup(key)
+        if text is None:
+            return key, None
+        try:
+            decision = parse_decision(text, candidates)
+        except ValueError as e:
+            # 같은 구간이어도 진입가 허용 범위 등을 벗어날 수 있음 → 새로 요청
+            print(f"[AI 결정] 캐시된 결정 무효: {e}")
+            return key, None
+        decision["source"] = "cache"
+        return key, decision
+
+    def decide(self, candidates):
+        """반환: 결정 dict ("source": cache / primary / hedge / local), 후보가 비면 None"""
+        start = time.monotonic()
+        key, decision = self._cached(candidates) if candidates else (None, None)
+        if decision is None:
+            decision = self._ask(candidates, key, start)
+
+        if decision is None:
+            decision = local_decision(candidates)
+            if decision is None:
+                return None
+            decision["source"] = "local"
+        kind = "hedge" if decision["source"].startswith("hedge") else decision["source"]
+        self.counts[kind] += 1
+        print(
+            f"[AI 결정] {decision['source']} {time.monotonic() - start:.1f}s "
+            f"(누적 캐시 {self.counts['cache']}, AI {self.counts['primary']}, "
+            f"헤지 {self.counts['hedge']}, "
+            f"로컬 {self.counts['local']}, 실패 응답 {self.counts['failed']})"
+        )
+        return decision
+
+    def _ask(self, candidates, key, start):
+        """시간 예산 안에 첫 요청 + 헤지 요청, 반환: 먼저 온 유효 결정 또는 None"""
+        deadline = start + self.budget
+        hedge_at = start + self.hedge_delay
+        names = ["primary", "hedge"] + [
+            f"hedge{i}" for i in range(2, self.max_attempts)
+        ]
+        launched = 1
+        futures = {
+            self._pool.submit(self._attempt, names[0], candidates, key): names[0]
+        }
+
+        decision = None
+        while futures and decision is None:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            wake = (
+                deadline if launched >= self.max_attempts else min(deadline, hedge_at)
+            )
+            done, _ = wait(
+                futures, timeout=max(0.0, wake - now), return_when=FIRST_COMPLETED
+            )
+            for fut in done:
+                name = futures.pop(fut)
+                try:
+                    decision = fut.result()
+                    break
+                except Exception as e:
+                    print(f"[AI 결정] {name} 실패: {e}")
+                    self.counts["failed"] += 1
+                    hedge_at = time.monotonic()  # 실패했으면 헤지를 바로
+            if decision is None and launched < self.max_attempts:
+                if time.monotonic() >= hedge_at:
+                    name = names[launched]
+                    fut = self._pool.submit(self._attempt, name, candidates, key)
+                    futures[fut] = name
+                    launched += 1
+                    hedge_at = time.monotonic() + self.hedge_delay
+
+        for fut in futures:
+            fut.cancel()  # 아직 시작 안 한 요청만 취소됨 (진행 중 요청은 HTTP 제한 시간에 끊김)
+        return decision
+
+
+_decision_service = None
+
+
+def get_decision_service():
+    """프로세스 공유 DecisionService"""
+    global _decision_service
+    if _decision_service is None:
+        _decision_service = DecisionService()
+    return _decision_service
@@ -3,21 +3,14 @@ import ccxt
 from dotenv import load_dotenv
 import requests
 
+from utils.account_state import get_account_state
+from utils.exchange import create_binance
+from utils.rate_limit import ACCOUNT, request_priority
+
 load_dotenv()
 WEBHOOK_URL = os.getenv("WEBHOOK_URL")
 
-api_key = os.getenv("BINANCE_API_KEY")
-secret_key = os.getenv("BINANCE_SECRET_KEY")
-
-binance = ccxt.binance(
-    {
-        "apiKey": api_key,
-        "secret": secret_key,
-        "enableRateLimit": True,
-        "options": {"defaultType": "spot"},
-    }
-)
-binance.load_markets()
+binance = create_binance()
 
 
 def send_message(msg: str):
@@ -69,7 +62,15 @@ def get_usdt_price(symbol: str):
 
 
 def send_portfolio_message():
-    balance = binance.fetch_balance()
+    with request_priority(ACCOUNT):
+        _send_portfolio_message()
+
+
+def _send_portfolio_message():
+    # 주문 직후라면 place_trade가 잔고 캐시를 무효화해 두었으므로 새로 조회됨
+    account = get_account_state()
+    balance = account.balance()
+    markets = account.share_markets(binance).markets
 
     # 보유 코인 (USDT 제외)
     total_value_usdt = 0.0
@@ -78,7 +79,7 @@ def send_portfolio_message():
             continue
         if qty and qty > 0:
             symbol = f"{coin}/USDT"
-            price = get_usdt_price(symbol) if symbol in binance.markets else None
+            price = get_usdt_price(symbol) if symbol in markets else None
             value = (qty * price) if price is not None else None
             if value is not None:
                 total_value_usdt += value
@@ -0,0 +1,50 @@
+import os
+
+import ccxt
+from dotenv import load_dotenv
+
+from utils.rate_limit import attach_scheduler
+
+load_dotenv()
+
+# 거래소 생성 훅 (utils.replay의 기록/재생용). None이면 실제 Binance
+_exchange_factory = None
+
+
+def set_exchange_factory(factory):
+    """
+    create_binance가 쓸 생성 함수 교체
+    - factory(auth, async_mode) -> 거래소 인스턴스, None이면 기본값 복원
+    - 모듈 import 시점에 인스턴스를 만드는 모듈(volume_filter 등)보다 먼저 호출해야 함
+    """
+    global _exchange_factory
+    _exchange_factory = factory
+
+
+def default_binance(auth=True, async_mode=False):
+    """실제 Binance 현물 인스턴스 (공유 가중치 스케줄러 연결)"""
+    config = {
+        "enableRateLimit": True,
+        "options": {"defaultType": "spot"},
+    }
+    if auth:
+        config["apiKey"] = os.getenv("BINANCE_API_KEY")
+        config["secret"] = os.getenv("BINANCE_SECRET_KEY")
+
+    if async_mode:
+        import ccxt.async_support as ccxt_async  # aiohttp 포함이라 필요할 때만
+
+        return attach_scheduler(ccxt_async.binance(config))
+    return attach_scheduler(ccxt.binance(config))
+
+
+def create_binance(auth=True, async_mode=False):
+    """
+    Binance 현물 ccxt 인스턴스 생성 (모든 모듈 공통)
+    - 요청 가중치는 프로세스 공유 스케줄러(utils.rate_limit)가 관리
+    - auth=False면 API 키 없이 공개 시세 전용
+    - async_mode=True면 ccxt.async_support 인스턴스 (utils.market_data)
+    """
+    if _exchange_factory is not None:
+        return _exchange_factory(auth, async_mode)
+    return default_binance(auth, async_mode)
@@ -0,0 +1,102 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from utils.bot import MODEL, encode_candidates
+
+
+class FakeModelServer:
+    """
+    Gemini generateContent REST 응답을 흉내 내는 로컬 HTTP 서버 (AI 결정 경로 재생/테스트)
+    - script: 요청 순서대로 적용할 [(지연초, 응답)], 목록이 끝나면 마지막 항목 반복
+      - 응답: dict → JSON 텍스트, str → 그대로, None → 지연 후 HTTP 500
+    - GEMINI_BASE_URL=server.url 이면 utils.bot의 google.genai 클라이언트도 여기로 연결
+    - calls: 받은 요청 수
+    """
+
+    def __init__(self, script, host="127.0.0.1", port=0):
+        self.script = list(script)
+        self.calls = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                self.rfile.read(length)
+                delay, reply = server._next()
+                time.sleep(delay)
+                try:
+                    if reply is None:
+                        self.send_error(500, "fake model failure")
+                        return
+                    text = reply if isinstance(reply, str) else json.dumps(reply)
+                    body = json.dumps(
+                        {
+                            "candidates": [
+                                {
+                                    "content": {
+                                        "role": "model",
+                                        "parts": [{"text": text}],
+                                    }
+                                }
+                            ]
+                        }
+                    ).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # 클라이언트가 제한 시간으로 먼저 끊은 경우
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self.url = f"http://{host}:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="fake-model", daemon=True
+        )
+
+    def _next(self):
+        with self._lock:
+            step = self.script[min(self.calls, len(self.script) - 1)]
+            self.calls += 1
+            return step
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def http_model_call(base_url, model=MODEL):
+    """
+    google.genai 없이 같은 REST 형식으로 호출하는 model_call (DecisionService용)
+    - 반환 함수: (candidates, timeout=None) -> 응답 텍스트
+    """
+
+    def call(candidates, timeout=None):
+        body = {
+            "contents": [
+                {"role": "user", "parts": [{"text": encode_candidates(candidates)}]}
+            ]
+        }
+        r = requests.post(
+            f"{base_url}/v1beta/models/{model}:generateContent",
+            json=body,
+            timeout=timeout,
+        )
+        r.raise_for_status()
+        return r.json()["candidates"][0]["content"]["parts"][0]["text"]
+
+    return call
@@ -1,7 +1,8 @@
-import ccxt
 import pandas as pd
 import numpy as np
 
+from utils.market_data import get_market_data
+
 # 출력 옵션 설정
 pd.set_option("display.max_columns", None)
 pd.set_option("display.width", None)
@@ -109,16 +110,12 @@ def OBV(df):
     - 가격이 오르면 해당 캔들의 거래량을 더하고, 내리면 빼는 누적 방식
     - 결과값을 거래량 총합으로 나누어 종목 간 비교 가능
     """
-    obv = [0]
-    for i in range(1, len(df)):
-        if df["close"].iloc[i] > df["close"].iloc[i - 1]:
-            obv.append(obv[-1] + df["volume"].iloc[i])
-        elif df["close"].iloc[i] < df["close"].iloc[i - 1]:
-            obv.append(obv[-1] - df["volume"].iloc[i])
-        else:
-            obv.append(obv[-1])
+    close = df["close"].to_numpy(dtype=float)
+    volume = df["volume"].to_numpy(dtype=float)
 
-    obv_series = pd.Series(obv, index=df.index)
+    # 상승 +1 / 하락 -1 / 보합 0 → 부호 × 거래량 누적합 (첫 캔들은 0)
+    direction = np.nan_to_num(np.sign(np.diff(close, prepend=close[:1])))
+    obv_series = pd.Series(np.cumsum(direction * volume), index=df.index)
 
     # 정규화 (거래량 총합 대비 %)
     obv_series = obv_series / df["volume"].sum() * 100
@@ -126,13 +123,143 @@ def OBV(df):
     return obv_series
 
 
-# === 메인 함수 ===
-def get_indicators(symbol, timeframe, limit):
-    binance = ccxt.binance()
-    ohlcv = binance.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
-    df = pd.DataFrame(
-        ohlcv, columns=["timestamp", "open", "high", "low", "close", "volume"]
-    )
+# === 캔들 수집 ===
+# 공유 비동기 시세 서비스(커넥션 풀 1개)를 통해 요청
+def fetch_candles(symbol, timeframe, since=None, limit=None):
+    """ccxt fetch_ohlcv 원본 리스트 반환 (since 지정 시 그 이후만)"""
+    return get_market_data().fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
+
+
+def fetch_candles_many(requests):
+    """[(symbol, timeframe, since, limit), ...] 를 한 번에 동시 조회"""
+    return get_market_data().fetch_ohlcv_many(requests)
+
+
+# === NumPy 지표 엔진 ===
+# 한 번에 꺼낸 연속 NumPy 배열로 모든 지표를 계산 (중간 Series 생성 없음)
+# - 롤링 평균/표준편차: sliding_window_view 하나를 SMA20과 볼린저밴드가 공유
+# - EMA: 블록 단위 행렬곱 커널 하나를 EMA20, MACD(12/26/9)가 재사용
+_EMA_BLOCK = 32
+
+
+def _rolling_windows(x, window):
+    """길이 window의 슬라이딩 뷰 (복사 없음)"""
+    return np.lib.stride_tricks.sliding_window_view(x, window, axis=-1)
+
+
+def _pad_front(values, n):
+    """롤링 결과 앞쪽(window-1칸)을 NaN으로 채워 원래 길이로 맞춤"""
+    out = np.full(values.shape[:-1] + (n,), np.nan)
+    out[..., n - values.shape[-1] :] = values
+    return out
+
+
+def _ema_kernel(x, span):
+    """
+    pandas ewm(span, adjust=False).mean()과 같은 값의 EMA
+    - y[t] = (1-a)·y[t-1] + a·x[t], y[0] = x[0]
+    - 32개 블록으로 나눠 블록 내부는 하삼각 가중치 행렬곱, 블록 간 carry만 순차 계산
+    """
+    n = len(x)
+    if n == 0:
+        return np.empty(0)
+    a = 2.0 / (span + 1.0)
+    d = 1.0 - a
+    L = _EMA_BLOCK
+
+    n_blocks = -(-n // L)
+    padded = np.zeros(n_blocks * L)
+    padded[:n] = x
+    blocks = padded.reshape(n_blocks, L)
+
+    k = np.arange(L)
+    lag = k[:, None] - k[None, :]
+    weights = np.where(lag >= 0, a * d ** np.clip(lag, 0, None), 0.0)
+    decay = d ** (k + 1)  # 블록 직전 값(carry)의 기여도
+
+    partial = blocks @ weights.T
+
+    # 블록 간 carry 전파 (첫 값 y[0]=x[0]이 되도록 carry 초기값 = x[0])
+    carries = np.empty(n_blocks)
+    carry = x[0]
+    last_decay = decay[-1]
+    for b in range(n_blocks):
+        carries[b] = carry
+        carry = partial[b, -1] + last_decay * carry
+
+    out = partial + carries[:, None] * decay[None, :]
+    return out.reshape(-1)[:n]
+
+
+def compute_indicator_arrays(high, low, close, volume):
+    """get_indicators와 동일한 보조지표 컬럼을 NumPy 배열 dict로 반환"""
+    n = len(close)
+    out = {}
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # SMA20 + 볼린저밴드 (같은 20봉 윈도우 공유)
+        if n >= 20:
+            win20 = _rolling_windows(close, 20)
+            sma20 = _pad_front(win20.mean(axis=-1), n)
+            std20 = _pad_front(win20.std(axis=-1, ddof=1), n)
+        else:
+            sma20 = np.full(n, np.nan)
+            std20 = np.full(n, np.nan)
+        out["SMA20"] = (sma20 - close) / close * 100
+
+        # EMA 커널 공유 (EMA20, MACD 12/26, 시그널 9)
+        ema20 = _ema_kernel(close, 20)
+        out["EMA20"] = (ema20 - close) / close * 100
+
+        # RSI14: 상승폭/하락폭을 한 배열로 쌓아서 한 번에 롤링 평균
+        delta = np.diff(close, prepend=np.nan)
+        moves = np.stack(
+            [np.where(delta > 0, delta, 0.0), np.where(delta < 0, -delta, 0.0)]
+        )
+        if n >= 14:
+            avg_moves = _pad_front(_rolling_windows(moves, 14).mean(axis=-1), n)
+        else:
+            avg_moves = np.full((2, n), np.nan)
+        rs = avg_moves[0] / avg_moves[1]
+        out["RSI14"] = 100 - (100 / (1 + rs))
+
+        ema12 = _ema_kernel(close, 12)
+        ema26 = _ema_kernel(close, 26)
+        macd = (ema12 - ema26) / ema26 * 100
+        signal = _ema_kernel(macd, 9)
+        out["MACD"] = macd
+        out["MACD_signal"] = signal
+        out["MACD_hist"] = macd - signal
+
+        upper_band = sma20 + std20 * 2
+        lower_band = sma20 - std20 * 2
+        out["BB_upper"] = (upper_band - sma20) / sma20 * 100
+        out["BB_mid"] = np.zeros(n, dtype=np.int64)  # 중간선은 항상 0%
+        out["BB_lower"] = (lower_band - sma20) / sma20 * 100
+
+        # ATR14 (첫 캔들은 전일 종가가 없으므로 high-low만 사용)
+        prev_close = np.concatenate([[np.nan], close[:-1]])
+        true_range = np.fmax(
+            high - low,
+            np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)),
+        )
+        if n >= 14:
+            atr = _pad_front(_rolling_windows(true_range, 14).mean(axis=-1), n)
+        else:
+            atr = np.full(n, np.nan)
+        out["ATR14"] = atr / close * 100
+
+        # OBV: 종가 변화 부호 × 거래량 누적합, 거래량 총합 대비 %
+        direction = np.nan_to_num(np.sign(np.diff(close, prepend=close[:1])))
+        out["OBV"] = np.cumsum(direction * volume) / np.nansum(volume) * 100
+
+    return out
+
+
+# === 지표 계산 ===
+def compute_indicators_pandas(df):
+    """기존 pandas Series 기반 지표 계산 (정합성 비교/벤치마크용 기준 구현)"""
+    df = df.copy()
     df["ds"] = pd.to_datetime(df["timestamp"], unit="ms")
 
     # 지표 계산 (SMA, EMA, MACD, RSI, BB, ATR, OBV)
@@ -144,4 +271,30 @@ def get_indicators(symbol, timeframe, limit):
     df["ATR14"] = ATR(df, 14)
     df["OBV"] = OBV(df)
 
-    return df  # 전체 DataFrame 반환
+    return df
+
+
+def compute_indicators(df):
+    """OHLCV DataFrame(timestamp~volume)에 ds와 보조지표 컬럼을 추가해서 반환"""
+    arrays = {"ds": pd.to_datetime(df["timestamp"], unit="ms")}
+    arrays.update(
+        compute_indicator_arrays(
+            df["high"].to_numpy(dtype=float),
+            df["low"].to_numpy(dtype=float),
+            df["close"].to_numpy(dtype=float),
+            df["volume"].to_numpy(dtype=float),
+        )
+    )
+
+    # 컬럼을 하나씩 추가하지 않고 한 번에 붙임
+    extra = pd.DataFrame(arrays, index=df.index)
+    return pd.concat([df.drop(columns=list(arrays), errors="ignore"), extra], axis=1)
+
+
+# === 메인 함수 ===
+def get_indicators(symbol, timeframe, limit):
+    ohlcv = fetch_candles(symbol, timeframe, limit=limit)
+    df = pd.DataFrame(
+        ohlcv, columns=["timestamp", "open", "high", "low", "close", "volume"]
+    )
+    return compute_indicators(df)  # 전체 DataFrame 반환
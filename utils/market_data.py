@@ -0,0 +1,111 @@
+import asyncio
+import atexit
+import threading
+
+from utils.account_state import get_account_state
+from utils.exchange import create_binance
+
+# 동시에 날아가는 시세 요청 상한 (거래소 1개 / 커넥션 풀 공유)
+DEFAULT_CONCURRENCY = 20
+
+
+class MarketDataService:
+    """
+    ccxt.async_support 기반 시세 조회 서비스
+    - 전용 이벤트 루프 스레드 1개 + 공유 거래소 인스턴스 1개 (keep-alive 커넥션 풀 재사용)
+    - 세마포어로 동시 요청 수 제한
+    - 동기 함수(fetch_ohlcv, fetch_ohlcv_many)로 감싸서 기존 스레드 코드에서도 그대로 호출
+    """
+
+    def __init__(self, max_concurrency=DEFAULT_CONCURRENCY, exchange_factory=None):
+        self.max_concurrency = max_concurrency
+        self._exchange_factory = exchange_factory or self._default_exchange
+        self._exchange = None
+        self._semaphore = None
+        self._markets_ready = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="market-data", daemon=True
+        )
+        self._thread.start()
+
+    @staticmethod
+    def _default_exchange():
+        # 동기 인스턴스들과 가중치 예산 공유 (재생 모드면 ReplayBinance)
+        return create_binance(auth=False, async_mode=True)
+
+    # --- 이벤트 루프 내부 (async) ---
+    async def _client(self):
+        if self._exchange is None:
+            self._exchange = self._exchange_factory()
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            # 시장 정보는 공유 캐시에서 (요청마다 load_markets 재다운로드 방지)
+            self._markets_ready = asyncio.get_running_loop().run_in_executor(
+                None, get_account_state().share_markets, self._exchange
+            )
+        await self._markets_ready
+        return self._exchange
+
+    async def _fetch_ohlcv(self, symbol, timeframe, since, limit):
+        exchange = await self._client()
+        async with self._semaphore:
+            return await exchange.fetch_ohlcv(
+                symbol, timeframe=timeframe, since=since, limit=limit
+            )
+
+    async def _fetch_ohlcv_many(self, requests):
+        tasks = [self._fetch_ohlcv(*req) for req in requests]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _fetch_tickers(self, symbols):
+        exchange = await self._client()
+        async with self._semaphore:
+            return await exchange.fetch_tickers(symbols)
+
+    async def _close(self):
+        if self._exchange is not None:
+            await self._exchange.close()
+            self._exchange = None
+
+    # --- 동기 인터페이스 ---
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        return self._run(self._fetch_ohlcv(symbol, timeframe, since, limit))
+
+    def fetch_ohlcv_many(self, requests):
+        """
+        여러 심볼 캔들을 이벤트 루프 한 번에 동시 조회
+        - requests: [(symbol, timeframe, since, limit), ...]
+        - 반환: requests 순서대로 캔들 리스트 또는 Exception
+        """
+        if not requests:
+            return []
+        return self._run(self._fetch_ohlcv_many(list(requests)))
+
+    def fetch_tickers(self, symbols=None):
+        return self._run(self._fetch_tickers(symbols))
+
+    def close(self):
+        if not self._loop.is_running():
+            return
+        try:
+            self._run(self._close())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_market_data():
+    """프로세스 전체에서 공유하는 MarketDataService (첫 호출 시 생성)"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = MarketDataService()
+            atexit.register(_service.close)
+        return _service
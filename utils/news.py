@@ -2,17 +2,25 @@ import os
 import requests
 from datetime import datetime
 from dotenv import load_dotenv
-from newsdataapi import NewsDataApiClient
 
 load_dotenv()
 
-# NewsData API 사용
+# NewsData API 사용 (클라이언트는 처음 호출할 때 생성)
 api_key_newsdata = os.getenv("LATEST_NEWS_API_KEY_NEWSDATA")
-api = NewsDataApiClient(apikey=api_key_newsdata)
+_api = None
+
+
+def get_newsdata_client():
+    global _api
+    if _api is None:
+        from newsdataapi import NewsDataApiClient
+
+        _api = NewsDataApiClient(apikey=api_key_newsdata)
+    return _api
 
 
 def fetch_newsdata_latest():
-    response = api.latest_api(
+    response = get_newsdata_client().latest_api(
         q="cryptocurrency",
         max_result=10,  # 기사 수 제한 10개 (1 크레딧 당 10개 기사)
         scroll=False,
@@ -110,4 +118,6 @@ def get_all_news(search_keyword):
         print("-" * 50)
 
 
-get_all_news("Ethereum")
+# 직접 실행할 때만 조회 (import 시에는 네트워크 요청 없음)
+if __name__ == "__main__":
+    get_all_news("Ethereum")
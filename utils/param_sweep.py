@@ -0,0 +1,239 @@
+import itertools
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from filters.basic_filter import BASIC_COLUMNS, basic_signal_arrays
+from utils.backtest import (
+    DEFAULT_EXITS,
+    DEFAULT_RULES,
+    exit_table,
+    prepare_arrays,
+    signal_sides,
+    summarize_returns,
+    trade_results,
+)
+
+# 탐색 대상 임계값 (코드 곳곳에 하드코딩된 값들)
+# - lookback_cross / obv_lookback / rsi_long / rsi_short: basic_filter_df
+# - vol_window: get_vol_metrics의 tail(20) 평균 구간
+# - range_band: select_trading_candidates의 진입 위치 구간 (LONG 0.1~0.5)
+DEFAULT_GRID = {
+    "lookback_cross": [2, 3, 5],
+    "obv_lookback": [3, 5, 8],
+    "rsi_long": [(45, 75), (50, 70), (40, 80)],
+    "rsi_short": [(25, 55), (30, 50), (20, 60)],
+    "vol_window": [10, 20, 40],
+    "range_band": [None, (0.1, 0.5), (0.0, 0.3)],
+}
+
+RULE_KEYS = ("lookback_cross", "obv_lookback", "rsi_long", "rsi_short")
+
+# 24시간 거래대금 (5분봉 288개) - top100_markets의 quoteVolume 대용
+VOLUME_WINDOW = 288
+
+# 워커 프로세스 공유 데이터 (fork로 상속, 읽기 전용)
+_shared = None
+_vol_masks = {}
+
+
+def grid_params(grid=None):
+    """격자 전체 조합 목록"""
+    grid = grid or DEFAULT_GRID
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+
+
+def random_params(n, grid=None, seed=0):
+    """격자에서 서로 다른 조합 n개 무작위 추출"""
+    combos = grid_params(grid)
+    if n >= len(combos):
+        return combos
+    return random.Random(seed).sample(combos, n)
+
+
+def _rolling_mean(x, window):
+    """시간축(axis 0) 롤링 평균, 구간이 모자라거나 NaN이 섞이면 NaN"""
+    nan = np.isnan(x)
+    csum = np.cumsum(np.where(nan, 0.0, x), axis=0)
+    ncount = np.cumsum(nan, axis=0)
+    out = np.full(x.shape, np.nan)
+    out[window - 1 :] = csum[window - 1 :]
+    out[window:] -= csum[:-window]
+    bad = ncount.copy()
+    bad[window:] -= ncount[:-window]
+    out[window - 1 :] /= window
+    out[bad > 0] = np.nan
+    return out
+
+
+def align_universe(arrays_by_symbol):
+    """
+    심볼별 배열을 공통 타임스탬프 구간으로 맞춰 (T, 심볼수) 행렬로 쌓음
+    - 지표는 심볼별 전체 이력으로 계산된 값을 잘라 씀
+    """
+    symbols = list(arrays_by_symbol)
+    common = arrays_by_symbol[symbols[0]]["timestamp"]
+    for s in symbols[1:]:
+        common = np.intersect1d(common, arrays_by_symbol[s]["timestamp"])
+
+    aligned = {}
+    for s in symbols:
+        a = arrays_by_symbol[s]
+        pos = np.searchsorted(a["timestamp"], common)
+        aligned[s] = {k: v[pos] for k, v in a.items()}
+
+    columns = BASIC_COLUMNS + ("ATR14", "BB_upper", "BB_lower", "volume")
+    matrix = {c: np.column_stack([aligned[s][c] for s in symbols]) for c in columns}
+    return symbols, aligned, matrix
+
+
+def volatility_mask(matrix, window):
+    """
+    filter_by_volatility를 모든 시점에 적용: 점수 상위 절반이면 True
+    - 점수 = (최근 window봉 ATR 평균 + |밴드폭 평균|) × log(1 + 24시간 거래대금)
+    """
+    atr = _rolling_mean(matrix["ATR14"], window)
+    width = _rolling_mean(matrix["BB_upper"] - matrix["BB_lower"], window)
+    quote = _rolling_mean(matrix["close"] * matrix["volume"], VOLUME_WINDOW)
+    score = (atr + np.abs(width)) * np.log1p(quote * VOLUME_WINDOW)
+
+    score = np.where(np.isnan(score), -np.inf, score)
+    valid = np.isfinite(score).sum(axis=1, keepdims=True)
+    rank = np.argsort(np.argsort(-score, axis=1), axis=1)
+    return (rank < np.maximum(1, valid // 2)) & np.isfinite(score)
+
+
+def range_position(matrix):
+    """
+    볼린저밴드 안 종가 위치 (0=하단, 1=상단)
+    - select_trading_candidates는 Prophet 예측구간 기준이지만 과거 전 시점을
+      다시 예측할 수 없어 같은 20봉 95% 구간인 볼린저밴드로 대신함
+    """
+    close = matrix["close"]
+    sma = close * (1 + matrix["SMA20"] / 100)
+    upper = sma * (1 + matrix["BB_upper"] / 100)
+    lower = sma * (1 + matrix["BB_lower"] / 100)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(upper != lower, (close - lower) / (upper - lower), 0.5)
+
+
+def build_shared(frames, exits=None):
+    """
+    탐색 전 1회 계산: 심볼별 지표 → 공통 구간 행렬 + 심볼별 청산 결과표
+    - frames: {symbol: OHLCV DataFrame} 또는 {symbol: prepare_arrays 결과}
+    """
+    exits = {**DEFAULT_EXITS, **(exits or {})}
+    arrays = {
+        s: d if isinstance(d, dict) else prepare_arrays(d) for s, d in frames.items()
+    }
+    symbols, aligned, matrix = align_universe(arrays)
+
+    # 청산 결과표도 (T, 심볼수)로 쌓음: tables[side][k] (k=진입가/청산인덱스/청산가/사유)
+    per_symbol = [exit_table(aligned[s], exits) for s in symbols]
+    tables = {
+        side: [np.column_stack([t[side][k] for t in per_symbol]) for k in range(4)]
+        for side in (1, -1)
+    }
+    return {
+        "symbols": symbols,
+        "matrix": matrix,
+        "tables": tables,
+        "range_position": range_position(matrix),
+        "exits": exits,
+    }
+
+
+def _init_worker(shared):
+    global _shared
+    _shared = shared
+    _vol_masks.clear()
+
+
+def _vol_mask(shared, window):
+    if window not in _vol_masks:
+        _vol_masks[window] = volatility_mask(shared["matrix"], window)
+    return _vol_masks[window]
+
+
+def evaluate_params(params, mode="both", shared=None):
+    """
+    파라미터 1세트 점수 계산 (심볼 전체)
+    - 신호는 (T, 심볼수) 행렬로 한 번에, 청산은 미리 계산한 결과표에서 조회
+    """
+    shared = shared or _shared
+    m = shared["matrix"]
+    exits = shared["exits"]
+    rules = {**DEFAULT_RULES, **{k: params[k] for k in RULE_KEYS if k in params}}
+
+    signals = basic_signal_arrays({c: m[c] for c in BASIC_COLUMNS}, **rules)
+    n = m["close"].shape[0]
+    side = signal_sides(signals, mode, last_entry=n - exits["max_hold"] - 1)
+
+    if params.get("vol_window"):
+        side[~_vol_mask(shared, params["vol_window"])] = 0
+    if params.get("range_band"):
+        lo, hi = params["range_band"]
+        pos = shared["range_position"]
+        side[(side > 0) & ~((pos >= lo) & (pos <= hi))] = 0
+        side[(side < 0) & ~((pos >= 1 - hi) & (pos <= 1 - lo))] = 0
+
+    tables = shared["tables"]
+    returns, times = [], []
+    for j in range(side.shape[1]):
+        col = side[:, j]
+        exit_arrays = tuple(
+            np.where(col > 0, tables[1][k][:, j], tables[-1][k][:, j]) for k in range(4)
+        )
+        trades = trade_results(col, exit_arrays, exits["fee_rate"])
+        returns.append(trades["return"])
+        times.append(trades["signal_idx"])
+
+    returns = np.concatenate(returns) if returns else np.array([])
+    order = np.argsort(np.concatenate(times), kind="stable") if times else []
+    return {**params, **summarize_returns(returns[order])}
+
+
+def run_sweep(
+    frames,
+    params_list=None,
+    exits=None,
+    mode="both",
+    max_workers=None,
+    metric="avg_return",
+    min_trades=30,
+):
+    """
+    파라미터 탐색
+    - 지표/청산표는 build_shared로 1회만 계산, 프로세스 풀 워커는 fork로 읽기 전용 공유
+    - 반환: metric 기준 내림차순 순위표 (거래 수 min_trades 미만은 아래로)
+    """
+    params_list = params_list or grid_params()
+    shared = build_shared(frames, exits)
+
+    rows = []
+    workers = min(max_workers or os.cpu_count() or 1, len(params_list))
+    ctx = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(shared,),
+    ) as pool:
+        futures = {pool.submit(evaluate_params, p, mode): p for p in params_list}
+        for fut in as_completed(futures):
+            try:
+                rows.append(fut.result())
+            except Exception as e:
+                print(f"파라미터 평가 실패 {futures[fut]}: {e}")
+
+    table = pd.DataFrame(rows)
+    if table.empty:
+        return table
+    table["eligible"] = table["trades"] >= min_trades
+    table = table.sort_values(["eligible", metric], ascending=False)
+    return table.drop(columns="eligible").reset_index(drop=True)
@@ -1,27 +1,24 @@
-import os
-import ccxt
-from dotenv import load_dotenv
+import threading
+import time
+
+from utils.account_state import get_account_state
 from utils.discord_msg import notify_error, notify_trade
+from utils.exchange import create_binance
+from utils.rate_limit import ORDER, request_priority
 
-load_dotenv()
+binance = create_binance()
 
-api_key = os.getenv("BINANCE_API_KEY")
-secret_key = os.getenv("BINANCE_SECRET_KEY")
+# 주문 수량 계산에 쓰는 잔고의 허용 나이(초): 공유 캐시 TTL보다 짧게
+ORDER_BALANCE_MAX_AGE = 10.0
 
-binance = ccxt.binance(
-    config={
-        "apiKey": api_key,
-        "secret": secret_key,
-        "enableRateLimit": True,
-        "options": {"defaultType": "spot"},
-    }
-)
+# 주문 구간 잠금: 잔고 확인 → 주문 → OCO가 다른 주문과 섞이지 않도록 (재진입 가능)
+order_lock = threading.RLock()
 
 
 # 잔고 조회 (USDT만 추출)
 def fetch_balance():
-    balance = binance.fetch_balance()
-    return balance["USDT"]["free"]  # 사용 가능한 USDT 잔고만 리턴
+    # 사용 가능한 USDT 잔고만 리턴 (공유 캐시, 주문 후에는 무효화되어 새로 조회)
+    return get_account_state().free("USDT", max_age=ORDER_BALANCE_MAX_AGE)
 
 
 def place_trade(signal):
@@ -30,7 +27,15 @@ def place_trade(signal):
     - 최소 주문 금액(min_notional) 체크
     - 심볼별 정밀도(precision) 보정
     - 수수료 고려 (실제 free balance 기준)
+    - 주문 경로 요청은 스캔 요청보다 먼저 가중치 예산을 배정받음
+    - order_lock: 동시에 두 주문이 같은 잔고를 쓰지 않도록 한 번에 하나씩
+    - 반환: 지정가 주문이 접수된 시각(time.time()), 주문을 내지 않았으면 None
     """
+    with order_lock, request_priority(ORDER):
+        return _place_trade(signal)
+
+
+def _place_trade(signal):
     symbol = signal["symbol"]
     action = signal["action"].upper()
     entry = float(signal["entry_price"])
@@ -38,11 +43,14 @@ def place_trade(signal):
     sl = float(signal["stop_loss"])
 
     # 현재 잔고
+    account = get_account_state()
     usdt_balance = fetch_balance()
 
-    # 심볼별 마켓 정보
-    market = binance.market(symbol)
+    # 심볼별 마켓 정보 (공유 캐시, 정밀도 보정용으로 주문 인스턴스에도 넣어 둠)
+    account.share_markets(binance)
+    market = account.market(symbol)
     min_notional = market["limits"]["cost"]["min"]
+    ordered_at = None
 
     if action == "BUY":
         # 수수료 반영 후 매수 가능 금액
@@ -76,15 +84,17 @@ def place_trade(signal):
 
         # 지정가 매수
         binance.create_limit_buy_order(symbol, amount, entry)
+        ordered_at = time.time()
+        account.invalidate_balance()
 
         # 체결 확인 후 실제 보유 잔고 확인 (수수료 반영)
         coin = symbol.split("/")[0]
-        coin_balance = binance.fetch_balance()[coin]["free"]
+        coin_balance = account.free(coin)
         filled_amount = float(binance.amount_to_precision(symbol, coin_balance))
 
         if filled_amount <= 0:
             notify_error("⚠️ 매수 후 코인 잔고가 없습니다. OCO 예약 생략")
-            return
+            return ordered_at
 
         notify_trade(signal)
 
@@ -100,11 +110,12 @@ def place_trade(signal):
                 "stopLimitTimeInForce": "GTC",
             }
         )
+        account.invalidate_balance()
 
     elif action == "SELL":
         # 보유 코인 잔고 확인
         coin = symbol.split("/")[0]
-        coin_balance = balances[coin]["free"]
+        coin_balance = account.free(coin, max_age=ORDER_BALANCE_MAX_AGE)
 
         if coin_balance <= 0:
             notify_error(f"⚠️ No {coin} balance to sell")
@@ -137,15 +148,16 @@ def place_trade(signal):
 
         # 지정가 매도
         binance.create_limit_sell_order(symbol, amount, entry)
+        ordered_at = time.time()
+        account.invalidate_balance()
 
         # 체결 후 실제 USDT 잔고 확인
-        balances = binance.fetch_balance()
-        coin_balance = balances[coin]["free"]
+        coin_balance = account.free(coin)
         filled_amount = float(binance.amount_to_precision(symbol, coin_balance))
 
         if filled_amount <= 0:
             notify_error("⚠️ 매도 후 코인 잔고가 없습니다. OCO 예약 생략")
-            return
+            return ordered_at
 
         notify_trade(signal)
 
@@ -161,3 +173,6 @@ def place_trade(signal):
                 "stopLimitTimeInForce": "GTC",
             }
         )
+        account.invalidate_balance()
+
+    return ordered_at
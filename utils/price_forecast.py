@@ -1,7 +1,8 @@
+import time
+import threading
 import ccxt
+import numpy as np
 import pandas as pd
-from prophet import Prophet
-from prophet.diagnostics import cross_validation, performance_metrics
 
 # 출력 옵션 설정
 pd.set_option("display.max_columns", None)
@@ -23,17 +24,154 @@ pd.set_option("display.width", None)
 #     return df
 
 
+# prophet(+ Stan 백엔드, matplotlib)은 import만 1초 가까이 걸려 처음 쓸 때 로드
+# (잔고 부족으로 바로 끝나는 사이클, "fast" 예측기 사용 시에는 로드하지 않음)
+_prophet = None
+
+
+def load_prophet():
+    """
+    prophet 모듈 (첫 호출 시 import → 봇 시작 시 import 비용 없음)
+    - 프로세스 풀 워커는 forkserver가 미리 import한 모듈을 그대로 가져옴
+    """
+    global _prophet
+    if _prophet is None:
+        import prophet
+        import prophet.diagnostics
+
+        _prophet = prophet
+    return _prophet
+
+
 # 모델 학습
-def train_model(df):
-    m = Prophet(
+def _new_model():
+    return load_prophet().Prophet(
         interval_width=0.95,
         changepoint_prior_scale=0.05,
         daily_seasonality=True,
     )
-    m.fit(df[["ds", "y"]])
+
+
+def train_model(df, init=None):
+    """
+    Prophet 학습
+    - init: 이전 학습 파라미터(warm_start_params) → Stan 최적화 시작점으로 사용
+    - 파라미터 모양이 안 맞는 등 warm start 실패 시 처음부터 다시 학습
+    """
+    m = _new_model()
+    if init is None:
+        m.fit(df[["ds", "y"]])
+        return m
+
+    try:
+        m.fit(df[["ds", "y"]], init=init)
+    except Exception as e:
+        print(f"warm start 실패, 새로 학습: {e}")
+        m = _new_model()
+        m.fit(df[["ds", "y"]])
     return m
 
 
+# warm start용 파라미터 추출 (Prophet 공식 문서 방식)
+def warm_start_params(m):
+    """학습된 모델의 Stan 파라미터(k, m, sigma_obs, delta, beta)를 dict로 반환"""
+    res = {}
+    for pname in ["k", "m", "sigma_obs"]:
+        if m.mcmc_samples == 0:
+            res[pname] = float(m.params[pname][0][0])
+        else:
+            res[pname] = float(np.mean(m.params[pname]))
+    for pname in ["delta", "beta"]:
+        if m.mcmc_samples == 0:
+            res[pname] = np.asarray(m.params[pname][0])
+        else:
+            res[pname] = np.mean(m.params[pname], axis=0)
+    return res
+
+
+class ProphetModelCache:
+    """
+    심볼별 마지막 학습 파라미터 캐시 (사이클 간 warm start)
+    - max_age(초)가 지난 파라미터는 버리고 새로 학습
+    - retain()으로 유니버스에서 빠진 심볼 제거
+    """
+
+    def __init__(self, max_age=3 * 3600):
+        self.max_age = max_age
+        self._params = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, symbol):
+        with self._lock:
+            entry = self._params.get(symbol)
+            if entry is None or time.time() - entry[1] > self.max_age:
+                self._params.pop(symbol, None)
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[0]
+
+    def put(self, symbol, params):
+        if params is None:
+            return
+        with self._lock:
+            self._params[symbol] = (params, time.time())
+
+    def retain(self, symbols):
+        keep = set(symbols)
+        with self._lock:
+            for symbol in list(self._params):
+                if symbol not in keep:
+                    del self._params[symbol]
+
+    def evict_expired(self):
+        now = time.time()
+        with self._lock:
+            for symbol, (_, fitted_at) in list(self._params.items()):
+                if now - fitted_at > self.max_age:
+                    del self._params[symbol]
+
+
+class ValidationCache:
+    """
+    심볼별 교차 검증 MAPE 캐시
+    - every 사이클마다 한 번만 교차 검증을 다시 돌리고, 그 사이엔 캐시된 MAPE 사용
+    """
+
+    def __init__(self, every=6):
+        self.every = every
+        self.cycle = 0
+        self._mape = {}
+        self._lock = threading.Lock()
+
+    def next_cycle(self):
+        with self._lock:
+            self.cycle += 1
+
+    def get(self, symbol):
+        """재검증 주기 안이면 캐시된 MAPE, 아니면 None"""
+        with self._lock:
+            entry = self._mape.get(symbol)
+            if entry is None or self.cycle - entry[1] >= self.every:
+                return None
+            return entry[0]
+
+    def put(self, symbol, mape):
+        if mape is None:
+            return
+        with self._lock:
+            self._mape[symbol] = (mape, self.cycle)
+
+    def retain(self, symbols):
+        keep = set(symbols)
+        with self._lock:
+            for symbol in list(self._mape):
+                if symbol not in keep:
+                    del self._mape[symbol]
+
+
 # 예측
 def get_forecast(m, periods, freq):
     """
@@ -89,19 +227,11 @@ def get_changepoints_summary(model):
     return model.changepoints.to_frame(name="변곡점 발생 시점")
 
 
-# 교차 검증 실행 및 요약
-# initial=학습구간, period=검증주기, horizon=예측기간
-def get_cross_validation_results(
-    m, initial="24 hours", period="6 hours", horizon="6 hours"
-):
-    """
-    Prophet 교차 검증 실행 + 요약
-    - summary_type: "performance" (성능지표), "cv" (예측값 vs 실제), "both" (둘 다)
-    """
-    df_cv = cross_validation(m, initial=initial, period=period, horizon=horizon)
-    df_p = performance_metrics(df_cv)
+# 검증 결과(df_cv) 요약: 교차 검증/홀드아웃 공통
+def _summarize_validation(df_cv):
+    df_p = load_prophet().diagnostics.performance_metrics(df_cv)
 
-    results = {
+    return {
         "cv_summary": df_cv.rename(
             columns={
                 "ds": "예측시점",
@@ -124,19 +254,73 @@ def get_cross_validation_results(
         ),
     }
 
-    return results
+
+# 교차 검증 실행 및 요약
+# initial=학습구간, period=검증주기, horizon=예측기간
+def get_cross_validation_results(
+    m, initial="24 hours", period="6 hours", horizon="6 hours", parallel=None
+):
+    """
+    Prophet 교차 검증 실행 + 요약
+    - summary_type: "performance" (성능지표), "cv" (예측값 vs 실제), "both" (둘 다)
+    - parallel="threads": cutoff별 재학습을 동시에 실행 (Stan 학습은 외부 프로세스라 스레드로도 병렬)
+    """
+    df_cv = load_prophet().diagnostics.cross_validation(
+        m, initial=initial, period=period, horizon=horizon, parallel=parallel
+    )
+    return _summarize_validation(df_cv)
+
+
+# 홀드아웃 검증 (교차 검증 대신 1회 재학습)
+def get_holdout_results(df, horizon="6 hours", init=None):
+    """
+    마지막 horizon 구간을 떼어내고 그 앞까지만 학습 → 떼어낸 구간 예측으로 MAPE 계산
+    - 교차 검증(수 회 재학습) 대비 재학습 1회
+    - 결과 형식은 get_cross_validation_results와 동일
+    """
+    cutoff = df["ds"].max() - pd.Timedelta(horizon)
+    train = df[df["ds"] <= cutoff]
+    test = df[df["ds"] > cutoff]
+
+    m = train_model(train, init=init)
+    predicted = m.predict(test[["ds"]])
+
+    df_cv = predicted[["ds", "yhat", "yhat_lower", "yhat_upper"]].copy()
+    df_cv["y"] = test["y"].to_numpy()
+    df_cv["cutoff"] = cutoff
+    return _summarize_validation(df_cv)
+
+
+# 검증 방식
+# - "cv": 전체 교차 검증 (기존 방식)
+# - "parallel_cv": 교차 검증을 cutoff 단위로 병렬 실행
+# - "holdout": 마지막 구간 1회 홀드아웃 (가장 저렴)
+# - "none": 검증 생략 (상위에서 캐시된 결과를 쓰는 경우)
+VALIDATION_MODES = ("cv", "parallel_cv", "holdout", "none")
+
+
+def run_validation(model, df, validation):
+    if validation == "cv":
+        return get_cross_validation_results(model)
+    if validation == "parallel_cv":
+        return get_cross_validation_results(model, parallel="threads")
+    if validation == "holdout":
+        return get_holdout_results(df, init=warm_start_params(model))
+    if validation == "none":
+        return {"cv_summary": None, "performance_summary": None}
+    raise ValueError(f"알 수 없는 검증 방식: {validation} ({VALIDATION_MODES})")
 
 
 # [메인 실행 함수]
-def run_prophet_analysis(df, forecast_hours, freq):
-    # 1. 모델 학습
-    model = train_model(df)
+def run_prophet_analysis(df, forecast_hours, freq, init=None, validation="cv"):
+    # 1. 모델 학습 (init이 있으면 이전 파라미터에서 시작)
+    model = train_model(df, init=init)
 
     # 2. 예측
     forecast = get_forecast(model, forecast_hours, freq)
 
-    # 3. 교차 검증
-    cv_results = get_cross_validation_results(model)
+    # 3. 검증 (교차 검증 / 홀드아웃 / 생략)
+    cv_results = run_validation(model, df, validation)
 
     # 4. 결과 리턴
     return {
@@ -146,4 +330,5 @@ def run_prophet_analysis(df, forecast_hours, freq):
         "uncertainty_summary": get_uncertainty_summary(forecast),
         "performance_summary": cv_results["performance_summary"],
         "cross_validation_summary": cv_results["cv_summary"],
+        "model_params": warm_start_params(model),
     }
@@ -0,0 +1,238 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+# 사이클 기록 파일 (JSON Lines, 사이클 1건 = 1줄)
+DEFAULT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "profile"
+)
+DEFAULT_PATH = os.path.join(DEFAULT_DIR, "cycles.jsonl")
+
+# cProfile 캡처 시 기록에 남길 상위 함수 개수
+PROFILE_TOP = 25
+
+
+def _cpu_seconds():
+    """
+    현재 프로세스 + 종료된 자식 프로세스 CPU 시간 합
+    (사이클 간 유지되는 Prophet 프로세스 풀 워커는 종료되지 않으므로 심볼 기록 "prophet"의 cpu로 집계)
+    """
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+class CycleProfiler:
+    """
+    스캔 사이클 계측
+    - stage(): 단계별 wall/CPU 시간 + 입력/출력 개수
+    - symbol() / wrap(): 심볼별 wall/CPU(스레드) 시간
+    - record_cache(): 캐시 적중/미스 집계 → 사이클 끝에 적중률 계산
+    - start_cycle(profile=True): 그 사이클 동안 cProfile 캡처 (메인 스레드 기준)
+    - end_cycle(): 기록 dict를 JSON 한 줄로 파일에 추가
+    - record_event(): 사이클 밖에서 끝나는 작업 기록을 같은 파일에 한 줄 추가
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._profile = None
+        self._reset()
+
+    def _reset(self):
+        self._cycle = {
+            "started": time.time(),
+            "stages": [],
+            "symbols": {},
+            "caches": {},
+        }
+        self._wall = time.perf_counter()
+        self._cpu = _cpu_seconds()
+
+    # --- 사이클 ---
+    def start_cycle(self, profile=False):
+        with self._lock:
+            self._reset()
+            if profile:
+                self._profile = cProfile.Profile()
+                self._profile.enable()
+
+    def end_cycle(self, **extra):
+        """사이클 기록 확정 + 파일 저장, 기록 dict 반환"""
+        with self._lock:
+            record = self._cycle
+            record["wall"] = time.perf_counter() - self._wall
+            record["cpu"] = _cpu_seconds() - self._cpu
+            record["caches"] = {
+                name: dict(c, ratio=c["hits"] / max(1, c["hits"] + c["misses"]))
+                for name, c in record["caches"].items()
+            }
+            record.update(extra)
+
+            profile, self._profile = self._profile, None
+            self._reset()
+
+        profile_path = None
+        if profile is not None:
+            profile.disable()
+            profile_path = self.path.replace(
+                ".jsonl", f"-{int(record['started'])}.prof"
+            )
+            record["profile"] = {
+                "file": profile_path,
+                "top": self._top_functions(profile),
+            }
+        self._write(record, profile, profile_path)
+        return record
+
+    @staticmethod
+    def _top_functions(profile):
+        """누적 시간 상위 함수 목록"""
+        stats = pstats.Stats(profile, stream=io.StringIO()).sort_stats("cumulative")
+        top = []
+        for func in stats.fcn_list[:PROFILE_TOP]:
+            calls, _, tottime, cumtime, _ = stats.stats[func]
+            top.append(
+                {
+                    "func": f"{func[0]}:{func[1]}({func[2]})",
+                    "calls": calls,
+                    "tottime": round(tottime, 4),
+                    "cumtime": round(cumtime, 4),
+                }
+            )
+        return top
+
+    def _write(self, record, profile=None, profile_path=None):
+        try:
+            line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with self._write_lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+            if profile is not None:
+                profile.dump_stats(profile_path)  # snakeviz 등으로 열람
+        except Exception as e:
+            print(f"계측 기록 저장 실패: {e}")
+
+    # --- 단계 ---
+    @contextmanager
+    def stage(self, name, n_in=None):
+        """
+        with profiler.stage("basic", n_in=len(items)) as st:
+            ...
+            st["out"] = len(result)
+        """
+        entry = {"name": name, "in": n_in, "out": None}
+        wall, cpu = time.perf_counter(), _cpu_seconds()
+        try:
+            yield entry
+        finally:
+            entry["wall"] = time.perf_counter() - wall
+            entry["cpu"] = _cpu_seconds() - cpu
+            with self._lock:
+                self._cycle["stages"].append(entry)
+
+    # --- 심볼 ---
+    def add_symbol(self, stage, symbol, wall, cpu=None):
+        with self._lock:
+            self._cycle["symbols"].setdefault(stage, {})[symbol] = {
+                "wall": wall,
+                "cpu": cpu,
+            }
+
+    @contextmanager
+    def symbol(self, stage, symbol):
+        """심볼 단위 작업 계측 (CPU는 현재 스레드 기준)"""
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.add_symbol(
+                stage,
+                symbol,
+                time.perf_counter() - wall,
+                time.thread_time() - cpu,
+            )
+
+    def wrap(self, stage, symbol, func):
+        """스레드 풀에 넘길 함수를 심볼 계측으로 감쌈"""
+
+        def timed(*args, **kwargs):
+            with self.symbol(stage, symbol):
+                return func(*args, **kwargs)
+
+        return timed
+
+    # --- 캐시 ---
+    def record_cache(self, name, hits=0, misses=0):
+        with self._lock:
+            c = self._cycle["caches"].setdefault(name, {"hits": 0, "misses": 0})
+            c["hits"] += hits
+            c["misses"] += misses
+
+    def cache_event(self, name, hit):
+        self.record_cache(name, hits=int(bool(hit)), misses=int(not hit))
+
+    # --- 기타 ---
+    def annotate(self, key, value):
+        """사이클 기록에 값 추가 (예: 스캔 커버리지)"""
+        with self._lock:
+            self._cycle[key] = value
+
+    def record_event(self, event, **fields):
+        """
+        사이클이 끝난 뒤 다른 스레드에서 끝나는 작업 기록 (예: TradeWorker 주문 지연)
+        - 사이클 기록 파일에 {"event": event, ...} 한 줄로 바로 추가 (사이클 기록과 "close"로 연결)
+        """
+        self._write({"event": event, "time": time.time(), **fields})
+
+
+_profiler = CycleProfiler()
+
+
+def get_profiler():
+    """프로세스 공유 CycleProfiler"""
+    return _profiler
+
+
+def format_cycle(record):
+    """사이클 기록 한 줄 요약 (콘솔 출력용)"""
+    stages = ", ".join(
+        f"{s['name']} {s['wall']:.2f}s"
+        + (f" ({s['in']}→{s['out']})" if s["in"] is not None else "")
+        for s in record["stages"]
+    )
+    caches = ", ".join(
+        f"{name} {c['ratio'] * 100:.0f}%" for name, c in record["caches"].items()
+    )
+    line = f"[계측] 전체 {record['wall']:.2f}s (CPU {record['cpu']:.2f}s) | {stages}"
+    if caches:
+        line += f" | 캐시 적중 {caches}"
+    coverage = record.get("coverage")
+    if coverage:
+        line += f" | 커버리지 {format_coverage(coverage)}"
+    latency = record.get("latency")
+    if latency:
+        line += " | 봉 마감 후 " + ", ".join(
+            f"{name} {sec:.1f}s" for name, sec in latency.items() if name != "close"
+        )
+    return line
+
+
+def format_coverage(c):
+    """run_filters 커버리지 요약: 스캔한 심볼 / 대상 심볼 (+ 마감 여부)"""
+    line = (
+        f"{c['scanned']}/{c['eligible']} ({c['ratio'] * 100:.0f}%), "
+        f"예측 {c['forecast_done']}/{c['forecast_in']}"
+    )
+    if c.get("prescreened", c["eligible"]) < c["eligible"]:
+        line += f", 사전 선별 {c['prescreened']}"
+    if c.get("deadline") is not None:
+        line += f", {c['elapsed']:.0f}s/{c['deadline']:.0f}s"
+        if not c["complete"]:
+            line += " 마감"
+    return line
@@ -0,0 +1,242 @@
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# 요청 우선순위 (숫자가 작을수록 먼저)
+ORDER = 0  # 주문 경로 (place_trade)
+ACCOUNT = 1  # 잔고/포트폴리오 조회
+SCAN = 2  # 시세 스캔 (fetch_ohlcv, fetch_tickers)
+
+PRIORITY_NAMES = {ORDER: "order", ACCOUNT: "account", SCAN: "scan"}
+
+# Binance 현물 IP 가중치 한도: 1분 6000
+WEIGHT_LIMIT = 6000
+WINDOW_SECONDS = 60
+
+# 스캔 요청이 쓸 수 없는 예비 가중치 (주문/잔고 조회 몫)
+ORDER_RESERVE = 600
+
+# ccxt binance 엔드포인트 cost → 실제 weight 변환 (cost 0.2 == weight 1)
+COST_PER_WEIGHT = 0.2
+
+_priority = contextvars.ContextVar("request_priority", default=SCAN)
+
+
+@contextmanager
+def request_priority(priority):
+    """with 블록 안의 거래소 요청을 지정 우선순위로 예약"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class RequestScheduler:
+    """
+    프로세스 전체 Binance 요청 가중치(weight) 예산 관리
+    - 최근 60초 사용량을 모든 ccxt 인스턴스가 공유 (인스턴스별 throttle 대체)
+    - 우선순위: 주문 > 잔고 > 스캔, 상위 우선순위 대기 중이면 하위는 양보
+    - 스캔은 ORDER_RESERVE 만큼 남겨두고 사용 → 스캔 도중에도 주문은 바로 나감
+    - 응답 헤더(x-mbx-used-weight-1m)로 서버 기준 사용량 보정, 429/418이면 전체 일시정지
+    - 사이클 단위 사용량/최소 여유분 리포트
+    """
+
+    def __init__(
+        self,
+        weight_limit=WEIGHT_LIMIT,
+        window=WINDOW_SECONDS,
+        order_reserve=ORDER_RESERVE,
+    ):
+        self.weight_limit = weight_limit
+        self.window = window
+        self.order_reserve = order_reserve
+        self._cond = threading.Condition()
+        self._events = deque()  # (시각, weight)
+        self._used = 0.0
+        self._waiting = {ORDER: 0, ACCOUNT: 0, SCAN: 0}
+        self._pause_until = 0.0
+        self._reset_cycle()
+
+    def _reset_cycle(self):
+        self._cycle = {
+            "started": time.time(),
+            "weight": {name: 0.0 for name in PRIORITY_NAMES.values()},
+            "requests": 0,
+            "wait_seconds": 0.0,
+            "peak_used": 0.0,
+            "throttled": 0,
+        }
+
+    # --- 내부 계산 (잠금 안에서 호출) ---
+    def _prune(self, now):
+        while self._events and self._events[0][0] <= now - self.window:
+            _, weight = self._events.popleft()
+            self._used -= weight
+        if not self._events:
+            self._used = 0.0
+
+    def _limit_for(self, priority):
+        if priority == ORDER:
+            return self.weight_limit
+        if priority == ACCOUNT:
+            return self.weight_limit - self.order_reserve / 2
+        return self.weight_limit - self.order_reserve
+
+    def _try_acquire(self, weight, priority):
+        """가중치 확보 시 0, 아니면 다시 시도할 때까지의 대기 시간(초)"""
+        now = time.monotonic()
+        self._prune(now)
+
+        if now < self._pause_until:
+            return self._pause_until - now
+
+        higher_waiting = any(self._waiting[p] for p in self._waiting if p < priority)
+        fits = self._used + weight <= self._limit_for(priority)
+        if fits and not higher_waiting:
+            self._events.append((now, weight))
+            self._used += weight
+            name = PRIORITY_NAMES[priority]
+            self._cycle["weight"][name] += weight
+            self._cycle["requests"] += 1
+            self._cycle["peak_used"] = max(self._cycle["peak_used"], self._used)
+            return 0.0
+
+        if higher_waiting or not self._events:
+            return 0.05
+        # 가장 오래된 사용분이 창 밖으로 빠지는 시점까지 대기
+        return max(0.01, self._events[0][0] + self.window - now)
+
+    # --- 가중치 확보 ---
+    def acquire(self, weight, priority=None):
+        """동기 요청 전 호출: 예산이 생길 때까지 블록"""
+        priority = _priority.get() if priority is None else priority
+        start = time.monotonic()
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    delay = self._try_acquire(weight, priority)
+                    if delay == 0.0:
+                        break
+                    self._cond.wait(timeout=delay)
+            finally:
+                self._waiting[priority] -= 1
+                self._cycle["wait_seconds"] += time.monotonic() - start
+                self._cond.notify_all()
+
+    async def acquire_async(self, weight, priority=None):
+        """비동기 요청 전 호출: 이벤트 루프를 막지 않고 대기"""
+        priority = _priority.get() if priority is None else priority
+        start = time.monotonic()
+        with self._cond:
+            self._waiting[priority] += 1
+        try:
+            while True:
+                with self._cond:
+                    delay = self._try_acquire(weight, priority)
+                if delay == 0.0:
+                    break
+                await asyncio.sleep(delay)
+        finally:
+            with self._cond:
+                self._waiting[priority] -= 1
+                self._cycle["wait_seconds"] += time.monotonic() - start
+                self._cond.notify_all()
+
+    # --- 응답 반영 ---
+    def observe(self, status_code, headers):
+        """응답 헤더의 서버 기준 사용량으로 보정, 429/418이면 Retry-After 동안 정지"""
+        headers = {str(k).lower(): v for k, v in (headers or {}).items()}
+        with self._cond:
+            now = time.monotonic()
+            self._prune(now)
+
+            server_used = headers.get("x-mbx-used-weight-1m")
+            if server_used is not None:
+                try:
+                    gap = float(server_used) - self._used
+                except ValueError:
+                    gap = 0.0
+                if gap > 0:
+                    # 다른 프로세스/인스턴스가 쓴 분량을 반영
+                    self._events.append((now, gap))
+                    self._used += gap
+
+            if status_code in (418, 429):
+                try:
+                    retry_after = float(headers.get("retry-after", 60))
+                except ValueError:
+                    retry_after = 60.0
+                self._pause_until = max(self._pause_until, now + retry_after)
+                self._cycle["throttled"] += 1
+
+            self._cond.notify_all()
+
+    # --- 리포트 ---
+    def headroom(self):
+        """현재 남은 가중치"""
+        with self._cond:
+            self._prune(time.monotonic())
+            return self.weight_limit - self._used
+
+    def start_cycle(self):
+        with self._cond:
+            self._reset_cycle()
+
+    def cycle_report(self):
+        """이번 사이클 사용량 요약 dict"""
+        with self._cond:
+            self._prune(time.monotonic())
+            report = dict(self._cycle)
+            report["weight"] = dict(self._cycle["weight"])
+            report["elapsed"] = time.time() - self._cycle["started"]
+            report["weight_total"] = sum(report["weight"].values())
+            report["min_headroom"] = self.weight_limit - report["peak_used"]
+            report["headroom_now"] = self.weight_limit - self._used
+            return report
+
+
+_scheduler = RequestScheduler()
+
+
+def get_scheduler():
+    """프로세스 공유 RequestScheduler"""
+    return _scheduler
+
+
+def _cost_to_weight(cost):
+    return (1 if cost is None else cost) / COST_PER_WEIGHT
+
+
+def attach_scheduler(exchange, scheduler=None):
+    """
+    ccxt 인스턴스(동기/비동기)의 throttle을 공유 스케줄러로 교체
+    - enableRateLimit=True 여야 ccxt가 요청마다 throttle(cost)를 호출
+    """
+    scheduler = scheduler or get_scheduler()
+    exchange.enableRateLimit = True
+
+    if asyncio.iscoroutinefunction(exchange.throttle):
+
+        async def throttle(cost=None):
+            await scheduler.acquire_async(_cost_to_weight(cost))
+
+    else:
+
+        def throttle(cost=None):
+            scheduler.acquire(_cost_to_weight(cost))
+
+    exchange.throttle = throttle
+
+    handle_errors = exchange.handle_errors
+
+    def observe_and_handle(code, reason, url, method, headers, *args, **kwargs):
+        scheduler.observe(code, headers)
+        return handle_errors(code, reason, url, method, headers, *args, **kwargs)
+
+    exchange.handle_errors = observe_and_handle
+    return exchange
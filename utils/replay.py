@@ -0,0 +1,360 @@
+import asyncio
+import atexit
+import gzip
+import json
+import random
+import threading
+import time
+
+import ccxt
+import ccxt.async_support as ccxt_async
+
+from utils.account_state import get_account_state
+from utils.exchange import default_binance, set_exchange_factory
+
+# 픽스처 파일 형식 버전 (gzip JSON 1개 = 거래소 스냅샷 1개)
+FIXTURE_VERSION = 1
+
+# 기록 대상 메서드 (시세/잔고 조회만, 주문은 기록하지 않음)
+RECORDED_METHODS = (
+    "load_markets",
+    "fetch_tickers",
+    "fetch_bids_asks",
+    "fetch_ohlcv",
+    "fetch_balance",
+    "fetch_order_book",
+)
+
+
+def empty_fixture():
+    return {
+        "version": FIXTURE_VERSION,
+        "recorded_at": int(time.time() * 1000),
+        "markets": {},
+        "tickers": {},
+        "balance": {},
+        "order_books": {},
+        "ohlcv": {},
+    }
+
+
+def load_fixture(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        fixture = json.load(f)
+    if fixture.get("version") != FIXTURE_VERSION:
+        raise ValueError(f"픽스처 버전 불일치: {fixture.get('version')} ({path})")
+    return fixture
+
+
+def save_fixture(fixture, path):
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(fixture, f, separators=(",", ":"), default=str)
+
+
+def _ohlcv_key(symbol, timeframe):
+    return f"{symbol}|{timeframe}"
+
+
+def _strip_info(obj):
+    """ccxt 응답의 원본 'info' 필드 제거 (픽스처 크기 축소)"""
+    if isinstance(obj, dict):
+        return {k: _strip_info(v) for k, v in obj.items() if k != "info"}
+    return obj
+
+
+class FixtureRecorder:
+    """
+    실제 ccxt 응답을 픽스처로 기록
+    - attach(exchange): 인스턴스의 조회 메서드를 감싸 응답을 모음 (동기/비동기 모두)
+    - 같은 심볼/타임프레임 캔들은 타임스탬프 기준으로 합침
+    - save(): gzip JSON으로 저장
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.fixture = empty_fixture()
+        self._lock = threading.Lock()
+
+    def attach(self, exchange):
+        for name in RECORDED_METHODS:
+            method = getattr(exchange, name)
+            setattr(exchange, name, self._wrap(name, method))
+        return exchange
+
+    def _wrap(self, name, method):
+        if asyncio.iscoroutinefunction(method):
+
+            async def recorded_async(*args, **kwargs):
+                result = await method(*args, **kwargs)
+                self.store(name, args, kwargs, result)
+                return result
+
+            return recorded_async
+
+        def recorded(*args, **kwargs):
+            result = method(*args, **kwargs)
+            self.store(name, args, kwargs, result)
+            return result
+
+        return recorded
+
+    def store(self, name, args, kwargs, result):
+        with self._lock:
+            fx = self.fixture
+            if name == "load_markets":
+                fx["markets"].update(_strip_info(result))
+            elif name == "fetch_tickers":
+                fx["tickers"].update(_strip_info(result))
+            elif name == "fetch_bids_asks":
+                # 최우선 호가만 기존 티커에 합침 (거래대금 등은 fetch_tickers 기록 유지)
+                for symbol, t in _strip_info(result).items():
+                    ticker = fx["tickers"].setdefault(symbol, {"symbol": symbol})
+                    ticker.update({k: t.get(k) for k in ("bid", "ask")})
+            elif name == "fetch_balance":
+                fx["balance"] = _strip_info(result)
+            elif name == "fetch_order_book":
+                symbol = args[0] if args else kwargs["symbol"]
+                fx["order_books"][symbol] = _strip_info(result)
+            elif name == "fetch_ohlcv":
+                symbol = args[0] if args else kwargs["symbol"]
+                timeframe = args[1] if len(args) > 1 else kwargs.get("timeframe", "1m")
+                key = _ohlcv_key(symbol, timeframe)
+                rows = {row[0]: row for row in fx["ohlcv"].get(key, [])}
+                rows.update({row[0]: row for row in result})
+                fx["ohlcv"][key] = [rows[ts] for ts in sorted(rows)]
+
+    def save(self):
+        with self._lock:
+            save_fixture(self.fixture, self.path)
+
+
+class _ReplayMixin:
+    """
+    픽스처 기반 응답 (ReplayBinance / AsyncReplayBinance 공통)
+    - 시장 정보는 set_markets로 넣어 market()/amount_to_precision 등은 ccxt 그대로 동작
+    - align_to_now: 캔들 타임스탬프를 현재 시각에 맞춰 이동 → CandleStore 증분 경로도 재현
+    - latency(초) ± jitter 비율만큼 요청마다 지연 (난수 시드 고정 → 재현 가능)
+    - 주문은 실제로 나가지 않고 self.orders에 쌓임
+    """
+
+    def _init_replay(self, fixture, latency, jitter, seed, align_to_now):
+        self.fixture = fixture
+        self.latency = latency
+        self.jitter = jitter
+        self.orders = []
+        self.calls = {}
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._offsets = {}
+        if align_to_now:
+            now_ms = int(time.time() * 1000)
+            for key, rows in fixture["ohlcv"].items():
+                if rows:
+                    tf_ms = self.parse_timeframe(key.split("|")[1]) * 1000
+                    self._offsets[key] = now_ms // tf_ms * tf_ms - rows[-1][0]
+        self.set_markets(fixture["markets"])
+
+    def _next_delay(self, name):
+        with self._rng_lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+            if self.latency <= 0:
+                return 0.0
+            spread = self.latency * self.jitter
+            return max(0.0, self.latency + self._rng.uniform(-spread, spread))
+
+    def _replay_tickers(self, symbols=None):
+        tickers = self.fixture["tickers"]
+        if symbols is None:
+            return dict(tickers)
+        return {s: tickers[s] for s in symbols if s in tickers}
+
+    def _replay_bids_asks(self, symbols=None):
+        return {
+            s: {"symbol": s, "bid": t.get("bid"), "ask": t.get("ask")}
+            for s, t in self._replay_tickers(symbols).items()
+        }
+
+    def _replay_ticker(self, symbol):
+        if symbol not in self.fixture["tickers"]:
+            raise ccxt.BadSymbol(f"재생 픽스처에 티커 없음: {symbol}")
+        return self.fixture["tickers"][symbol]
+
+    def _replay_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        key = _ohlcv_key(symbol, timeframe)
+        if key not in self.fixture["ohlcv"]:
+            raise ccxt.BadSymbol(f"재생 픽스처에 캔들 없음: {key}")
+        offset = self._offsets.get(key, 0)
+        rows = [[row[0] + offset] + row[1:] for row in self.fixture["ohlcv"][key]]
+        if since is not None:
+            rows = [row for row in rows if row[0] >= since]
+            return rows[:limit] if limit else rows
+        return rows[-limit:] if limit else rows
+
+    def _replay_order_book(self, symbol, limit=None):
+        book = self.fixture["order_books"].get(symbol)
+        if book is None:
+            raise ccxt.BadSymbol(f"재생 픽스처에 호가 없음: {symbol}")
+        return {
+            **book,
+            "bids": book["bids"][:limit] if limit else book["bids"],
+            "asks": book["asks"][:limit] if limit else book["asks"],
+        }
+
+    def _replay_order(self, symbol, type, side, amount, price=None, params=None):
+        order = {
+            "id": str(len(self.orders) + 1),
+            "symbol": symbol,
+            "type": type,
+            "side": side,
+            "amount": amount,
+            "price": price,
+            "status": "open",
+            "params": dict(params or {}),
+        }
+        self.orders.append(order)
+        return order
+
+
+class ReplayBinance(_ReplayMixin, ccxt.binance):
+    """ccxt.binance 대체 (동기): 네트워크 없이 픽스처로 응답"""
+
+    def __init__(self, fixture, latency=0.0, jitter=0.0, seed=0, align_to_now=True):
+        super().__init__({"options": {"defaultType": "spot"}})
+        self._init_replay(fixture, latency, jitter, seed, align_to_now)
+
+    def _wait(self, name):
+        delay = self._next_delay(name)
+        if delay:
+            time.sleep(delay)
+
+    def load_markets(self, reload=False, params={}):
+        self._wait("load_markets")
+        return self.markets
+
+    def fetch_tickers(self, symbols=None, params={}):
+        self._wait("fetch_tickers")
+        return self._replay_tickers(symbols)
+
+    def fetch_bids_asks(self, symbols=None, params={}):
+        self._wait("fetch_bids_asks")
+        return self._replay_bids_asks(symbols)
+
+    def fetch_ticker(self, symbol, params={}):
+        self._wait("fetch_ticker")
+        return self._replay_ticker(symbol)
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None, params={}):
+        self._wait("fetch_ohlcv")
+        return self._replay_ohlcv(symbol, timeframe, since, limit)
+
+    def fetch_balance(self, params={}):
+        self._wait("fetch_balance")
+        return self.fixture["balance"]
+
+    def fetch_order_book(self, symbol, limit=None, params={}):
+        self._wait("fetch_order_book")
+        return self._replay_order_book(symbol, limit)
+
+    def create_order(self, symbol, type, side, amount, price=None, params={}):
+        self._wait("create_order")
+        return self._replay_order(symbol, type, side, amount, price, params)
+
+    def private_post_order_oco(self, params={}):
+        self._wait("private_post_order_oco")
+        return self._replay_order(
+            params.get("symbol"),
+            "oco",
+            params.get("side"),
+            params.get("quantity"),
+            params.get("price"),
+            params,
+        )
+
+
+class AsyncReplayBinance(_ReplayMixin, ccxt_async.binance):
+    """ccxt.async_support.binance 대체 (utils.market_data용)"""
+
+    def __init__(self, fixture, latency=0.0, jitter=0.0, seed=0, align_to_now=True):
+        super().__init__({"options": {"defaultType": "spot"}})
+        self._init_replay(fixture, latency, jitter, seed, align_to_now)
+
+    async def _wait(self, name):
+        delay = self._next_delay(name)
+        if delay:
+            await asyncio.sleep(delay)
+
+    async def load_markets(self, reload=False, params={}):
+        await self._wait("load_markets")
+        return self.markets
+
+    async def fetch_tickers(self, symbols=None, params={}):
+        await self._wait("fetch_tickers")
+        return self._replay_tickers(symbols)
+
+    async def fetch_bids_asks(self, symbols=None, params={}):
+        await self._wait("fetch_bids_asks")
+        return self._replay_bids_asks(symbols)
+
+    async def fetch_ticker(self, symbol, params={}):
+        await self._wait("fetch_ticker")
+        return self._replay_ticker(symbol)
+
+    async def fetch_ohlcv(
+        self, symbol, timeframe="1m", since=None, limit=None, params={}
+    ):
+        await self._wait("fetch_ohlcv")
+        return self._replay_ohlcv(symbol, timeframe, since, limit)
+
+    async def fetch_balance(self, params={}):
+        await self._wait("fetch_balance")
+        return self.fixture["balance"]
+
+    async def fetch_order_book(self, symbol, limit=None, params={}):
+        await self._wait("fetch_order_book")
+        return self._replay_order_book(symbol, limit)
+
+    async def close(self):
+        pass  # 네트워크 세션 없음
+
+
+def install_replay(path_or_fixture, latency=0.0, jitter=0.0, seed=0):
+    """
+    이후 create_binance()가 픽스처 재생 인스턴스를 반환하도록 설정
+    - path_or_fixture: 픽스처 파일 경로 또는 load_fixture 결과 dict
+    - 반환: 재생 인스턴스 목록 (주문/호출 횟수 확인용)
+    """
+    fixture = (
+        load_fixture(path_or_fixture)
+        if isinstance(path_or_fixture, str)
+        else path_or_fixture
+    )
+    instances = []
+
+    def factory(auth, async_mode):
+        cls = AsyncReplayBinance if async_mode else ReplayBinance
+        # 인스턴스마다 다른 시드 (생성 순서가 같으면 지연 패턴도 같음)
+        exchange = cls(
+            fixture, latency=latency, jitter=jitter, seed=seed + len(instances)
+        )
+        instances.append(exchange)
+        return exchange
+
+    set_exchange_factory(factory)
+    # 재생 시장 정보가 실제 스냅샷을 덮어쓰거나 스냅샷이 재생 시장을 가리지 않도록
+    get_account_state().use_snapshot(None)
+    return instances
+
+
+def install_recorder(path):
+    """
+    이후 create_binance()가 실제 Binance + 응답 기록 인스턴스를 반환하도록 설정
+    - 프로세스 종료 시 픽스처 저장 (recorder.save()로 수동 저장도 가능)
+    """
+    recorder = FixtureRecorder(path)
+
+    def factory(auth, async_mode):
+        return recorder.attach(default_binance(auth, async_mode))
+
+    set_exchange_factory(factory)
+    atexit.register(recorder.save)
+    return recorder
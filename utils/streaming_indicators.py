@@ -0,0 +1,401 @@
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from utils.candle_store import OHLCV_COLUMNS
+from utils.indicators import _ema_kernel, compute_indicators
+
+# 링버퍼에 저장하는 행 단위 값 (OBV는 누적 원값, 정규화는 frame()에서)
+_ROW_COLUMNS = OHLCV_COLUMNS + [
+    "SMA20",
+    "EMA20",
+    "RSI14",
+    "MACD",
+    "MACD_signal",
+    "MACD_hist",
+    "BB_upper",
+    "BB_lower",
+    "ATR14",
+    "OBV_cum",
+]
+_COL = {name: i for i, name in enumerate(_ROW_COLUMNS)}
+
+# 합/제곱합 누적오차 보정 주기 (업데이트 횟수)
+_RESYNC_EVERY = 1000
+
+
+class _RollingWindow:
+    """고정 길이 윈도우의 합/제곱합 (기준값을 빼서 누적 상쇄오차 완화)"""
+
+    def __init__(self, size, ref=0.0):
+        self.size = size
+        self.ref = ref
+        self.values = deque()
+        self.sum = 0.0
+        self.sumsq = 0.0
+
+    def push(self, x):
+        if len(self.values) == self.size:
+            old = self.values.popleft() - self.ref
+            self.sum -= old
+            self.sumsq -= old * old
+        self.values.append(x)
+        v = x - self.ref
+        self.sum += v
+        self.sumsq += v * v
+
+    def full(self):
+        return len(self.values) == self.size
+
+    def copy(self):
+        other = _RollingWindow(self.size, self.ref)
+        other.values = deque(self.values)
+        other.sum = self.sum
+        other.sumsq = self.sumsq
+        return other
+
+    def mean(self):
+        if not self.full():
+            return math.nan
+        return self.ref + self.sum / self.size
+
+    def std(self):
+        if not self.full():
+            return math.nan
+        var = (self.sumsq - self.sum * self.sum / self.size) / (self.size - 1)
+        return math.sqrt(max(var, 0.0))
+
+    def resync(self):
+        """기준값을 현재 평균으로 옮기고 합계를 다시 계산"""
+        if self.values:
+            self.ref = sum(self.values) / len(self.values)
+        self.sum = sum(v - self.ref for v in self.values)
+        self.sumsq = sum((v - self.ref) ** 2 for v in self.values)
+
+
+def _first_rsi_atr(rows, window=14):
+    """
+    get_indicators가 창 첫 window행만으로 내는 RSI14/ATR14 첫 값 (window-1번 행)
+    - 창 첫 행은 직전 캔들이 없으므로 변화량 0, 실제 범위는 high - low
+    - rows: 링버퍼 행 (앞쪽 window개)
+    """
+    close = rows[:window, _COL["close"]]
+    high = rows[:window, _COL["high"]]
+    low = rows[:window, _COL["low"]]
+
+    delta = np.diff(close)
+    gain = delta[delta > 0].sum() / window
+    loss = -delta[delta < 0].sum() / window
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - 100 / (1 + np.float64(gain) / loss)
+
+    prev = close[:-1]
+    true_range = np.maximum.reduce(
+        [high[1:] - low[1:], np.abs(high[1:] - prev), np.abs(low[1:] - prev)]
+    )
+    atr = (high[0] - low[0] + true_range.sum()) / window
+    return rsi, atr / close[-1] * 100
+
+
+class IncrementalIndicators:
+    """
+    심볼별 상태 유지형 보조지표 계산기 (캔들 1개당 O(1))
+    - EMA 상태(12/20/26, MACD 시그널 9), 롤링 합/제곱합(SMA·BB 20, RSI 14, ATR 14),
+      OBV 누적값을 들고 있다가 새 캔들만 반영
+    - 같은 timestamp 캔들이 다시 들어오면(미완성 캔들 갱신) 직전 상태로 되돌린 뒤 재적용
+    - update() 결과 / frame() 마지막 행은 utils.indicators.get_indicators와 같은 값
+      (EMA 계열은 시드 시점 차이가 수백 봉 뒤엔 사라지므로 창 앞부분만 미세하게 다름)
+    """
+
+    def __init__(self, window):
+        self.window = window  # get_indicators의 limit (OBV 정규화 구간)
+        self._rows = np.full((window, len(_ROW_COLUMNS)), np.nan)
+        self._head = 0  # 다음에 쓸 위치
+        self._count = 0  # 링버퍼에 들어있는 행 수
+        self._state = None
+        self._snapshot = None  # 마지막 캔들 반영 직전 상태 (미완성 캔들 재적용용)
+        self._updates = 0
+        self._vol_sum = 0.0  # 링버퍼(창) 거래량 합계
+
+    # --- 초기화 ---
+    @classmethod
+    def from_candles(cls, candles, window):
+        """
+        OHLCV DataFrame으로 초기 상태 구성
+        - 마지막 캔들 직전까지는 NumPy 엔진으로 한 번에 계산해 상태를 만들고,
+          마지막 캔들(미완성일 수 있음)은 update()로 반영 → 다음 갱신 시 되돌리기 가능
+        - 초기 frame()은 compute_indicators(candles)와 같은 값
+        """
+        obj = cls(window)
+        candles = candles.tail(window).reset_index(drop=True)
+        if candles.empty:
+            return obj
+
+        head = candles.iloc[:-1]
+        if not head.empty:
+            obj._seed(head)
+        last = candles[OHLCV_COLUMNS].iloc[-1]
+        obj.update(tuple(last))
+        return obj
+
+    def _seed(self, candles):
+        df = compute_indicators(candles)
+        close = df["close"].to_numpy(dtype=float)
+        high = df["high"].to_numpy(dtype=float)
+        low = df["low"].to_numpy(dtype=float)
+        volume = df["volume"].to_numpy(dtype=float)
+
+        ema12 = _ema_kernel(close, 12)
+        ema26 = _ema_kernel(close, 26)
+        macd = (ema12 - ema26) / ema26 * 100
+        direction = np.nan_to_num(np.sign(np.diff(close, prepend=close[:1])))
+        obv_cum = np.cumsum(direction * volume)
+
+        n = len(df)
+        self._rows[:n] = np.column_stack(
+            [df[c].to_numpy(dtype=float) for c in _ROW_COLUMNS[:-1]] + [obv_cum]
+        )
+        self._head = n % self.window
+        self._count = n
+        self._vol_sum = float(np.nansum(volume))
+
+        closes = _RollingWindow(20, float(close[-1]))
+        gains = _RollingWindow(14)
+        losses = _RollingWindow(14)
+        ranges = _RollingWindow(14)
+        for i in range(max(0, n - 20), n):
+            closes.push(close[i])
+        for i in range(max(0, n - 14), n):
+            prev_close = close[i - 1] if i > 0 else math.nan
+            self._push_moves(
+                gains, losses, ranges, prev_close, high[i], low[i], close[i]
+            )
+
+        self._state = {
+            "ts": int(df["timestamp"].iloc[-1]),
+            "close": float(close[-1]),
+            "ema12": float(ema12[-1]),
+            "ema20": float(_ema_kernel(close, 20)[-1]),
+            "ema26": float(ema26[-1]),
+            "signal": float(_ema_kernel(macd, 9)[-1]),
+            "obv_cum": float(obv_cum[-1]),
+            "closes": closes,
+            "gains": gains,
+            "losses": losses,
+            "ranges": ranges,
+        }
+
+    @staticmethod
+    def _push_moves(gains, losses, ranges, prev_close, high, low, close):
+        delta = close - prev_close
+        gains.push(delta if delta > 0 else 0.0)
+        losses.push(-delta if delta < 0 else 0.0)
+        if math.isnan(prev_close):
+            ranges.push(high - low)
+        else:
+            ranges.push(max(high - low, abs(high - prev_close), abs(low - prev_close)))
+
+    @staticmethod
+    def _copy_state(state):
+        out = dict(state)
+        for key in ("closes", "gains", "losses", "ranges"):
+            out[key] = state[key].copy()
+        return out
+
+    # --- 상태 조회 ---
+    @property
+    def last_timestamp(self):
+        return None if self._state is None else self._state["ts"]
+
+    def can_apply(self, candles):
+        """candles에 마지막 처리 캔들이 포함되어 있어 이어서 반영할 수 있는지"""
+        if self._state is None or candles.empty:
+            return False
+        return bool((candles["timestamp"].to_numpy() == self._state["ts"]).any())
+
+    # --- 갱신 ---
+    def apply(self, candles):
+        """candles 중 마지막 처리 캔들(다시 덮어씀)부터 끝까지 update"""
+        ts = candles["timestamp"].to_numpy()
+        start = int(np.flatnonzero(ts == self._state["ts"])[0])
+        for candle in candles[OHLCV_COLUMNS].iloc[start:].itertuples(index=False):
+            self.update(candle)
+
+    def update(self, candle):
+        """
+        캔들 1개 반영 후 get_indicators 마지막 행과 같은 값을 dict로 반환
+        - candle: (timestamp, open, high, low, close, volume) 순서의 시퀀스
+        """
+        ts, open_, high, low, close, volume = (float(v) for v in candle)
+        ts = int(ts)
+
+        replace = self._state is not None and ts == self._state["ts"]
+        if replace:
+            self._state = self._copy_state(self._snapshot)
+        elif self._state is not None and ts < self._state["ts"]:
+            raise ValueError(f"과거 캔들은 반영할 수 없음: {ts} < {self._state['ts']}")
+
+        if self._state is None:
+            self._state = {
+                "ts": None,
+                "close": math.nan,
+                "ema12": close,
+                "ema20": close,
+                "ema26": close,
+                "signal": None,
+                "obv_cum": 0.0,
+                "closes": _RollingWindow(20, close),
+                "gains": _RollingWindow(14),
+                "losses": _RollingWindow(14),
+                "ranges": _RollingWindow(14),
+            }
+        self._snapshot = self._copy_state(self._state)
+        st = self._state
+
+        prev_close = st["close"]
+        st["ts"] = ts
+        st["close"] = close
+
+        # EMA 상태 갱신 (adjust=False 재귀식)
+        for span in (12, 20, 26):
+            a = 2.0 / (span + 1.0)
+            key = f"ema{span}"
+            st[key] = (
+                (1 - a) * st[key] + a * close if not math.isnan(prev_close) else close
+            )
+        macd = (st["ema12"] - st["ema26"]) / st["ema26"] * 100
+        if st["signal"] is None or math.isnan(prev_close):
+            st["signal"] = macd
+        else:
+            a = 2.0 / 10.0
+            st["signal"] = (1 - a) * st["signal"] + a * macd
+
+        # 롤링 윈도우
+        st["closes"].push(close)
+        self._push_moves(
+            st["gains"], st["losses"], st["ranges"], prev_close, high, low, close
+        )
+
+        # OBV 누적
+        if close > prev_close:
+            st["obv_cum"] += volume
+        elif close < prev_close:
+            st["obv_cum"] -= volume
+
+        self._updates += 1
+        if self._updates % _RESYNC_EVERY == 0:
+            for key in ("closes", "gains", "losses", "ranges"):
+                st[key].resync()
+            self._vol_sum = float(np.nansum(self._rows[: self._count, _COL["volume"]]))
+
+        row = self._make_row(ts, open_, high, low, close, volume, macd)
+        self._write_row(row, replace)
+        return self._last_values(row)
+
+    def _make_row(self, ts, open_, high, low, close, volume, macd):
+        st = self._state
+        sma = st["closes"].mean()
+        std = st["closes"].std()
+        avg_gain = st["gains"].mean()
+        avg_loss = st["losses"].mean()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rs = np.float64(avg_gain) / np.float64(avg_loss)
+            rsi = 100 - (100 / (1 + rs))
+        upper_band = sma + std * 2
+        lower_band = sma - std * 2
+
+        return np.array(
+            [
+                ts,
+                open_,
+                high,
+                low,
+                close,
+                volume,
+                (sma - close) / close * 100,
+                (st["ema20"] - close) / close * 100,
+                rsi,
+                macd,
+                st["signal"],
+                macd - st["signal"],
+                (upper_band - sma) / sma * 100,
+                (lower_band - sma) / sma * 100,
+                st["ranges"].mean() / close * 100,
+                st["obv_cum"],
+            ]
+        )
+
+    def _write_row(self, row, replace):
+        vol = _COL["volume"]
+        if replace:
+            slot = (self._head - 1) % self.window
+            self._vol_sum -= self._rows[slot, vol]
+        else:
+            slot = self._head
+            if self._count == self.window:
+                self._vol_sum -= self._rows[slot, vol]  # 창 밖으로 밀려나는 캔들
+            else:
+                self._count += 1
+            self._head = (self._head + 1) % self.window
+        self._rows[slot] = row
+        self._vol_sum += row[vol]
+
+    def _oldest_row(self):
+        return self._rows[(self._head - self._count) % self.window]
+
+    def _last_values(self, row):
+        values = {name: row[_COL[name]] for name in _ROW_COLUMNS[:-1]}
+        values["timestamp"] = int(row[_COL["timestamp"]])
+        values["BB_mid"] = 0
+        # OBV: 창 첫 캔들 기준 누적값 / 창 거래량 합계
+        base = self._oldest_row()[_COL["OBV_cum"]]
+        values["OBV"] = (row[_COL["OBV_cum"]] - base) / self._vol_sum * 100
+        return values
+
+    # --- DataFrame 변환 ---
+    def frame(self):
+        """
+        링버퍼 전체를 get_indicators와 같은 컬럼 구성의 DataFrame으로 변환 (벡터 연산)
+        - 창 앞부분 워밍업 구간은 get_indicators처럼 NaN
+        - RSI14/ATR14 첫 값(13번 행)은 링버퍼 값이 창 밖 캔들 변화량을 포함하므로
+          get_indicators처럼 창 안 캔들만으로 다시 계산 (_first_rsi_atr)
+        """
+        n = self._count
+        start = (self._head - n) % self.window
+        if start + n <= self.window:
+            rows = self._rows[start : start + n]
+        else:
+            rows = np.concatenate(
+                [self._rows[start:], self._rows[: (start + n) % self.window]]
+            )
+
+        df = pd.DataFrame(rows[:, : len(OHLCV_COLUMNS)], columns=OHLCV_COLUMNS)
+        df["timestamp"] = df["timestamp"].astype(np.int64)
+        df["ds"] = pd.to_datetime(df["timestamp"], unit="ms")
+
+        ind = rows[:, len(OHLCV_COLUMNS) :].copy()
+        # 창 앞부분 워밍업 구간은 get_indicators처럼 NaN 처리
+        ind[:19, [0, 6, 7]] = np.nan  # SMA20, BB_upper, BB_lower
+        ind[:13, [2, 8]] = np.nan  # RSI14, ATR14
+        if n >= 14:
+            ind[13, 2], ind[13, 8] = _first_rsi_atr(rows)
+        extra = {
+            "SMA20": ind[:, 0],
+            "EMA20": ind[:, 1],
+            "RSI14": ind[:, 2],
+            "MACD": ind[:, 3],
+            "MACD_signal": ind[:, 4],
+            "MACD_hist": ind[:, 5],
+            "BB_upper": ind[:, 6],
+            "BB_mid": np.zeros(n, dtype=np.int64),
+            "BB_lower": ind[:, 7],
+            "ATR14": ind[:, 8],
+        }
+        obv_cum = ind[:, 9]
+        vol_total = np.nansum(rows[:, _COL["volume"]])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            extra["OBV"] = (obv_cum - obv_cum[0]) / vol_total * 100 if n else obv_cum
+
+        return pd.concat([df, pd.DataFrame(extra, index=df.index)], axis=1)
@@ -0,0 +1,139 @@
+import threading
+import time
+
+from utils.account_state import get_account_state
+from utils.decision_service import get_decision_service
+from utils.discord_msg import notify_error, send_portfolio_message
+from utils.place_trade import order_lock, place_trade
+from utils.profiling import get_profiler
+
+
+def candidate_key(candidates):
+    """후보 집합 비교용 키: (종목, 신호) 집합 (순서는 무시, select_trading_candidates가 섞음)"""
+    return frozenset((c["종목"], c["신호"]) for c in candidates)
+
+
+class TradeWorker:
+    """
+    AI 결정(utils.decision_service) → 주문 → 포트폴리오 알림을 스캔 루프와 별도 스레드에서 실행
+    - submit()은 바로 반환 → 메인 루프는 AI/주문 응답을 기다리지 않고 다음 봉 스캔 진행
+    - 작업 슬롯 1개: 실행 중에 새 후보가 오면 대기 중인 이전 후보를 교체 (최신 후보만 처리)
+    - 같은 잔고 중복 매매 방지
+      - 결정/주문은 이 스레드 하나에서 한 번에 하나씩, 주문 구간은 order_lock
+      - 후보를 만든 스캔 시점의 잔고 버전(AccountState.balance_version)이 주문 직전과 다르면
+        그 사이 다른 주문이 잔고를 썼다는 뜻 → 주문하지 않고 다음 사이클 스캔에 맡김
+    """
+
+    def __init__(self):
+        # 마지막으로 맡은 후보 집합 (주문까지 못 가면 None → 다음 사이클 재시도)
+        self.key = None
+        self._pending = None
+        self._busy = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._run, name="trade-worker", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, candidates, close, scanned_at, balance_version):
+        """
+        close: 후보를 만든 봉 마감 시각, scanned_at: 스캔 완료 시각 (epoch 초)
+        balance_version: 스캔 시작 때 읽은 AccountState.balance_version
+        """
+        job = {
+            "candidates": candidates,
+            "key": candidate_key(candidates),
+            "close": close,
+            "scanned_at": scanned_at,
+            "balance_version": balance_version,
+        }
+        with self._cond:
+            if self._pending is not None:
+                print("대기 중인 이전 후보를 최신 후보로 교체")
+            self._pending = job
+            self.key = job["key"]
+            self._cond.notify_all()
+
+    def busy(self):
+        with self._cond:
+            return self._busy or self._pending is not None
+
+    def wait_idle(self, timeout=None):
+        """대기/실행 중인 작업이 모두 끝날 때까지 (종료 시, 재생 테스트용)"""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._busy and self._pending is None, timeout
+            )
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None)
+                job, self._pending = self._pending, None
+                self._busy = True
+            try:
+                done = self._execute(job)
+            except Exception as e:
+                notify_error(str(e))
+                done = False
+            with self._cond:
+                # 주문까지 못 간 후보는 같은 집합이 다시 나오면 다음 사이클에 재시도
+                if not done and self.key == job["key"] and self._pending is None:
+                    self.key = None
+                self._busy = False
+                self._cond.notify_all()
+
+    def _execute(self, job):
+        """반환: 주문까지 진행했으면 True"""
+        # 시간 예산 안에 AI 결정 (지연/깨진 응답이면 헤지 요청, 그래도 안 되면 로컬 점수 결정)
+        decision = get_decision_service().decide(job["candidates"])
+        advised_at = time.time()
+        if decision is None:
+            return False
+
+        account = get_account_state()
+        with order_lock:
+            if account.balance_version != job["balance_version"]:
+                print("스캔 이후 다른 주문으로 잔고 변경 → 이번 후보 주문 생략")
+                log_trade_latency(job, decision, advised_at, None)
+                return False
+            # 지정가 주문이 접수된 시각 (주문을 내지 않았으면 None)
+            ordered_at = place_trade(decision)
+
+        log_trade_latency(job, decision, advised_at, ordered_at)
+        send_portfolio_message()
+        return True
+
+
+def log_trade_latency(job, decision, advised_at, ordered_at):
+    """
+    봉 마감 → 스캔 / AI 결정 / 주문 접수까지 걸린 시간(초)을 사이클 기록 파일에 "trade" 이벤트로 남김
+    (스캔 사이클은 이미 끝났으므로 main.log_latency 대신 record_event, 같은 "close"로 연결)
+    """
+    close = job["close"]
+    latency = {"scan": job["scanned_at"], "ai": advised_at, "order": ordered_at}
+    latency = {
+        name: round(t - close, 3) for name, t in latency.items() if t is not None
+    }
+    get_profiler().record_event(
+        "trade",
+        close=close,
+        symbol=decision["symbol"],
+        source=decision["source"],
+        latency=latency,
+    )
+    print(
+        f"[지연] 봉 마감 후 AI({decision['source']}) "
+        + ", ".join(f"{name} {sec:.1f}s" for name, sec in latency.items())
+    )
+
+
+_trade_worker = None
+
+
+def get_trade_worker():
+    """프로세스 공유 TradeWorker (처음 쓸 때 스레드 시작)"""
+    global _trade_worker
+    if _trade_worker is None:
+        _trade_worker = TradeWorker()
+    return _trade_worker